@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ObjectDoesNotExist
+
+class ProfileBackend(ModelBackend):
+    """
+    ``ModelBackend`` that loads the profile in the same query as the user
+    on every request, so role checks cost no query of their own
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+def is_staff_member(user):
+    """Whether ``user`` is restaurant staff; False for guests and users without a profile"""
+    if not user.is_authenticated:
+        return False
+    try:
+        return user.profile.is_staff
+    except ObjectDoesNotExist:
+        return False
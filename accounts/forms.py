@@ -1,6 +1,9 @@
 from django import forms
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.contrib.auth.models import User
+from django.template import loader
+from booking.jobs import enqueue
+from booking.notifications import send_email
 from .models import Profile
 
 class UserRegistrationForm(UserCreationForm):
@@ -31,4 +34,15 @@ class ProfileUpdateForm(forms.ModelForm):
 class UserUpdateForm(forms.ModelForm):
     class Meta:
         model = User
-        fields = ('first_name', 'last_name', 'email')
\ No newline at end of file
+        fields = ('first_name', 'last_name', 'email')
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Renders the reset email in the request but leaves sending it to the job worker"""
+    def send_mail(self, subject_template_name, email_template_name, context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = ''.join(loader.render_to_string(subject_template_name, context).splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_message = None
+        if html_email_template_name is not None:
+            html_message = loader.render_to_string(html_email_template_name, context)
+        enqueue(send_email, subject, body, [to_email], from_email=from_email, html_message=html_message)
@@ -0,0 +1,98 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+
+from accounts.models import Profile
+from accounts.onboarding import bulk_create_users
+from booking.transfer import FORMATS, Progress, chunked, guess_format, open_file, read_rows
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+
+class Command(BaseCommand):
+    help = (
+        'Create many accounts from a CSV or JSONL file with batched inserts. '
+        'Columns: username, email, first_name, last_name, password, '
+        'phone_number, address, is_staff. Accounts without a password get an '
+        'unusable one and can set it through password reset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to read, or - for stdin')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension, else csv')
+        parser.add_argument('--batch-size', type=int, default=500, help='Accounts inserted per batch')
+        parser.add_argument('--max-errors', type=int, default=50, help='Rejected rows to print')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rejected = 0
+        self.imported = 0
+        username_field = User._meta.get_field('username')
+        self.validate_username = username_field.run_validators
+        fmt = options['format'] or guess_format(options['path'])
+        progress = Progress(self.stdout, every=options['batch_size'] * 10 if options['verbosity'] else 0)
+
+        with open_file(options['path'], 'r') as stream:
+            try:
+                for batch in chunked(read_rows(stream, fmt), options['batch_size']):
+                    self.import_batch(batch)
+                    progress.add(len(batch))
+            except ValueError as e:
+                raise CommandError(f"{e}; {self.imported} account(s) were created before it")
+
+        self.stdout.write(self.style.SUCCESS(f"Created {self.imported} account(s) ({progress.rate:.0f} rows/s)"))
+        if self.rejected:
+            raise CommandError(f"Rejected {self.rejected} row(s)")
+
+    def reject(self, line, message):
+        self.rejected += 1
+        if self.rejected <= self.options['max_errors']:
+            self.stderr.write(f"line {line}: {message}")
+
+    def parse(self, row):
+        username = (row.get('username') or '').strip()
+        if not username:
+            raise ValidationError('missing username')
+        self.validate_username(username)
+        email = (row.get('email') or '').strip()
+        if email:
+            validate_email(email)
+        password = row.get('password')
+        user = User(
+            username=username,
+            email=email,
+            first_name=row.get('first_name') or '',
+            last_name=row.get('last_name') or '',
+            # Hashing is deliberately slow; it is the cost of importing passwords
+            password=make_password(password or None),
+        )
+        profile = Profile(
+            phone_number=row.get('phone_number') or None,
+            address=row.get('address') or None,
+            is_staff=str(row.get('is_staff', '')).strip().lower() in TRUE_VALUES,
+        )
+        return user, profile
+
+    def import_batch(self, batch):
+        accounts = {}
+        for line, row in batch:
+            try:
+                user, profile = self.parse(row)
+            except ValidationError as e:
+                self.reject(line, ' '.join(e.messages))
+                continue
+            except AttributeError:
+                self.reject(line, 'not a record')
+                continue
+            if user.username in accounts:
+                self.reject(line, f"username {user.username!r} appears twice")
+                continue
+            accounts[user.username] = (line, user, profile)
+
+        taken = set(User.objects.filter(username__in=accounts).values_list('username', flat=True))
+        for username in taken:
+            self.reject(accounts.pop(username)[0], f"username {username!r} is taken")
+
+        users = bulk_create_users([(user, profile) for _, user, profile in accounts.values()])
+        self.imported += len(users)
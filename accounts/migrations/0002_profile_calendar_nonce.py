@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:12
+
+import accounts.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='calendar_nonce',
+            field=models.CharField(default=accounts.models.new_calendar_nonce, editable=False, max_length=32),
+        ),
+    ]
@@ -1,17 +1,41 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+def new_calendar_nonce():
+    return secrets.token_hex(8)
+
 class Profile(models.Model):
     """Model for extended user information"""
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
     is_staff = models.BooleanField(default=False)  # For restaurant staff
+    # Signed into calendar feed links; a new one revokes the old links
+    calendar_nonce = models.CharField(max_length=32, default=new_calendar_nonce, editable=False)
     
     def __str__(self):
         return f"{self.user.username}'s Profile"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._current_values()
+        return instance
+    
+    def _current_values(self):
+        return {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+    
+    def has_changed(self):
+        """Whether the profile differs from what was last loaded or saved"""
+        return self._state.adding or self._current_values() != getattr(self, '_loaded_values', None)
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = self._current_values()
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -20,6 +44,12 @@ def create_user_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Save Profile whenever User is saved"""
-    instance.profile.save()
\ No newline at end of file
+def save_user_profile(sender, instance, created, raw=False, **kwargs):
+    """Save the Profile with its User, but only if it was loaded and changed"""
+    # Logins save the User to record last_login; they must not fetch or
+    # rewrite a profile nobody touched
+    if created or raw:
+        return
+    profile = User.profile.related.get_cached_value(instance, default=None)
+    if profile is not None and profile.has_changed():
+        profile.save()
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+Bulk user onboarding.
+
+``User.objects.create_user()`` inserts each user and then, through the
+``post_save`` signal, its profile: two queries per account.  Here users
+and profiles are inserted with one query per batch each instead.
+"""
+import itertools
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Profile
+
+def bulk_create_users(accounts, batch_size=500):
+    """
+    Insert ``(user, profile)`` pairs of unsaved instances in batches and
+    return the saved users.  ``profile`` may be None for a blank profile.
+    Passwords must already be set on the users.
+    """
+    created = []
+    accounts = iter(accounts)
+    while batch := list(itertools.islice(accounts, batch_size)):
+        with transaction.atomic():
+            users = User.objects.bulk_create([user for user, _ in batch])
+            if any(user.pk is None for user in users):
+                # Backends that cannot return ids from a bulk insert
+                ids = dict(User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list('username', 'pk'))
+                for user in users:
+                    user.pk = ids[user.username]
+            profiles = []
+            for user, profile in batch:
+                profile = profile or Profile()
+                profile.user = user
+                profiles.append(profile)
+            Profile.objects.bulk_create(profiles)
+            for profile in profiles:
+                profile._loaded_values = profile._current_values()
+        created.extend(users)
+    return created
@@ -1,14 +1,24 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
+from booking.ratelimit import rate_limited
 from . import views
+from .forms import QueuedPasswordResetForm
 
 urlpatterns = [
     path('register/', views.register, name='register'),
-    path('login/', auth_views.LoginView.as_view(template_name='accounts/login.html'), name='login'),
+    path('login/',
+         rate_limited('login', account_field='username')(
+             auth_views.LoginView.as_view(template_name='accounts/login.html')
+         ),
+         name='login'),
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
     path('profile/', views.profile, name='profile'),
     path('password-reset/', 
-         auth_views.PasswordResetView.as_view(template_name='accounts/password_reset.html'), 
+         rate_limited('password_reset', account_field='email')(
+             auth_views.PasswordResetView.as_view(
+                 template_name='accounts/password_reset.html', form_class=QueuedPasswordResetForm
+             )
+         ), 
          name='password_reset'),
     path('password-reset/done/', 
          auth_views.PasswordResetDoneView.as_view(template_name='accounts/password_reset_done.html'), 
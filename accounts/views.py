@@ -2,8 +2,15 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from booking.ical import feed_url
+from booking.pagination import paginate
+from booking.ratelimit import rate_limited
 from .forms import UserRegistrationForm, UserUpdateForm, ProfileUpdateForm
+from .models import new_calendar_nonce
 
+RECENT_BOOKINGS = 10
+
+@rate_limited('register')
 def register(request):
     """View for user registration"""
     if request.method == 'POST':
@@ -21,26 +28,35 @@ def register(request):
 @login_required
 def profile(request):
     """View for user profile"""
+    if request.method == 'POST' and 'rotate_calendar' in request.POST:
+        # Calendar apps given the old link stop receiving bookings
+        request.user.profile.calendar_nonce = new_calendar_nonce()
+        request.user.profile.save(update_fields=['calendar_nonce'])
+        messages.success(request, 'Your calendar link has been replaced. Add the new one to your calendar app.')
+        return redirect('profile')
+    
     if request.method == 'POST':
         user_form = UserUpdateForm(request.POST, instance=request.user)
         profile_form = ProfileUpdateForm(request.POST, instance=request.user.profile)
         
         if user_form.is_valid() and profile_form.is_valid():
-            user_form.save()
+            # The profile first, so saving the user finds nothing left to write
             profile_form.save()
+            user_form.save()
             messages.success(request, 'Your profile has been updated!')
             return redirect('profile')
     else:
         user_form = UserUpdateForm(instance=request.user)
         profile_form = ProfileUpdateForm(instance=request.user.profile)
     
-    # Get user's bookings
-    bookings = request.user.bookings.all()
+    # Get user's most recent bookings; the bookings page pages through the rest
+    bookings = paginate(request.user.bookings.select_related('table'), per_page=RECENT_BOOKINGS, descending=True)
     
     context = {
         'user_form': user_form,
         'profile_form': profile_form,
-        'bookings': bookings
+        'bookings': bookings,
+        'calendar_url': feed_url(request, request.user),
     }
     
     return render(request, 'accounts/profile.html', context)
\ No newline at end of file
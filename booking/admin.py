@@ -1,10 +1,12 @@
 from django.contrib import admin
-from .models import Table, MenuCategory, MenuItem, Booking
+from django.utils import timezone
+from .models import Table, MenuCategory, MenuItem, Booking, BookingSeries, WaitlistEntry, Job
 
 @admin.register(Table)
 class TableAdmin(admin.ModelAdmin):
     list_display = ('number', 'capacity')
     search_fields = ('number',)
+    filter_horizontal = ('joinable_with',)
 
 @admin.register(MenuCategory)
 class MenuCategoryAdmin(admin.ModelAdmin):
@@ -24,4 +26,30 @@ class BookingAdmin(admin.ModelAdmin):
     list_filter = ('status', 'date')
     search_fields = ('customer__username', 'customer__email')
     date_hierarchy = 'date'
-    list_editable = ('status',)
\ No newline at end of file
+    list_editable = ('status',)
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = ('customer', 'table', 'start_date', 'time', 'interval_weeks', 'occurrences')
+    search_fields = ('customer__username', 'customer__email')
+    date_hierarchy = 'start_date'
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'earliest_time', 'latest_time', 'num_guests', 'status', 'created_at')
+    list_filter = ('status', 'date')
+    search_fields = ('user__username', 'user__email')
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_at', 'last_error', 'created_at')
+    actions = ['retry']
+
+    @admin.action(description='Run the selected jobs again')
+    def retry(self, request, queryset):
+        count = queryset.exclude(status='RUNNING').update(
+            status='QUEUED', attempts=0, run_at=timezone.now(), last_error=''
+        )
+        self.message_user(request, f"Queued {count} job(s)")
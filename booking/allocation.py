@@ -0,0 +1,90 @@
+"""
+Seat allocation for a party.
+
+Free tables are ranked by best fit (fewest empty seats), so a couple is
+offered a two-top before an eight-top.  When no single table seats the
+party, connected groups of joinable tables are searched instead.  The
+search only grows groups that are still short of seats and drops any
+group that cannot reach the party size with the largest tables left, so
+it stays cheap with hundreds of tables.
+"""
+from collections import defaultdict, namedtuple
+
+from .availability import Availability
+from .models import Table
+
+MAX_JOINED_TABLES = 3
+
+Allocation = namedtuple('Allocation', ['table_ids', 'capacity'])
+
+class Allocator:
+    """Ranks free tables and joinable table groups for a party"""
+
+    def __init__(self, availability, adjacency, max_tables=MAX_JOINED_TABLES):
+        self.availability = availability
+        # {table_id: set of joinable table ids}
+        self.adjacency = adjacency
+        self.max_tables = max_tables
+
+    @classmethod
+    def load(cls, date, user=None, max_tables=MAX_JOINED_TABLES):
+        availability = Availability.load(date, user=user)
+        adjacency = defaultdict(set)
+        edges = Table.joinable_with.through.objects.values_list('from_table_id', 'to_table_id')
+        for from_id, to_id in edges:
+            adjacency[from_id].add(to_id)
+        return cls(availability, adjacency, max_tables)
+
+    def allocate(self, date, start, num_guests, limit=None):
+        """Best allocations for ``num_guests`` at ``start``, single tables first"""
+        free = self.availability.free_tables(date, start)
+        capacities = self.availability.capacities
+
+        # free_tables() is ordered by capacity, so the first fits waste least
+        singles = [
+            Allocation((table_id,), capacities[table_id])
+            for table_id in free if capacities[table_id] >= num_guests
+        ]
+        if singles:
+            return singles[:limit]
+
+        groups = self._groups(free, num_guests)
+        groups.sort(key=lambda group: (group.capacity - num_guests, len(group.table_ids), group.table_ids))
+        return groups[:limit]
+
+    def _groups(self, free, num_guests):
+        capacities = self.availability.capacities
+        free = set(free)
+        largest = sorted((capacities[table_id] for table_id in free), reverse=True)
+
+        def reachable(seats, size):
+            # Upper bound on seats after adding the largest remaining tables
+            return seats + sum(largest[:self.max_tables - size]) >= num_guests
+
+        if not reachable(0, 0):
+            return []
+
+        results = []
+        seen = set()
+        stack = [(frozenset([table_id]), capacities[table_id]) for table_id in free]
+        while stack:
+            group, seats = stack.pop()
+            neighbours = set()
+            for table_id in group:
+                neighbours |= self.adjacency.get(table_id, set())
+            for neighbour in (neighbours & free) - group:
+                grown = group | {neighbour}
+                if grown in seen:
+                    continue
+                seen.add(grown)
+                grown_seats = seats + capacities[neighbour]
+                if grown_seats >= num_guests:
+                    # Adding more tables to a group that fits only wastes seats
+                    results.append(Allocation(tuple(sorted(grown)), grown_seats))
+                elif len(grown) < self.max_tables and reachable(grown_seats, len(grown)):
+                    stack.append((grown, grown_seats))
+        return results
+
+def allocate(date, start, num_guests, user=None, limit=None):
+    """Ranked allocations for ``num_guests`` on ``date`` at ``start``"""
+    return Allocator.load(date, user=user).allocate(date, start, num_guests, limit)
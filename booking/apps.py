@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        # Connect the menu cache invalidation, booking event, availability
+        # version, waitlist and notification signals, and register the
+        # background jobs and the shared cache check
+        from . import caching, events, menu_cache, notifications, reminders, versions, waitlist  # noqa: F401
@@ -0,0 +1,48 @@
+"""
+Helpers for async views.
+
+Django 4.2 has no async ``login_required`` or ``get_object_or_404``.  The
+lazy ``request.user``, the session and the template context processors
+all touch the database, so they are resolved in a worker thread rather
+than on the event loop.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render
+
+# Templates can follow lazy relations, so they render in a worker thread
+arender = sync_to_async(render)
+
+def _is_authenticated(request):
+    # Resolving the user also loads the session, so the view can read
+    # session data afterwards without touching the database
+    return request.user.is_authenticated
+
+def async_login_required(view):
+    """``login_required`` for coroutine views"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not await sync_to_async(_is_authenticated)(request):
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """``LoginRequiredMixin`` for class-based views with async handlers"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not await sync_to_async(_is_authenticated)(request):
+            return self.handle_no_permission()
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
+
+async def aget_object_or_404(klass, **kwargs):
+    """``get_object_or_404`` using the async ORM"""
+    queryset = klass._default_manager.all() if hasattr(klass, '_default_manager') else klass
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
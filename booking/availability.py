@@ -0,0 +1,126 @@
+"""
+Slot-bitmap availability engine.
+
+Each table's day is an integer bitmap of half-hour slots: bit ``n`` covers
+the thirty minutes starting ``n * 30`` minutes after midnight.  A booking
+occupies every slot touched by ``[time, time + 2h)``, so "is this table
+free" becomes a single bitwise AND instead of per-booking time arithmetic.
+
+Occupied slots are read from ``SlotInventory``, which ``Booking.save``
+keeps in step with the bookings themselves.
+"""
+from collections import defaultdict
+from datetime import time as dt_time, timedelta
+
+from .models import SlotInventory, Table
+
+SLOT_MINUTES = 30
+BOOKING_DURATION = timedelta(hours=2)
+ACTIVE_STATUSES = ('PENDING', 'CONFIRMED')
+OPENING_TIME = dt_time(11, 0)
+LAST_SEATING = dt_time(22, 0)
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+def slot_index(value):
+    """Index of the half-hour slot containing ``value``"""
+    return _minutes(value) // SLOT_MINUTES
+
+def slot_time(index):
+    """Start time of the slot at ``index``"""
+    minutes = index * SLOT_MINUTES
+    return dt_time(minutes // 60, minutes % 60)
+
+def seating_times():
+    """Every bookable half-hour from opening to the last seating"""
+    return [
+        slot_time(index)
+        for index in range(slot_index(OPENING_TIME), slot_index(LAST_SEATING) + 1)
+    ]
+
+def booking_mask(start, duration=BOOKING_DURATION):
+    """Bitmap of the slots occupied by a booking starting at ``start``"""
+    first = _minutes(start) // SLOT_MINUTES
+    end = _minutes(start) + int(duration.total_seconds()) // 60
+    last = -(-end // SLOT_MINUTES)  # round up so partial slots count
+    return ((1 << (last - first)) - 1) << first
+
+def mask_slots(mask):
+    """Slot indexes set in ``mask``"""
+    return [index for index in range(mask.bit_length()) if mask >> index & 1]
+
+def occupancy(start_date, end_date=None, table_ids=None, min_capacity=None,
+              exclude_booking=None):
+    """
+    Return ``{(date, table_id): mask}`` for active bookings between
+    ``start_date`` and ``end_date`` inclusive, read from the slot inventory
+    in a single indexed query.
+    """
+    slots = SlotInventory.objects.all()
+    if end_date is None or end_date == start_date:
+        slots = slots.filter(date=start_date)
+    else:
+        slots = slots.filter(date__range=(start_date, end_date))
+    if table_ids is not None:
+        slots = slots.filter(table_id__in=table_ids)
+    if min_capacity is not None:
+        slots = slots.filter(table__capacity__gte=min_capacity)
+    if exclude_booking is not None:
+        slots = slots.exclude(booking_id=exclude_booking)
+
+    masks = defaultdict(int)
+    for date, table_id, slot in slots.values_list('date', 'table_id', 'slot'):
+        masks[(date, table_id)] |= 1 << slot
+    return dict(masks)
+
+def is_table_free(table_id, date, start, exclude_booking=None):
+    """Whether ``table_id`` has no active booking overlapping ``start`` on ``date``"""
+    taken = SlotInventory.objects.filter(
+        table_id=table_id,
+        date=date,
+        slot__in=mask_slots(booking_mask(start))
+    )
+    if exclude_booking is not None:
+        taken = taken.exclude(booking_id=exclude_booking)
+    return not taken.exists()
+
+class Availability:
+    """Occupancy bitmaps for the tables seating a party over a date range"""
+
+    def __init__(self, capacities, masks):
+        # {table_id: capacity} ordered by capacity, then table number
+        self.capacities = capacities
+        # {(date, table_id): mask}
+        self.masks = masks
+
+    @classmethod
+    def load(cls, start_date, end_date=None, num_guests=1, user=None):
+        """
+        Load bookings and slot holds for the range; holds placed by ``user``
+        do not count against them.
+        """
+        from .holds import held_masks
+
+        tables = Table.objects.filter(capacity__gte=num_guests).order_by('capacity', 'number')
+        capacities = dict(tables.values_list('id', 'capacity'))
+        masks = occupancy(start_date, end_date, min_capacity=num_guests)
+        for key, mask in held_masks(start_date, end_date, user=user).items():
+            masks[key] = masks.get(key, 0) | mask
+        return cls(capacities, masks)
+
+    def is_free(self, table_id, date, start):
+        return not self.masks.get((date, table_id), 0) & booking_mask(start)
+
+    def free_tables(self, date, start, num_guests=1):
+        """Ids of tables seating ``num_guests`` that are free for ``[start, start + 2h)``"""
+        mask = booking_mask(start)
+        return [
+            table_id for table_id, capacity in self.capacities.items()
+            if capacity >= num_guests and not self.masks.get((date, table_id), 0) & mask
+        ]
+
+def free_tables(date, start, num_guests, user=None):
+    """Ids of tables seating ``num_guests`` that are free on ``date`` at ``start``"""
+    availability = Availability.load(date, num_guests=num_guests, user=user)
+    return availability.free_tables(date, start, num_guests)
@@ -0,0 +1,32 @@
+"""
+Whether the default cache is shared between processes.
+
+The hold cache, the availability versions and the calendar change
+markers are only correct if every process sees the same cache.  The
+default ``LocMemCache`` is private to each process, so with it holds are
+read from the database on every check and availability and calendar
+responses carry no validators, which costs speed but never serves stale
+data.  Configure a shared cache (Redis, Memcached, the database or file
+cache) through ``CACHE_BACKEND`` to turn them on.
+"""
+from django.conf import settings
+from django.core import checks
+
+PER_PROCESS_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+def cache_is_shared():
+    return settings.CACHES['default']['BACKEND'] not in PER_PROCESS_BACKENDS
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if cache_is_shared():
+        return []
+    return [checks.Warning(
+        "The default cache is private to each process, so slot holds are read "
+        "from the database and availability and calendar responses carry no ETags.",
+        hint="Set CACHE_BACKEND to a shared cache such as Redis or Memcached.",
+        id='booking.W001',
+    )]
@@ -0,0 +1,132 @@
+"""
+Booking change feed for live staff dashboards.
+
+Booking saves and deletes publish a small delta once the transaction
+commits.  Each process fans deltas out to its connected dashboards from
+one subscription, so dozens of open dashboards cost one feed instead of
+a stream of polling queries.  ``LocalBroker`` keeps everything in
+process; a shared broker (e.g. Redis pub/sub) can be swapped in through
+``BOOKING_EVENT_BROKER`` by implementing the same ``publish`` and
+``subscribe`` methods.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .ical import mark_changed
+from .models import Booking
+from .versions import bump_dates
+
+BOOKINGS_CHANNEL = 'bookings'
+
+class Subscription:
+    """A queue of messages for one listener, bound to its event loop"""
+
+    MAX_PENDING = 1000
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.MAX_PENDING)
+
+    def deliver(self, message):
+        # Runs on the subscriber's loop; a listener that stopped reading
+        # loses messages rather than growing without bound
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class LocalBroker:
+    """In-process pub/sub, the local stand-in for a shared broker"""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        """Send ``message`` to every subscriber of ``channel``; safe from any thread"""
+        with self._lock:
+            subscriptions = list(self._subscriptions[channel])
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's event loop has shut down
+                self.unsubscribe(subscription)
+        return len(subscriptions)
+
+    def subscribe(self, channel):
+        """Subscribe the running event loop to ``channel``"""
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions[subscription.channel].discard(subscription)
+
+_broker = None
+_broker_lock = threading.Lock()
+
+def get_broker():
+    """The process-wide broker configured by ``BOOKING_EVENT_BROKER``"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.BOOKING_EVENT_BROKER)()
+        return _broker
+
+def booking_delta(booking, event):
+    return {
+        'event': event,
+        'id': booking.pk,
+        'date': booking.date.isoformat(),
+        'time': booking.time.strftime('%H:%M'),
+        'table': booking.table_id,
+        'num_guests': booking.num_guests,
+        'status': booking.status,
+        'customer': booking.customer_id,
+    }
+
+def publish_booking(booking, event):
+    delta = booking_delta(booking, event)
+    customer_id = booking.customer_id
+    # A booking moved to another day changes the availability of both
+    dates = {booking.date, getattr(booking, '_loaded_values', {}).get('date', booking.date)}
+    
+    def publish():
+        get_broker().publish(BOOKINGS_CHANNEL, delta)
+        # Every published change also moves the calendar feeds' change
+        # markers and the availability versions of its dates
+        mark_changed(customer_id)
+        bump_dates(dates)
+    transaction.on_commit(publish)
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, **kwargs):
+    if created:
+        event = 'created'
+    elif instance.status == 'CANCELLED':
+        event = 'cancelled'
+    else:
+        event = 'updated'
+    publish_booking(instance, event)
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    publish_booking(instance, 'deleted')
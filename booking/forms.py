@@ -1,7 +1,8 @@
 from django import forms
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Booking, Table
+from .models import Booking, Table, WaitlistEntry
+from .recurrence import MAX_OCCURRENCES
 
 class DateInput(forms.DateInput):
     input_type = 'date'
@@ -63,6 +64,53 @@ class BookingForm(forms.ModelForm):
         
         return num_guests
 
+class BookingSeriesForm(BookingForm):
+    """A booking repeated every few weeks; ``date`` is the first one"""
+    INTERVAL_CHOICES = ((1, 'Every week'), (2, 'Every two weeks'), (4, 'Every four weeks'))
+    
+    interval_weeks = forms.TypedChoiceField(choices=INTERVAL_CHOICES, coerce=int, initial=1, label='Repeat')
+    occurrences = forms.IntegerField(
+        min_value=2, max_value=MAX_OCCURRENCES, initial=12, label='Number of bookings'
+    )
+
+class SeriesMoveForm(forms.Form):
+    time = forms.TimeField(widget=TimeInput())
+    table = forms.ModelChoiceField(queryset=Table.objects.all(), required=False, empty_label='Same table')
+    
+    def clean_time(self):
+        return BookingForm.clean_time(self)
+
+class WaitlistForm(forms.ModelForm):
+    class Meta:
+        model = WaitlistEntry
+        fields = ('date', 'earliest_time', 'latest_time', 'num_guests')
+        widgets = {
+            'date': DateInput(),
+            'earliest_time': TimeInput(),
+            'latest_time': TimeInput(),
+        }
+        labels = {
+            'earliest_time': 'From',
+            'latest_time': 'Until',
+        }
+    
+    def clean_date(self):
+        date = self.cleaned_data.get('date')
+        if date < timezone.now().date():
+            raise forms.ValidationError("You cannot join the waitlist for a past date")
+        return date
+    
+    def clean_num_guests(self):
+        return BookingForm.clean_num_guests(self)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        earliest = cleaned_data.get('earliest_time')
+        latest = cleaned_data.get('latest_time')
+        if earliest and latest and earliest > latest:
+            raise forms.ValidationError("The window must not end before it starts")
+        return cleaned_data
+
 class AvailabilitySearchForm(forms.Form):
     date = forms.DateField(widget=DateInput())
     time = forms.TimeField(widget=TimeInput())
@@ -76,4 +124,43 @@ class AvailabilitySearchForm(forms.Form):
         
         # Set time constraints
         self.fields['time'].widget.attrs['min'] = '11:00'
-        self.fields['time'].widget.attrs['max'] = '22:00'
\ No newline at end of file
+        self.fields['time'].widget.attrs['max'] = '22:00'
+
+class AvailabilityApiForm(forms.Form):
+    date = forms.DateField()
+    num_guests = forms.IntegerField(min_value=1, max_value=20)
+    
+    def clean_date(self):
+        date = self.cleaned_data['date']
+        if date < timezone.now().date():
+            raise forms.ValidationError("Availability cannot be checked for past dates")
+        return date
+
+class AvailabilityGridForm(forms.Form):
+    start = forms.DateField()
+    end = forms.DateField(required=False)
+    num_guests = forms.IntegerField(min_value=1, max_value=20)
+    include_tables = forms.BooleanField(required=False)
+    
+    MAX_DAYS = 31
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('start')
+        end = cleaned_data.get('end')
+        
+        if start is None:
+            return cleaned_data
+        
+        # Default to a one-week grid
+        if end is None:
+            end = start + timedelta(days=6)
+            cleaned_data['end'] = end
+        
+        if end < start:
+            raise forms.ValidationError("The end date must not be before the start date")
+        
+        if (end - start).days >= self.MAX_DAYS:
+            raise forms.ValidationError(f"The grid can span at most {self.MAX_DAYS} days")
+        
+        return cleaned_data
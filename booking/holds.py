@@ -0,0 +1,143 @@
+"""
+Short-lived slot holds.
+
+A guest who picks a table from the availability results holds it for
+``BOOKING_HOLD_TTL`` seconds while they fill in the booking form, and
+other guests' searches treat the held slots as taken.  A waitlist offer
+is a longer hold of its own, kept per entry, so a guest may hold a
+table from the booking form and several offers at once.
+
+Each hold claims its half-hour slots as ``HeldSlot`` rows, whose unique
+``(table, date, slot)`` constraint settles races between guests: of two
+overlapping holds placed at once, the second insert fails.  Placing a
+hold writes before it reads, so on SQLite it queues for the write lock
+instead of failing to upgrade a read lock.
+
+With a shared cache (see ``booking.caching``) each date's holds are
+cached, so searches usually read them without a query; with a
+per-process cache they are read from the database, since another
+process's holds would never invalidate it.  Expired holds are ignored
+on read and swept whenever a new hold is placed.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .availability import booking_mask, mask_slots
+from .caching import cache_is_shared
+from .models import HeldSlot, SlotHold
+
+def _cache_key(date):
+    return f'booking:holds:{date.isoformat()}'
+
+def _load_holds(dates):
+    """Return ``{date: [(table_id, user_id, mask, expires), ...]}`` for ``dates``"""
+    use_cache = cache_is_shared()
+    holds = {}
+    if use_cache:
+        keys = {_cache_key(date): date for date in dates}
+        cached = cache.get_many(keys)
+        holds = {keys[key]: value for key, value in cached.items()}
+
+    missing = [date for date in dates if date not in holds]
+    if missing:
+        loaded = {date: [] for date in missing}
+        rows = SlotHold.objects.filter(
+            date__in=missing,
+            expires_at__gt=timezone.now()
+        ).values_list('date', 'table_id', 'user_id', 'time', 'expires_at')
+        for date, table_id, user_id, start, expires_at in rows:
+            loaded[date].append((table_id, user_id, booking_mask(start), expires_at.timestamp()))
+        if use_cache:
+            cache.set_many(
+                {_cache_key(date): value for date, value in loaded.items()},
+                settings.BOOKING_HOLD_TTL
+            )
+        holds.update(loaded)
+
+    return holds
+
+def _forget(dates):
+    if dates and cache_is_shared():
+        cache.delete_many([_cache_key(date) for date in dates])
+
+def held_masks(start_date, end_date=None, user=None):
+    """
+    Return ``{(date, table_id): mask}`` of unexpired holds between
+    ``start_date`` and ``end_date`` inclusive, ignoring holds owned by
+    ``user``.
+    """
+    end_date = end_date or start_date
+    dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    user_id = user.pk if user is not None else None
+    now = timezone.now().timestamp()
+
+    masks = defaultdict(int)
+    for date, holds in _load_holds(dates).items():
+        for table_id, holder_id, mask, expires in holds:
+            if expires > now and holder_id != user_id:
+                masks[(date, table_id)] |= mask
+    return dict(masks)
+
+def is_held_by_other(user, table_id, date, start):
+    """Whether someone other than ``user`` holds a slot overlapping ``start``"""
+    return bool(held_masks(date, user=user).get((date, table_id), 0) & booking_mask(start))
+
+def place_hold(user, table_id, date, start, ttl=None, entry=None):
+    """
+    Hold ``table_id`` for ``user`` for ``ttl`` seconds (``BOOKING_HOLD_TTL``).
+    The hold replaces the one ``user`` already had from the booking form,
+    or for waitlist ``entry`` if given, and any of their own holds it
+    overlaps.  Returns the new hold, or ``None`` if another guest holds
+    the slot.
+    """
+    # A friendly early answer; the slot constraint has the final word
+    if is_held_by_other(user, table_id, date, start):
+        return None
+
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=ttl or settings.BOOKING_HOLD_TTL)
+    slots = mask_slots(booking_mask(start))
+    try:
+        with transaction.atomic():
+            # A write first: it takes SQLite's write lock, waiting for it if
+            # need be, where a transaction that read first would fail to
+            # upgrade.  Expired slots are already invisible to readers, so
+            # sweeping them needs no cache invalidation.
+            HeldSlot.objects.filter(expires_at__lte=now).delete()
+            SlotHold.objects.filter(expires_at__lte=now).delete()
+
+            overlapping = Q(slots__table_id=table_id, slots__date=date, slots__slot__in=slots)
+            replaced = SlotHold.objects.filter(Q(entry=entry) | overlapping, user=user)
+            previous_dates = set(replaced.values_list('date', flat=True))
+            replaced.delete()
+
+            hold = SlotHold.objects.create(
+                user=user, table_id=table_id, date=date, time=start, expires_at=expires_at, entry=entry
+            )
+            HeldSlot.objects.bulk_create([
+                HeldSlot(hold=hold, table_id=table_id, date=date, slot=slot, expires_at=expires_at)
+                for slot in slots
+            ])
+    except IntegrityError:
+        # Another guest's hold on one of the slots was committed first
+        return None
+    _forget(previous_dates | {date})
+    return hold
+
+def release_holds(user, entry=None, date=None):
+    """
+    Drop the hold ``user`` has from the booking form, or the one for
+    waitlist ``entry``; with ``date``, also every offer they hold that day
+    """
+    holds = SlotHold.objects.filter(user=user)
+    holds = holds.filter(Q(entry=entry) | Q(date=date)) if date else holds.filter(entry=entry)
+    dates = set(holds.values_list('date', flat=True))
+    if dates:
+        holds.delete()
+        _forget(dates)
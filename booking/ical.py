@@ -0,0 +1,145 @@
+"""
+iCalendar feeds of bookings.
+
+Each guest has a feed of their own bookings and staff have a feed of the
+whole floor.  Calendar apps cannot sign in, so a feed's URL carries a
+signed token naming its user and their profile's ``calendar_nonce``;
+rotating the nonce revokes every link handed out before.  Every booking
+change that is committed moves a change marker (a timestamp in the
+cache) for its guest and one for the whole floor.  The ETag and
+Last-Modified of a feed come from its marker and the token alone, so
+the usual poll from a calendar app is answered with a 304 without
+reading any rows; otherwise the nonce is checked and the feed is
+streamed from a chunked query.  Bookings change in other processes too,
+so the markers are only trusted in a shared cache: with a per-process
+one, feeds are always sent in full.
+"""
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from .availability import ACTIVE_STATUSES, BOOKING_DURATION
+from .caching import cache_is_shared
+from .models import Booking
+
+GUEST_SALT = 'booking.ical.guest'
+STAFF_SALT = 'booking.ical.staff'
+# Bookings further back than this are left out of the feeds
+HISTORY = timedelta(days=90)
+CHUNK_SIZE = 500
+
+def _marker_key(user_id=None):
+    return 'ical:changed:all' if user_id is None else f'ical:changed:user:{user_id}'
+
+def changed_at(user_id=None):
+    """When the user's bookings (or any, with no user) last changed, as a timestamp"""
+    key = _marker_key(user_id)
+    marker = cache.get(key)
+    if marker is None:
+        # The cache lost it: start afresh, so clients fetch the feed once more
+        cache.add(key, time.time(), None)
+        marker = cache.get(key)
+    return marker
+
+def mark_changed(*customer_ids):
+    """Move the guests' and the floor's markers; call once the change is committed"""
+    now = time.time()
+    cache.set_many({_marker_key(customer_id): now for customer_id in (*customer_ids, None)}, None)
+
+def feed_token(user, staff=False):
+    value = f'{user.pk}:{user.profile.calendar_nonce}'
+    return signing.Signer(salt=STAFF_SALT if staff else GUEST_SALT).sign(value)
+
+def token_claims(token, staff=False):
+    """``(user_id, nonce)`` from a token, or None if it is not genuine"""
+    try:
+        user_id, nonce = signing.Signer(salt=STAFF_SALT if staff else GUEST_SALT).unsign(token).split(':')
+        return int(user_id), nonce
+    except (signing.BadSignature, ValueError):
+        return None
+
+def token_user_id(token, staff=False):
+    """The id of the user a token was issued to, or None if it is not genuine"""
+    claims = token_claims(token, staff)
+    return claims[0] if claims else None
+
+def feed_etag(user_id=None):
+    if not cache_is_shared():
+        return None
+    return f'"{user_id or "all"}-{int(changed_at(user_id) * 1000)}"'
+
+def feed_last_modified(user_id=None):
+    if not cache_is_shared():
+        return None
+    return datetime.fromtimestamp(changed_at(user_id), tz=dt_timezone.utc)
+
+def feed_url(request, user, staff=False):
+    name = 'staff_calendar_feed' if staff else 'calendar_feed'
+    return request.build_absolute_uri(reverse(name, args=[feed_token(user, staff)]))
+
+def _escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+def _fold(line):
+    # Content lines are at most 75 octets; longer ones continue after CRLF and a space
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        cut = min(len(encoded), 75 if not parts else 74)
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    return '\r\n '.join(parts) + '\r\n'
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+def vevent(booking, staff=False):
+    start = timezone.make_aware(datetime.combine(booking.date, booking.time))
+    if staff:
+        summary = f"Table {booking.table.number}: {booking.customer.get_full_name() or booking.customer.username}"
+    else:
+        summary = f"Table for {booking.num_guests}"
+    details = f"{booking.num_guests} guest(s) at table {booking.table.number}"
+    if booking.special_requests:
+        details += f"\n{booking.special_requests}"
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:booking-{booking.pk}@{settings.SITE_URL.split('://')[-1]}",
+        f"DTSTAMP:{_utc(booking.updated_at)}",
+        f"DTSTART:{_utc(start)}",
+        f"DTEND:{_utc(start + BOOKING_DURATION)}",
+        f"SUMMARY:{_escape(summary)}",
+        f"DESCRIPTION:{_escape(details)}",
+        f"URL:{settings.SITE_URL}{booking.get_absolute_url()}",
+        f"STATUS:{'CONFIRMED' if booking.status == 'CONFIRMED' else 'TENTATIVE'}",
+        'END:VEVENT',
+    ]
+    return ''.join(_fold(line) for line in lines)
+
+def feed_bookings(user_id=None):
+    since = timezone.localdate() - HISTORY
+    bookings = Booking.objects.filter(date__gte=since, status__in=ACTIVE_STATUSES)
+    if user_id is not None:
+        bookings = bookings.filter(customer_id=user_id)
+    return bookings.select_related('customer', 'table').order_by('date', 'time', 'id')
+
+def stream_feed(bookings, name, staff=False):
+    """The feed's text, a few lines at a time, fetching rows in chunks as it goes"""
+    yield _fold('BEGIN:VCALENDAR') + _fold('VERSION:2.0') + _fold('PRODID:-//Restaurant Booking System//EN')
+    yield _fold(f'X-WR-CALNAME:{_escape(name)}') + _fold('METHOD:PUBLISH')
+    for booking in bookings.iterator(chunk_size=CHUNK_SIZE):
+        yield vevent(booking, staff)
+    yield _fold('END:VCALENDAR')
@@ -0,0 +1,133 @@
+"""
+Background jobs.
+
+Work a request should not wait for, sending email above all, is queued
+as a ``Job`` row by ``enqueue()``.  The row is written in the same
+transaction as the change that called for it, so a booking that rolls
+back sends no confirmation, and a queued job survives restarts.  The
+``run_jobs`` command claims due jobs and runs them on a thread pool.  A
+job that raises is retried with exponential backoff until it has had
+``JOB_MAX_ATTEMPTS`` attempts, then kept as failed for inspection.
+
+Jobs are plain functions registered with ``@job``; their arguments must
+be JSON serializable, so pass ids and rendered text rather than models.
+"""
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+def job(func):
+    """Register ``func`` so that it can be enqueued"""
+    func.job_name = f'{func.__module__}.{func.__name__}'
+    _registry[func.job_name] = func
+    return func
+
+def enqueue(func, *args, **kwargs):
+    """Queue a call of the registered job ``func``; returns the ``Job``"""
+    if _registry.get(getattr(func, 'job_name', None)) is not func:
+        raise ValueError(f"{func!r} is not a registered job")
+    return Job.objects.create(
+        name=func.job_name, args=list(args), kwargs=kwargs, max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+
+def retry_delay(attempts):
+    """Seconds before attempt ``attempts + 1``: doubling each time, capped, with jitter"""
+    delay = min(settings.JOB_RETRY_DELAY * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_DELAY)
+    # Spread out retries of jobs that failed together, e.g. when the mail server was down
+    return delay * random.uniform(1, 1.25)
+
+def claim(limit, now=None):
+    """Mark up to ``limit`` due jobs as running and return them"""
+    now = now or timezone.now()
+    due = Job.objects.filter(status='QUEUED', run_at__lte=now).order_by('run_at', 'id')
+    claimed = []
+    for pk in due.values_list('pk', flat=True)[:limit]:
+        # Only one worker's update can match while the job is still queued;
+        # this works the same on every backend, unlike SKIP LOCKED
+        if Job.objects.filter(pk=pk, status='QUEUED').update(
+            status='RUNNING', locked_at=now, attempts=F('attempts') + 1
+        ):
+            claimed.append(pk)
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_at', 'id'))
+
+def run_job(job):
+    """Run a claimed job and record whether it succeeded; returns True if it did"""
+    func = _registry.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f"no job named {job.name!r}")
+        func(*job.args, **job.kwargs)
+    except Exception as e:
+        logger.exception('Job %s (%s) failed on attempt %s', job.pk, job.name, job.attempts)
+        _failed(job, e)
+        return False
+    Job.objects.filter(pk=job.pk).update(status='DONE', locked_at=None, last_error='')
+    return True
+
+def _failed(job, error):
+    error = f"{type(error).__name__}: {error}"
+    if job.attempts >= job.max_attempts:
+        Job.objects.filter(pk=job.pk).update(status='FAILED', locked_at=None, last_error=error)
+    else:
+        run_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        Job.objects.filter(pk=job.pk).update(status='QUEUED', locked_at=None, run_at=run_at, last_error=error)
+
+def requeue_stale(now=None):
+    """
+    Queue again jobs left running longer than ``JOB_TIMEOUT`` by a worker
+    that died; returns how many
+    """
+    now = now or timezone.now()
+    stale = Job.objects.filter(status='RUNNING', locked_at__lt=now - timedelta(seconds=settings.JOB_TIMEOUT))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='FAILED', locked_at=None, last_error='Timed out'
+    )
+    return failed + stale.update(status='QUEUED', locked_at=None, run_at=now, last_error='Timed out')
+
+def purge_done(days):
+    """Delete jobs that succeeded over ``days`` days ago; returns how many"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status='DONE', run_at__lt=cutoff).delete()
+    return deleted
+
+def run_due(limit=100):
+    """Run due jobs one after another in this thread; returns how many ran"""
+    jobs = claim(limit)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+class Worker:
+    """Runs due jobs on a pool of threads, each with its own database connection"""
+
+    def __init__(self, threads=4):
+        self.threads = threads
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='jobs')
+
+    def _run(self, job):
+        close_old_connections()
+        try:
+            return run_job(job)
+        finally:
+            close_old_connections()
+
+    def run_due(self):
+        """Claim a batch of due jobs, one per thread, and run them; returns how many ran"""
+        jobs = claim(self.threads)
+        list(self.pool.map(self._run, jobs))
+        return len(jobs)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
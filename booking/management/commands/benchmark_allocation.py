@@ -0,0 +1,116 @@
+import random
+import statistics
+import time as timer
+from collections import defaultdict
+from datetime import date as dt_date
+
+from django.core.management.base import BaseCommand
+
+from booking.allocation import Allocation, Allocator
+from booking.availability import Availability, booking_mask, seating_times, slot_index, LAST_SEATING, OPENING_TIME
+from booking.seeding import PARTY_SIZES, PARTY_WEIGHTS, ROW_CAPACITIES, seating_weights
+
+class FirstFitAllocator(Allocator):
+    """The old behaviour: any free table that is big enough, lowest number first"""
+
+    def allocate(self, date, start, num_guests, limit=None):
+        free = self.availability.free_tables(date, start)
+        capacities = self.availability.capacities
+        return [
+            Allocation((table_id,), capacities[table_id])
+            for table_id in sorted(free) if capacities[table_id] >= num_guests
+        ][:limit]
+
+class Command(BaseCommand):
+    help = 'Benchmark table allocation latency and seat utilization on a synthetic Saturday'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables', type=int, default=300, help='Number of tables on the floor')
+        parser.add_argument('--parties', type=int, default=3000, help='Number of booking requests')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        capacities, adjacency = self.build_floor(options['tables'])
+        requests = self.build_requests(options['parties'], random.Random(options['seed']))
+        total_seats = sum(capacities.values())
+        self.stdout.write(
+            f"{len(capacities)} tables, {total_seats} seats, {len(requests)} requests"
+        )
+
+        for name, allocator_class in (('first-fit', FirstFitAllocator), ('best-fit', Allocator)):
+            stats = self.simulate(allocator_class, capacities, adjacency, requests)
+            self.report(name, stats, total_seats)
+
+    def build_floor(self, num_tables):
+        capacities = {}
+        adjacency = defaultdict(set)
+        for table_id in range(1, num_tables + 1):
+            capacities[table_id] = ROW_CAPACITIES[(table_id - 1) % len(ROW_CAPACITIES)]
+            if (table_id - 1) % len(ROW_CAPACITIES):
+                adjacency[table_id].add(table_id - 1)
+                adjacency[table_id - 1].add(table_id)
+        # Availability expects tables ordered by capacity
+        capacities = dict(sorted(capacities.items(), key=lambda item: (item[1], item[0])))
+        return capacities, adjacency
+
+    def build_requests(self, num_parties, rng):
+        times = seating_times()
+        weights = seating_weights()
+        return [
+            (rng.choices(times, weights)[0], rng.choices(PARTY_SIZES, PARTY_WEIGHTS)[0])
+            for _ in range(num_parties)
+        ]
+
+    def simulate(self, allocator_class, capacities, adjacency, requests):
+        day = dt_date(2025, 1, 4)
+        allocator = allocator_class(Availability(capacities, {}), adjacency)
+        masks = allocator.availability.masks
+        latencies = []
+        seated_parties = seated_covers = occupied_seat_slots = joined = 0
+
+        for start, num_guests in requests:
+            started = timer.perf_counter()
+            allocations = allocator.allocate(day, start, num_guests, limit=1)
+            latencies.append(timer.perf_counter() - started)
+            if not allocations:
+                continue
+
+            table_ids = allocations[0].table_ids
+            mask = booking_mask(start)
+            for table_id in table_ids:
+                masks[(day, table_id)] = masks.get((day, table_id), 0) | mask
+                occupied_seat_slots += capacities[table_id] * bin(mask).count('1')
+            seated_parties += 1
+            seated_covers += num_guests
+            joined += len(table_ids) > 1
+
+        return {
+            'requests': len(requests),
+            'seated_parties': seated_parties,
+            'seated_covers': seated_covers,
+            'demanded_covers': sum(num_guests for _, num_guests in requests),
+            'joined': joined,
+            'occupied_seat_slots': occupied_seat_slots,
+            'latencies': latencies,
+        }
+
+    def report(self, name, stats, total_seats):
+        latencies = sorted(stats['latencies'])
+        booking_slots = bin(booking_mask(OPENING_TIME)).count('1')
+        open_slots = slot_index(LAST_SEATING) - slot_index(OPENING_TIME) + booking_slots
+        cover_slots = stats['seated_covers'] * booking_slots
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(
+            f"  seated {stats['seated_parties']}/{stats['requests']} parties "
+            f"({stats['joined']} on joined tables), "
+            f"{stats['seated_covers']}/{stats['demanded_covers']} covers"
+        )
+        self.stdout.write(
+            f"  seat utilization {cover_slots / (total_seats * open_slots):.1%} of the day, "
+            f"{cover_slots / max(stats['occupied_seat_slots'], 1):.1%} of occupied seats filled"
+        )
+        self.stdout.write(
+            f"  latency p50 {statistics.median(latencies) * 1e6:.0f}us, "
+            f"p95 {latencies[int(len(latencies) * 0.95)] * 1e6:.0f}us, "
+            f"max {latencies[-1] * 1e6:.0f}us"
+        )
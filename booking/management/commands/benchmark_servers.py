@@ -0,0 +1,249 @@
+import asyncio
+import random
+import statistics
+import threading
+import time as timer
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+)
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from booking.availability import seating_times
+from booking.models import Booking, Table
+
+GUEST = 'benchmark-guest'
+FILLER = 'benchmark-filler'
+
+class Command(BaseCommand):
+    help = (
+        'Compare WSGI and ASGI throughput for the availability and booking views '
+        'on a synthetic dataset in a throwaway database, with simulated database latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables', type=int, default=60, help='Number of synthetic tables')
+        parser.add_argument('--bookings', type=int, default=400, help='Number of synthetic bookings')
+        parser.add_argument('--requests', type=int, default=300, help='Requests per server')
+        parser.add_argument('--concurrency', type=int, default=50, help='Clients sending requests at once')
+        parser.add_argument('--workers', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument('--db-latency', type=float, default=10, help='Milliseconds added to every query')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Sessions live in the cache so SQLite write locks on the session
+        # table do not dominate the comparison, and one guest sending every
+        # request must not be throttled
+        setup_test_environment(debug=False)
+        databases = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache', RATE_LIMITS={}):
+                guest = self.build_dataset(options['tables'], options['bookings'], rng)
+                self.run(guest, options, rng)
+        finally:
+            teardown_databases(databases, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+    def build_dataset(self, num_tables, num_bookings, rng):
+        # A kept database still holds the last run's tables and bookings
+        Table.objects.all().delete()
+        guest, _ = User.objects.get_or_create(username=GUEST)
+        filler, _ = User.objects.get_or_create(username=FILLER)
+        tables = Table.objects.bulk_create(
+            Table(number=i + 1, capacity=rng.choice([2, 2, 4, 4, 6, 8])) for i in range(num_tables)
+        )
+        self.date = timezone.now().date() + timedelta(days=30)
+        times = seating_times()
+        created = 0
+        for i in range(num_bookings):
+            table = rng.choice(tables)
+            booking = Booking(
+                customer=guest if i % 20 == 0 else filler,
+                table=table,
+                date=self.date,
+                time=rng.choice(times),
+                num_guests=rng.randint(1, table.capacity),
+                status='CONFIRMED',
+            )
+            try:
+                booking.save()
+                created += 1
+            except ValidationError:
+                pass  # Slot already taken
+
+        self.bookings = list(guest.bookings.values_list('pk', flat=True))
+        self.stdout.write(f"{num_tables} tables, {created} bookings on {self.date}")
+        return guest
+
+    def run(self, guest, options, rng):
+        session = SessionStore()
+        session[SESSION_KEY] = str(guest.pk)
+        # A backend missing from the settings would log the guest straight out
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = guest.get_session_auth_hash()
+        session.save()
+        self.csrf_token = get_random_string(32)
+        self.cookie = f'sessionid={session.session_key}; csrftoken={self.csrf_token}'
+        workload = self.build_workload(options['requests'], rng)
+
+        latency = options['db_latency'] / 1000
+
+        def slow_query(execute, sql, params, many, context):
+            timer.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            connection.execute_wrappers.append(slow_query)
+
+        # Connections opened by the servers' threads get the extra latency
+        connection.close()
+        connection_created.connect(add_latency)
+        try:
+            wsgi = self.run_wsgi(workload, options['concurrency'], options['workers'])
+            asgi = asyncio.run(self.run_asgi(workload, options['concurrency']))
+        finally:
+            connection_created.disconnect(add_latency)
+
+        self.report(f"WSGI ({options['workers']} worker threads)", wsgi)
+        # The event loop only parses and routes; ORM calls still run in
+        # sync_to_async's thread pool
+        self.report('ASGI (event loop, ORM in sync_to_async threads)', asgi)
+        self.stdout.write(f"ASGI/WSGI throughput: {asgi['throughput'] / wsgi['throughput']:.2f}x")
+
+    def build_workload(self, num_requests, rng):
+        # Mostly searches, the slow-DB path, with some list and detail views.
+        # Parties fit the synthetic tables, so every search finds one
+        times = seating_times()
+        workload = []
+        for _ in range(num_requests):
+            kind = rng.choices(['search', 'list', 'detail'], [6, 2, 2])[0]
+            if kind == 'search':
+                body = urlencode({
+                    'date': self.date.isoformat(),
+                    'time': rng.choice(times).strftime('%H:%M'),
+                    'num_guests': rng.choice([2, 2, 4, 4, 6]),
+                }).encode()
+                workload.append(('POST', reverse('search_availability'), body))
+            elif kind == 'list' or not self.bookings:
+                workload.append(('GET', reverse('bookings'), b''))
+            else:
+                workload.append(('GET', reverse('booking-detail', args=[rng.choice(self.bookings)]), b''))
+        return workload
+
+    def headers(self, body):
+        headers = {'COOKIE': self.cookie, 'X_CSRFTOKEN': self.csrf_token}
+        if body:
+            headers['CONTENT_TYPE'] = 'application/x-www-form-urlencoded'
+            headers['CONTENT_LENGTH'] = str(len(body))
+        return headers
+
+    def run_wsgi(self, workload, concurrency, workers):
+        handler = WSGIHandler()
+        # A threaded WSGI server: each request holds a worker for its whole duration
+        worker_slots = threading.Semaphore(workers)
+        statuses = []
+
+        def request(method, path, body):
+            started = timer.perf_counter()
+            with worker_slots:
+                environ = {'REQUEST_METHOD': method, 'PATH_INFO': path, 'SERVER_NAME': '127.0.0.1'}
+                for name, value in self.headers(body).items():
+                    key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+                    environ[key] = value
+                setup_testing_defaults(environ)
+                environ['wsgi.input'].write(body)
+                environ['wsgi.input'].seek(0)
+                response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+                b''.join(response)
+                response.close()
+            return timer.perf_counter() - started
+
+        started = timer.perf_counter()
+        with ThreadPoolExecutor(concurrency) as clients:
+            latencies = list(clients.map(lambda item: request(*item), workload))
+        return self.stats(latencies, timer.perf_counter() - started, statuses)
+
+    async def run_asgi(self, workload, concurrency):
+        handler = ASGIHandler()
+        clients = asyncio.Semaphore(concurrency)
+        statuses = []
+
+        async def request(method, path, body):
+            async with clients:
+                started = timer.perf_counter()
+                headers = [(b'host', b'127.0.0.1')] + [
+                    (name.lower().replace('_', '-').encode(), value.encode())
+                    for name, value in self.headers(body).items()
+                ]
+                scope = {
+                    'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                    'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                    'query_string': b'', 'root_path': '', 'headers': headers,
+                    'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 80),
+                }
+                messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+                disconnected = asyncio.Event()
+
+                async def receive():
+                    if messages:
+                        return messages.pop()
+                    await disconnected.wait()
+                    return {'type': 'http.disconnect'}
+
+                async def send(message):
+                    if message['type'] == 'http.response.start':
+                        statuses.append(message['status'])
+
+                await handler(scope, receive, send)
+                disconnected.set()
+                return timer.perf_counter() - started
+
+        started = timer.perf_counter()
+        latencies = await asyncio.gather(*(request(*item) for item in workload))
+        return self.stats(latencies, timer.perf_counter() - started, statuses)
+
+    def stats(self, latencies, elapsed, statuses):
+        latencies = sorted(latencies)
+        # Every request in the workload should render its page; a redirect
+        # means a lost session or an empty search and is as wrong as a 500
+        codes = Counter(int(str(status).split()[0]) for status in statuses)
+        errors = sum(count for code, count in codes.items() if code != 200)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'statuses': {code: count for code, count in sorted(codes.items()) if code != 200},
+            'throughput': len(latencies) / elapsed,
+            'p50': statistics.median(latencies),
+            'p95': latencies[int(len(latencies) * 0.95)],
+        }
+
+    def report(self, name, stats):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(
+            f"  {stats['requests']} requests, {stats['errors']} errors, "
+            f"{stats['throughput']:.1f} req/s, "
+            f"p50 {stats['p50'] * 1000:.0f}ms, p95 {stats['p95'] * 1000:.0f}ms"
+        )
+        if stats['statuses']:
+            self.stdout.write(
+                '  errors by status: ' + ', '.join(f'{code}: {count}' for code, count in stats['statuses'].items())
+            )
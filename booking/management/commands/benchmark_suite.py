@@ -0,0 +1,175 @@
+import json
+import math
+import platform
+import statistics
+import time as timer
+from datetime import time as dt_time, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.allocation import allocate
+from booking.availability import is_table_free
+from booking.models import Booking
+from booking.querycount import QueryCounter
+from booking.seeding import flush_seed_data, seed_bookings, seed_tables, seed_users
+
+SCALES = '1000,100000,1000000'
+DAYS = 90
+# Timings below this many milliseconds are noise, whatever the tolerance
+MIN_SLACK_MS = 1.0
+
+class Command(BaseCommand):
+    help = (
+        'Time the hot views and the overlap check on seeded data at several '
+        'scales, in a throwaway test database, and fail when a result is '
+        'slower or runs more queries than the stored baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default=SCALES, help='Comma-separated booking counts')
+        parser.add_argument('--repeat', type=int, default=15, help='Timed runs per benchmark; the median is kept')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown, 0.25 for 25%%')
+        parser.add_argument(
+            '--baseline', default=Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json',
+            help='Baseline file to compare with or save to'
+        )
+        parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        scales = [int(scale) for scale in options['scales'].split(',')]
+        self.repeat = options['repeat']
+
+        setup_test_environment(debug=False)
+        databases = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            results = {str(scale): self.run_scale(scale, options['seed']) for scale in scales}
+        finally:
+            teardown_databases(databases, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        path = Path(options['baseline'])
+        if options['save_baseline']:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            baseline = json.loads(path.read_text()) if path.exists() else {'scales': {}}
+            baseline['scales'].update(results)
+            baseline['machine'] = f"{platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+            path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {path}"))
+            return
+
+        if not path.exists():
+            raise CommandError(f"No baseline at {path}; run with --save-baseline first")
+        regressions = self.regressions(results, json.loads(path.read_text())['scales'], options['tolerance'])
+        for regression in regressions:
+            self.stderr.write(regression)
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark(s) regressed beyond the baseline")
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def regressions(self, results, baseline, tolerance):
+        """Messages for every result slower or heavier than its baseline"""
+        messages = []
+        for scale, benchmarks in results.items():
+            for name, result in benchmarks.items():
+                expected = baseline.get(scale, {}).get(name)
+                if expected is None:
+                    continue
+                limit = expected['ms'] * (1 + tolerance) + MIN_SLACK_MS
+                if result['ms'] > limit:
+                    messages.append(
+                        f"{name} at {scale} bookings: {result['ms']:.2f}ms, baseline {expected['ms']:.2f}ms"
+                    )
+                if result['queries'] > expected['queries']:
+                    messages.append(
+                        f"{name} at {scale} bookings: {result['queries']} queries, baseline {expected['queries']}"
+                    )
+        return messages
+
+    def run_scale(self, scale, seed):
+        started = timer.perf_counter()
+        flush_seed_data()
+        cache.clear()
+        # About two bookings per table per day and twenty per guest
+        tables = seed_tables(max(20, math.ceil(scale / (DAYS * 2))))
+        guests, (staff,) = seed_users(max(50, scale // 20), staff=1)
+        start = timezone.now().date() - timedelta(days=DAYS // 2)
+        created = seed_bookings(tables, [guest.pk for guest in guests], scale, start, days=DAYS, seed=seed)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{created} bookings, {len(tables)} tables, {len(guests)} guests "
+            f"(seeded in {timer.perf_counter() - started:.1f}s)"
+        ))
+
+        # The busiest upcoming day, and a table that is free for lunch on it
+        date = Booking.objects.filter(date__gt=timezone.now().date()).values('date').annotate(
+            bookings=Count('id')
+        ).order_by('-bookings').values_list('date', flat=True).first()
+        lunch = dt_time(11, 0)
+        table_id = allocate(date, lunch, 2, limit=1)[0].table_ids[0]
+
+        # The first guest is the most regular, with the longest booking list
+        guest = Client()
+        guest.force_login(guests[0])
+        manager = Client()
+        manager.force_login(staff)
+
+        session = guest.session
+        session['booking_date'] = date.isoformat()
+        session['booking_time'] = lunch.isoformat()
+        session['booking_num_guests'] = 2
+        session.save()
+        booking_form = {'date': date, 'time': '11:00', 'num_guests': 2}
+        create_url = reverse('create_booking', args=[table_id])
+
+        def create_booking():
+            # Roll back so every run books the same free table
+            with transaction.atomic():
+                response = guest.post(create_url, booking_form)
+                transaction.set_rollback(True)
+            return response
+
+        # Each request with the status it must answer; anything else, a
+        # redirect to the login page included, fails the run
+        benchmarks = {
+            'search_availability': (lambda: guest.post(
+                reverse('search_availability'), {'date': date, 'time': '11:00', 'num_guests': 2}
+            ), 200),
+            'create_booking_form': (lambda: guest.get(create_url), 200),
+            'create_booking': (create_booking, 302),
+            'booking_list': (lambda: guest.get(reverse('bookings')), 200),
+            'staff_dashboard': (lambda: manager.get(reverse('staff_dashboard')), 200),
+            'overlap_check': (lambda: is_table_free(table_id, date, dt_time(19, 30)), None),
+        }
+        results = {}
+        for name, (run, status) in benchmarks.items():
+            results[name] = self.measure(name, run, status)
+            self.stdout.write(
+                f"  {name:<22} {results[name]['ms']:>9.2f}ms {results[name]['queries']:>4} queries"
+            )
+        return results
+
+    def measure(self, name, run, status=None):
+        timings = []
+        # The first run warms up and is not timed; caches are cleared so
+        # each run does the full database work
+        for attempt in range(self.repeat + 1):
+            cache.clear()
+            with QueryCounter() as counter:
+                started = timer.perf_counter()
+                response = run()
+                elapsed = (timer.perf_counter() - started) * 1000
+            if status is not None and response.status_code != status:
+                raise CommandError(f"{name} answered {response.status_code} instead of {status}")
+            if attempt:
+                timings.append(elapsed)
+        return {'ms': round(statistics.median(timings), 3), 'queries': counter.count}
@@ -0,0 +1,221 @@
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import date as dt_date, time as dt_time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from accounts.onboarding import bulk_create_users
+from booking.availability import ACTIVE_STATUSES, booking_mask, mask_slots
+from booking.models import Booking, SlotInventory, Table
+from booking.transfer import FORMATS, Progress, chunked, guess_format, open_file, read_rows
+from booking.ical import mark_changed
+from booking.versions import bump_dates
+
+class Command(BaseCommand):
+    help = (
+        'Stream tables or bookings from a CSV or JSONL file, validating and '
+        'inserting them in batches. Bulk inserts skip model signals, so no '
+        'live dashboard events are sent for imported rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=('tables', 'bookings'))
+        parser.add_argument('path', help='File to read, or - for stdin')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension, else csv')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and inserted per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row, then roll back')
+        parser.add_argument('--allow-past', action='store_true', help='Accept bookings for past dates')
+        parser.add_argument('--create-users', action='store_true',
+                            help='Create guests that do not exist yet, with unusable passwords')
+        parser.add_argument('--max-errors', type=int, default=50, help='Rejected rows to print')
+
+    def handle(self, *args, **options):
+        if options['model'] == 'bookings' and not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError('Importing bookings needs a database that returns ids from bulk inserts')
+
+        self.options = options
+        self.rejected = 0
+        self.imported = 0
+        self.edges = []
+        self.tables = {
+            number: (table_id, capacity)
+            for number, table_id, capacity in Table.objects.values_list('number', 'id', 'capacity')
+        }
+        import_batch = self.import_tables if options['model'] == 'tables' else self.import_bookings
+        fmt = options['format'] or guess_format(options['path'])
+        progress = Progress(self.stdout, every=options['batch_size'] * 10 if options['verbosity'] else 0)
+
+        # A dry run validates everything in one transaction that is rolled back,
+        # so later batches see the rows of earlier ones
+        with transaction.atomic() if options['dry_run'] else nullcontext():
+            with open_file(options['path'], 'r') as stream:
+                try:
+                    for batch in chunked(read_rows(stream, fmt), options['batch_size']):
+                        import_batch(batch)
+                        progress.add(len(batch))
+                except ValueError as e:
+                    raise CommandError(f"{e}; {self.imported} row(s) were imported before it")
+            if self.edges:
+                self.import_edges()
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {self.imported} {options['model']} ({progress.rate:.0f} rows/s)"
+        ))
+        if self.rejected:
+            raise CommandError(f"Rejected {self.rejected} row(s)")
+
+    def reject(self, line, message):
+        self.rejected += 1
+        if self.rejected <= self.options['max_errors']:
+            self.stderr.write(f"line {line}: {message}")
+
+    def import_tables(self, batch):
+        tables = {}
+        for line, row in batch:
+            try:
+                number = int(row['number'])
+                capacity = int(row['capacity'])
+                if capacity < 1:
+                    raise ValueError('capacity must be at least 1')
+                joinable = row.get('joinable_with') or []
+                if isinstance(joinable, str):
+                    joinable = joinable.split()
+                joinable = [int(other) for other in joinable]
+            except KeyError as e:
+                self.reject(line, f"missing {e.args[0]}")
+                continue
+            except (TypeError, ValueError) as e:
+                self.reject(line, e)
+                continue
+            # A number repeated within a batch keeps its last row
+            tables[number] = Table(number=number, capacity=capacity)
+            self.edges.extend((line, number, other) for other in joinable)
+
+        Table.objects.bulk_create(
+            tables.values(), update_conflicts=True, unique_fields=['number'], update_fields=['capacity']
+        )
+        self.imported += len(tables)
+
+    def import_edges(self):
+        # Joinable tables may be listed before the table they refer to, so
+        # edges are added once every table exists
+        ids = dict(Table.objects.values_list('number', 'id'))
+        through = Table.joinable_with.through
+        pairs = set()
+        for line, number, other in self.edges:
+            if other not in ids:
+                self.reject(line, f"joinable table {other} does not exist")
+            elif other != number:
+                pairs.add((ids[number], ids[other]))
+                pairs.add((ids[other], ids[number]))
+        through.objects.bulk_create(
+            [through(from_table_id=from_id, to_table_id=to_id) for from_id, to_id in pairs],
+            ignore_conflicts=True
+        )
+
+    def parse_booking(self, row):
+        status = row.get('status') or 'PENDING'
+        if status not in dict(Booking.STATUS_CHOICES):
+            raise ValueError(f"unknown status {status!r}")
+        num_guests = int(row['num_guests'])
+        if num_guests < 1:
+            raise ValueError('num_guests must be at least 1')
+        number = int(row['table'])
+        if number not in self.tables:
+            raise ValueError(f"table {number} does not exist")
+        return Booking(
+            customer_id=row['customer'],  # Resolved to an id for the whole batch
+            table_id=self.tables[number][0],
+            date=dt_date.fromisoformat(str(row['date'])),
+            time=dt_time.fromisoformat(str(row['time'])),
+            num_guests=num_guests,
+            status=status,
+            special_requests=row.get('special_requests') or None,
+        )
+
+    def resolve_customers(self, usernames):
+        customers = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+        if self.options['create_users']:
+            missing = sorted(usernames - customers.keys())
+            users = bulk_create_users(
+                (User(username=username, password=make_password(None)), None) for username in missing
+            )
+            customers.update((user.username, user.id) for user in users)
+        return customers
+
+    def import_bookings(self, batch):
+        parsed = []
+        for line, row in batch:
+            try:
+                parsed.append((line, self.parse_booking(row)))
+            except KeyError as e:
+                self.reject(line, f"missing {e.args[0]}")
+            except (TypeError, ValueError) as e:
+                self.reject(line, e)
+        if not parsed:
+            return
+
+        customers = self.resolve_customers({booking.customer_id for _, booking in parsed})
+
+        # The checks Booking.clean() makes, for the whole batch at once:
+        # one inventory query covers every table and date it touches
+        masks = defaultdict(int)
+        slots = SlotInventory.objects.filter(
+            date__in={booking.date for _, booking in parsed},
+            table_id__in={booking.table_id for _, booking in parsed},
+        )
+        for date, table_id, slot in slots.values_list('date', 'table_id', 'slot'):
+            masks[(date, table_id)] |= 1 << slot
+
+        capacities = {table_id: capacity for table_id, capacity in self.tables.values()}
+        today = timezone.now().date()
+        accepted = []
+        for line, booking in parsed:
+            if booking.customer_id not in customers:
+                self.reject(line, f"guest {booking.customer_id!r} does not exist")
+                continue
+            booking.customer_id = customers[booking.customer_id]
+            capacity = capacities[booking.table_id]
+            if booking.num_guests > capacity:
+                self.reject(line, f"This table can only accommodate {capacity} guests")
+                continue
+            if booking.date < today and not self.options['allow_past']:
+                self.reject(line, 'Bookings cannot be made for past dates')
+                continue
+            if booking.status in ACTIVE_STATUSES:
+                key = (booking.date, booking.table_id)
+                mask = booking_mask(booking.time)
+                if masks[key] & mask:
+                    self.reject(line, 'This table is already booked for the selected time')
+                    continue
+                # Later rows in the file are checked against this one
+                masks[key] |= mask
+            accepted.append((line, booking))
+
+        try:
+            with transaction.atomic():
+                bookings = Booking.objects.bulk_create([booking for _, booking in accepted])
+                SlotInventory.objects.bulk_create([
+                    SlotInventory(booking_id=booking.pk, table_id=booking.table_id, date=booking.date, slot=slot)
+                    for booking in bookings if booking.status in ACTIVE_STATUSES
+                    for slot in mask_slots(booking_mask(booking.time))
+                ])
+        except IntegrityError:
+            # A booking made while the batch was being validated took a slot
+            for line, _ in accepted:
+                self.reject(line, 'This table was booked by someone else during the import')
+            return
+        # Bulk inserts send no signals, so availability clients and the
+        # guests' calendar feeds are told here
+        def changed():
+            bump_dates({booking.date for booking in bookings})
+            mark_changed(*{booking.customer_id for booking in bookings})
+        transaction.on_commit(changed)
+        self.imported += len(bookings)
@@ -0,0 +1,238 @@
+import random
+import statistics
+import threading
+import time as timer
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import time as dt_time, timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from booking.availability import ACTIVE_STATUSES, booking_mask
+from booking.models import Booking
+from booking.ratelimit import throttle_counts
+from booking.seeding import SEED_PASSWORD, flush_seed_data, seed_bookings, seed_tables, seed_users
+
+ENDPOINTS = ['login', 'search', 'hold', 'create', 'update', 'cancel']
+
+# Friday-evening parties are small enough for a single table
+RUSH_PARTIES = [2, 2, 2, 3, 4, 4, 5, 6]
+RUSH_TIMES = [dt_time(hour, minute) for hour in (18, 19, 20) for minute in (0, 30)] + [dt_time(21, 0)]
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0
+
+class Stats:
+    """Latencies and outcomes per endpoint, shared by the worker threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)
+        # The first error seen on each endpoint, to show what went wrong
+        self.samples = {}
+        self.lag = []
+
+    def record(self, endpoint, seconds, error=None, rejected=False):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            self.errors[endpoint] += error is not None
+            self.rejected[endpoint] += rejected
+            if error is not None:
+                self.samples.setdefault(endpoint, error)
+
+class Command(BaseCommand):
+    help = (
+        'Replay a Friday-evening rush against a seeded throwaway database: '
+        'users log in, search, hold, book, move and cancel tables at a target '
+        'rate. Reports latency percentiles, errors and double bookings per endpoint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', type=float, default=10, help='Guest sessions started per second')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to keep starting sessions')
+        parser.add_argument('--workers', type=int, default=16, help='Threads running sessions')
+        parser.add_argument('--tables', type=int, default=30)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--bookings', type=int, default=600, help='Bookings seeded before the rush')
+        parser.add_argument('--update-ratio', type=float, default=0.2, help='Share of bookings moved afterwards')
+        parser.add_argument('--cancel-ratio', type=float, default=0.1, help='Share of bookings cancelled afterwards')
+        parser.add_argument('--max-error-rate', type=float, default=0.01, help='Fail above this share of errors')
+        parser.add_argument(
+            '--fast-hashing', action='store_true',
+            help='Hash passwords with MD5 so logins do not dominate the profile'
+        )
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.stats = Stats()
+        hashers = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+
+        setup_test_environment(debug=False)
+        databases = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            with hashers if options['fast_hashing'] else nullcontext():
+                self.seed(random.Random(options['seed']))
+                elapsed = self.rush(random.Random(options['seed']))
+            double_bookings = self.double_bookings()
+        finally:
+            teardown_databases(databases, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        self.report(elapsed, double_bookings)
+        requests = sum(len(latencies) for latencies in self.stats.latencies.values())
+        errors = sum(self.stats.errors.values())
+        if double_bookings:
+            raise CommandError(f"{double_bookings} double booking(s)")
+        if requests and errors / requests > options['max_error_rate']:
+            raise CommandError(f"Error rate {errors / requests:.1%} is above {options['max_error_rate']:.1%}")
+
+    def seed(self, rng):
+        flush_seed_data()
+        cache.clear()
+        tables = seed_tables(self.options['tables'])
+        guests, _ = seed_users(self.options['users'])
+        self.usernames = [guest.username for guest in guests]
+        today = timezone.now().date()
+        seed_bookings(
+            tables, [guest.pk for guest in guests], self.options['bookings'], today,
+            days=14, seed=self.options['seed']
+        )
+        # The coming Friday, already part-booked
+        self.date = today + timedelta(days=(4 - today.weekday()) % 7 or 7)
+        self.stdout.write(
+            f"{len(tables)} tables, {len(guests)} guests, {Booking.objects.count()} bookings; rush on {self.date}"
+        )
+
+    def rush(self, rng):
+        rate = self.options['rate']
+        started = timer.perf_counter()
+        end = started + self.options['duration']
+        scheduled = started
+        with ThreadPoolExecutor(self.options['workers']) as workers:
+            # Open loop: sessions arrive at the target rate whether or not
+            # the server keeps up, as guests do
+            while scheduled < end:
+                timer.sleep(max(0, scheduled - timer.perf_counter()))
+                workers.submit(self.session, scheduled, rng.choice(self.usernames), rng.random())
+                scheduled += rng.expovariate(rate)
+        return timer.perf_counter() - started
+
+    def call(self, endpoint, method, path, data=None, ok=(200, 302), rejected=()):
+        started = timer.perf_counter()
+        try:
+            response = method(path, data)
+        except Exception as e:
+            self.stats.record(endpoint, timer.perf_counter() - started, error=repr(e))
+            return None
+        seconds = timer.perf_counter() - started
+        if response.status_code not in ok + rejected:
+            # The test client keeps the exception behind a 500
+            error = repr(response.exc_info[1]) if response.exc_info else f'status {response.status_code}'
+            self.stats.record(endpoint, seconds, error=error)
+            return None
+        is_rejected = response.status_code in rejected
+        self.stats.record(endpoint, seconds, rejected=is_rejected)
+        return None if is_rejected else response
+
+    def session(self, scheduled, username, seed):
+        self.stats.lag.append(timer.perf_counter() - scheduled)
+        rng = random.Random(seed)
+        try:
+            # Each guest comes from their own address, as far as rate limits go
+            address = f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}'
+            client = Client(raise_request_exception=False, REMOTE_ADDR=address)
+            self.guest_session(client, username, rng)
+        finally:
+            connection.close()
+
+    def guest_session(self, client, username, rng):
+        if not self.call('login', client.post, reverse('login'),
+                         {'username': username, 'password': SEED_PASSWORD}, ok=(302,), rejected=(429,)):
+            return
+
+        # No free table redirects back home
+        start = rng.choice(RUSH_TIMES)
+        response = self.call('search', client.post, reverse('search_availability'), {
+            'date': self.date, 'time': start.strftime('%H:%M'), 'num_guests': rng.choice(RUSH_PARTIES),
+        }, ok=(200,), rejected=(302, 429))
+        if not response:
+            return
+        # Most guests take one of the best fits, so they compete for them
+        tables = list(response.context['available_tables'][:3])
+        if not tables:
+            return
+        create_url = reverse('create_booking', args=[rng.choice(tables).pk])
+
+        # Another guest holding the table redirects to the search
+        if not self.call('hold', client.get, create_url, ok=(200,), rejected=(302,)):
+            return
+        # A table taken in the meantime shows the form again
+        response = self.call('create', client.post, create_url, {
+            'date': self.date, 'time': start.strftime('%H:%M'), 'num_guests': 2,
+        }, ok=(302,), rejected=(200,))
+        if not response:
+            return
+        pk = resolve(response.url).kwargs['pk']
+
+        if rng.random() < self.options['update_ratio']:
+            later = RUSH_TIMES[(RUSH_TIMES.index(start) + 1) % len(RUSH_TIMES)]
+            self.call('update', client.post, reverse('booking-update', args=[pk]), {
+                'date': self.date, 'time': later.strftime('%H:%M'), 'num_guests': 2,
+            }, ok=(302,), rejected=(200,))
+        if rng.random() < self.options['cancel_ratio']:
+            self.call('cancel', client.post, reverse('booking-delete', args=[pk]), ok=(302,))
+
+    def double_bookings(self):
+        """Active bookings overlapping an earlier one on the same table"""
+        masks = defaultdict(int)
+        overlaps = 0
+        bookings = Booking.objects.filter(status__in=ACTIVE_STATUSES).order_by('date', 'time', 'id')
+        for table_id, date, start in bookings.values_list('table_id', 'date', 'time').iterator():
+            mask = booking_mask(start)
+            overlaps += bool(masks[(table_id, date)] & mask)
+            masks[(table_id, date)] |= mask
+        return overlaps
+
+    def report(self, elapsed, double_bookings):
+        sessions = len(self.stats.lag)
+        lag = sorted(self.stats.lag)
+        self.stdout.write(
+            f"{sessions} sessions in {elapsed:.1f}s ({sessions / elapsed:.1f}/s), "
+            f"start lag p95 {percentile(lag, 0.95) * 1000:.0f}ms"
+        )
+        self.stdout.write(
+            f"{'endpoint':<10}{'requests':>9}{'errors':>8}{'error %':>9}{'rejected':>10}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for endpoint in ENDPOINTS:
+            latencies = sorted(self.stats.latencies[endpoint])
+            if not latencies:
+                continue
+            errors = self.stats.errors[endpoint]
+            self.stdout.write(
+                f"{endpoint:<10}{len(latencies):>9}{errors:>8}{errors / len(latencies):>9.1%}"
+                f"{self.stats.rejected[endpoint]:>10}"
+                f"{statistics.median(latencies) * 1000:>9.0f}"
+                f"{percentile(latencies, 0.95) * 1000:>9.0f}"
+                f"{percentile(latencies, 0.99) * 1000:>9.0f}"
+            )
+        throttled = {bucket: count for bucket, count in throttle_counts().items() if count}
+        if throttled:
+            self.stdout.write('Throttled: ' + ', '.join(
+                f"{scope} by {kind} {count}" for (scope, kind), count in sorted(throttled.items())
+            ))
+        for endpoint, error in self.stats.samples.items():
+            self.stderr.write(f"{endpoint}: {error}")
+        style = self.style.ERROR if double_bookings else self.style.SUCCESS
+        self.stdout.write(style(f"Double bookings: {double_bookings}"))
@@ -0,0 +1,24 @@
+import time as timer
+
+from django.core.management.base import BaseCommand
+
+from booking.waitlist import expire_offers
+
+class Command(BaseCommand):
+    help = (
+        'Expire unanswered waitlist offers and entries for past dates, and offer '
+        'the tables they held to the next guests in line. Run it every minute '
+        'or so from cron, or keep it running with --interval.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Keep running, sweeping every this many seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_offers()
+            if expired or options['verbosity'] > 1:
+                self.stdout.write(f"Expired {expired} offer(s)")
+            if not options['interval']:
+                break
+            timer.sleep(options['interval'])
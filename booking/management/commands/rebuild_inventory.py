@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction, IntegrityError
+
+from booking.availability import ACTIVE_STATUSES, booking_mask, mask_slots
+from booking.models import Booking, SlotInventory
+
+class Command(BaseCommand):
+    help = 'Rebuild or verify the slot inventory from Booking rows, one date at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Only report dates whose inventory has drifted, without writing'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of inventory rows inserted per query'
+        )
+
+    def handle(self, *args, **options):
+        verify = options['verify']
+        batch_size = options['batch_size']
+
+        active = Booking.objects.filter(status__in=ACTIVE_STATUSES)
+        dates = sorted(
+            set(active.values_list('date', flat=True).distinct()) |
+            set(SlotInventory.objects.values_list('date', flat=True).distinct())
+        )
+
+        drifted = 0
+        conflicts = 0
+        written = 0
+        for date in dates:
+            expected = {
+                (booking_id, table_id, slot)
+                for booking_id, table_id, start in active.filter(date=date).values_list(
+                    'id', 'table_id', 'time'
+                )
+                for slot in mask_slots(booking_mask(start))
+            }
+            actual = set(
+                SlotInventory.objects.filter(date=date).values_list('booking_id', 'table_id', 'slot')
+            )
+            if expected == actual:
+                continue
+
+            drifted += 1
+            self.stdout.write(
+                f"{date}: {len(expected - actual)} missing, {len(actual - expected)} stale slot(s)"
+            )
+            if verify:
+                continue
+
+            try:
+                with transaction.atomic():
+                    SlotInventory.objects.filter(date=date).delete()
+                    SlotInventory.objects.bulk_create(
+                        [
+                            SlotInventory(booking_id=booking_id, table_id=table_id, date=date, slot=slot)
+                            for booking_id, table_id, slot in expected
+                        ],
+                        batch_size=batch_size
+                    )
+            except IntegrityError:
+                # Overlapping bookings cannot share a slot; leave the date for a human
+                conflicts += 1
+                self.stderr.write(f"{date}: overlapping bookings, inventory left unchanged")
+                continue
+            written += len(expected)
+
+        if conflicts:
+            raise CommandError(f"Could not rebuild {conflicts} date(s) with overlapping bookings")
+
+        if verify and drifted:
+            raise CommandError(f"Slot inventory has drifted on {drifted} of {len(dates)} date(s)")
+
+        if verify:
+            self.stdout.write(self.style.SUCCESS(f"Slot inventory matches bookings on {len(dates)} date(s)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {drifted} of {len(dates)} date(s), wrote {written} slot(s)"
+            ))
@@ -0,0 +1,41 @@
+import time as timer
+
+from django.core.management.base import BaseCommand
+
+from booking.jobs import Worker, purge_done, requeue_stale
+
+class Command(BaseCommand):
+    help = (
+        'Run queued background jobs, such as emails, on a pool of threads. '
+        'Keeps polling for new jobs unless --once is given. Jobs that fail are '
+        'retried with backoff; jobs left running by a worker that died are '
+        'queued again after JOB_TIMEOUT.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Jobs run at once')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are due, then exit')
+        parser.add_argument('--keep-days', type=int, default=7, help='Days to keep jobs that succeeded')
+
+    def handle(self, *args, **options):
+        worker = Worker(threads=options['threads'])
+        purge_done(options['keep_days'])
+        total = 0
+        try:
+            while True:
+                requeue_stale()
+                ran = worker.run_due()
+                total += ran
+                if ran:
+                    # More may be due already
+                    continue
+                if options['once']:
+                    break
+                timer.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.shutdown()
+        if total or options['verbosity'] > 1:
+            self.stdout.write(f"Ran {total} job(s)")
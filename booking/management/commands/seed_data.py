@@ -0,0 +1,74 @@
+import time as timer
+from datetime import date as dt_date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from booking.models import Table
+from booking.seeding import SEED_PASSWORD, SEED_USER_PREFIX, flush_seed_data, seed_bookings, seed_tables, seed_users
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic tables, guests and bookings at a '
+        'configurable scale. Seeded users share the password "%s".' % SEED_PASSWORD
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables', type=int, default=40)
+        parser.add_argument('--users', type=int, default=1000, help='Number of guests')
+        parser.add_argument('--staff', type=int, default=2, help='Number of staff members')
+        parser.add_argument('--bookings', type=int, default=10000)
+        parser.add_argument('--days', type=int, default=90, help='Number of days the bookings cover')
+        parser.add_argument(
+            '--start', type=dt_date.fromisoformat,
+            help='First booking date; defaults to centring the range on today'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows inserted per query')
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Delete ALL tables and bookings, and previously seeded users, first'
+        )
+
+    def handle(self, *args, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError('Seeding needs a database that returns ids from bulk inserts')
+
+        if options['flush']:
+            flush_seed_data()
+        elif Table.objects.exists() or User.objects.filter(username__startswith=SEED_USER_PREFIX).exists():
+            raise CommandError('The database already has tables or seeded users; use --flush to replace them')
+
+        start = options['start'] or timezone.now().date() - timedelta(days=options['days'] // 2)
+        started = timer.perf_counter()
+
+        with transaction.atomic():
+            tables = seed_tables(options['tables'])
+            guests, staff = seed_users(options['users'], options['staff'])
+        self.stdout.write(f"{len(tables)} tables, {len(guests)} guests, {len(staff)} staff")
+
+        def progress(created):
+            rate = created / (timer.perf_counter() - started)
+            self.stdout.write(f"{created} bookings ({rate:.0f}/s)")
+
+        created = seed_bookings(
+            tables,
+            [guest.pk for guest in guests],
+            options['bookings'],
+            start,
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+
+        end = start + timedelta(days=options['days'] - 1)
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {created} bookings from {start} to {end} in {timer.perf_counter() - started:.1f}s"
+        ))
+        if created < options['bookings']:
+            self.stdout.write(self.style.WARNING(
+                f"{options['bookings'] - created} parties found no free table; add --tables or --days"
+            ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from booking.jobs import enqueue
+from booking.reminders import send_reminders
+
+class Command(BaseCommand):
+    help = (
+        'Email a reminder to every guest booked for tomorrow, or --date, who '
+        'has not had one yet. Safe to rerun: guests already reminded are '
+        'skipped. Run it daily from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Date of the bookings to remind, as YYYY-MM-DD (default tomorrow)')
+        parser.add_argument('--queue', action='store_true',
+                            help='Leave the sending to the run_jobs worker, which retries on failure')
+
+    def handle(self, *args, **options):
+        if options['queue']:
+            enqueue(send_reminders, options['date'])
+            self.stdout.write('Queued reminders')
+            return
+        sent = send_reminders(options['date'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} reminder(s)"))
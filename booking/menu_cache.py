@@ -0,0 +1,51 @@
+"""
+Versioned caching for the public menu page.
+
+Both the menu data and the rendered menu fragment are cached under keys
+that include a menu version number.  Saving or deleting any menu item or
+category bumps the version, which makes every older entry unreachable,
+so nothing has to be deleted and the steady state serves the page
+without touching the database.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import MenuCategory, MenuItem
+
+MENU_VERSION_KEY = 'menu:version'
+MENU_CACHE_TIMEOUT = 60 * 60 * 24
+
+def menu_version():
+    """Current menu version, starting a fresh sequence if the cache lost it"""
+    version = cache.get(MENU_VERSION_KEY)
+    if version is None:
+        # A millisecond timestamp never collides with versions already cached
+        cache.add(MENU_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(MENU_VERSION_KEY)
+    return version
+
+def bump_menu_version():
+    try:
+        cache.incr(MENU_VERSION_KEY)
+    except ValueError:
+        menu_version()
+
+def menu_categories():
+    """Menu categories with their items prefetched, cached per menu version"""
+    key = f'menu:data:{menu_version()}'
+    categories = cache.get(key)
+    if categories is None:
+        categories = list(MenuCategory.objects.prefetch_related('items'))
+        cache.set(key, categories, MENU_CACHE_TIMEOUT)
+    return categories
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_save, sender=MenuCategory)
+@receiver(post_delete, sender=MenuCategory)
+def invalidate_menu(sender, **kwargs):
+    """Bump the menu version whenever the menu changes"""
+    bump_menu_version()
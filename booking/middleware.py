@@ -0,0 +1,36 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .querycount import QueryCounter
+
+class QueryCountMiddleware:
+    """Report each request's query count and SQL time in response headers (DEBUG only)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Under ASGI, stay async so async views are not pushed into a thread
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        return self.report(response, counter)
+
+    async def __acall__(self, request):
+        # Queries run in sync_to_async threads, but on this request's connection
+        with QueryCounter() as counter:
+            response = await self.get_response(request)
+        return self.report(response, counter)
+
+    def report(self, response, counter):
+        response['X-Query-Count'] = str(counter.count)
+        response['X-Query-Time'] = f'{counter.duration * 1000:.2f}ms'
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='booking.booking')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='booking.table')),
+            ],
+            options={
+                'verbose_name_plural': 'Slot inventory',
+                'indexes': [models.Index(fields=['date', 'slot'], name='booking_slo_date_c3d8c9_idx'), models.Index(fields=['table', 'date', 'slot'], name='booking_slo_table_i_4c219b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_slotinventory'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='slotinventory',
+            name='booking_slo_table_i_4c219b_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='slotinventory',
+            constraint=models.UniqueConstraint(fields=('table', 'date', 'slot'), name='unique_table_slot'),
+        ),
+    ]
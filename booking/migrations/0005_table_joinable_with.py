@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_slothold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='table',
+            name='joinable_with',
+            field=models.ManyToManyField(blank=True, help_text='Neighbouring tables that can be pushed together for larger parties', to='booking.table'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_table_joinable_with'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['customer', 'date', 'time', 'id'], name='booking_boo_custome_e4f96d_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('booking', '0007_bookingseries_booking_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('earliest_time', models.TimeField()),
+                ('latest_time', models.TimeField()),
+                ('num_guests', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('WAITING', 'Waiting'), ('OFFERED', 'Offered'), ('BOOKED', 'Booked'), ('EXPIRED', 'Expired'), ('CANCELLED', 'Cancelled')], default='WAITING', max_length=10)),
+                ('offered_time', models.TimeField(blank=True, null=True)),
+                ('offer_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('offered_table', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_offers', to='booking.table')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Waitlist entries',
+                'indexes': [models.Index(fields=['date', 'status', 'created_at'], name='booking_wai_date_78e14f_idx'), models.Index(fields=['status', 'offer_expires_at'], name='booking_wai_status_ce1107_idx')],
+            },
+        ),
+    ]
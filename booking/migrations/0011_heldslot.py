@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_booking_reminder_sent_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slothold',
+            name='entry',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='booking.waitlistentry'),
+        ),
+        migrations.CreateModel(
+            name='HeldSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('hold', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='booking.slothold')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='held_slots', to='booking.table')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='heldslot',
+            constraint=models.UniqueConstraint(fields=('table', 'date', 'slot'), name='unique_held_slot'),
+        ),
+    ]
@@ -1,3 +1,297 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your models here.
+from .routers import use_primary
+
+class Table(models.Model):
+    """Model for restaurant tables"""
+    number = models.IntegerField(unique=True)
+    capacity = models.IntegerField()
+    joinable_with = models.ManyToManyField(
+        'self', blank=True,
+        help_text="Neighbouring tables that can be pushed together for larger parties"
+    )
+
+    class Meta:
+        ordering = ['number']
+
+    def __str__(self):
+        return f"Table {self.number} (Capacity: {self.capacity})"
+
+class MenuCategory(models.Model):
+    """Model for menu categories"""
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        verbose_name_plural = 'Menu categories'
+
+    def __str__(self):
+        return self.name
+
+class MenuItem(models.Model):
+    """Model for menu items"""
+    name = models.CharField(max_length=100)
+    description = models.TextField()
+    price = models.DecimalField(max_digits=6, decimal_places=2)
+    category = models.ForeignKey(MenuCategory, on_delete=models.CASCADE, related_name='items')
+    is_available = models.BooleanField(default=True)
+
+    def __str__(self):
+        return self.name
+
+class BookingSeries(models.Model):
+    """A standing reservation: the same table and time every few weeks"""
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_series')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='booking_series')
+    start_date = models.DateField()
+    time = models.TimeField()
+    num_guests = models.PositiveIntegerField()
+    interval_weeks = models.PositiveSmallIntegerField(default=1)
+    occurrences = models.PositiveSmallIntegerField()
+    special_requests = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'Booking series'
+
+    def __str__(self):
+        return f"Every {self.interval_weeks} week(s) from {self.start_date} at {self.time} for {self.customer.username}"
+
+    def get_absolute_url(self):
+        return reverse('booking-series-detail', args=[self.pk])
+
+class Booking(models.Model):
+    """Model for table bookings"""
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('CONFIRMED', 'Confirmed'),
+        ('CANCELLED', 'Cancelled'),
+    )
+
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='bookings')
+    date = models.DateField()
+    time = models.TimeField()
+    num_guests = models.PositiveIntegerField()
+    special_requests = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    series = models.ForeignKey(
+        BookingSeries, on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings'
+    )
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date', '-time']
+        indexes = [
+            models.Index(fields=['date', 'status']),
+            # Keyset pagination of a guest's booking history
+            models.Index(fields=['customer', 'date', 'time', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Booking for {self.customer.username} on {self.date} at {self.time}"
+
+    def get_absolute_url(self):
+        return reverse('booking-detail', args=[self.pk])
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored values, so a save can tell e.g. a cancellation from a
+        # re-save, or which date a booking moved away from
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Keep the slot inventory in step with the booking it describes.
+        # The unique (table, date, slot) constraint makes this the final
+        # word on double bookings: a concurrent booking that claimed one
+        # of our slots first rolls the whole save back.
+        adding = self._state.adding
+        if not adding and self.has_moved():
+            # The guest is reminded of the new date or time
+            self.reminder_sent_at = None
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'reminder_sent_at'}
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                try:
+                    self.sync_slots()
+                except IntegrityError:
+                    raise ValidationError("This table is already booked for the selected time")
+        except ValidationError:
+            if adding:
+                self.pk = None
+                self._state.adding = True
+            raise
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+
+    def has_moved(self):
+        """Whether the date or time differs from what was last loaded or saved"""
+        loaded = getattr(self, '_loaded_values', {})
+        return any(name in loaded and loaded[name] != getattr(self, name) for name in ('date', 'time'))
+
+    def slot_indexes(self):
+        """Half-hour slots held by this booking, empty unless it is active"""
+        from .availability import ACTIVE_STATUSES, booking_mask, mask_slots
+        if self.status not in ACTIVE_STATUSES:
+            return []
+        return mask_slots(booking_mask(self.time))
+
+    def sync_slots(self):
+        """Replace this booking's inventory rows with its current slots"""
+        self.slots.all().delete()
+        SlotInventory.objects.bulk_create([
+            SlotInventory(booking=self, table_id=self.table_id, date=self.date, slot=slot)
+            for slot in self.slot_indexes()
+        ])
+
+    def clean(self):
+        # The table is assigned by the view after form validation
+        if self.table_id is None or self.date is None or self.time is None:
+            return
+
+        if self.num_guests and self.num_guests > self.table.capacity:
+            raise ValidationError(
+                f"This table can only accommodate {self.table.capacity} guests"
+            )
+
+        if self.date < timezone.now().date():
+            raise ValidationError("Bookings cannot be made for past dates")
+
+        # Same slot-bitmap check the availability search uses, made on the
+        # primary since a replica may not have the latest bookings yet
+        from .availability import is_table_free
+        if self.status == 'CANCELLED':
+            return
+        with use_primary():
+            free = is_table_free(self.table_id, self.date, self.time, exclude_booking=self.pk)
+        if not free:
+            raise ValidationError("This table is already booked for the selected time")
+
+class SlotInventory(models.Model):
+    """Materialized half-hour slot occupancy, one row per booked (table, date, slot)"""
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='slots')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='slots')
+    date = models.DateField()
+    slot = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name_plural = 'Slot inventory'
+        indexes = [
+            models.Index(fields=['date', 'slot']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'date', 'slot'], name='unique_table_slot'),
+        ]
+
+    def __str__(self):
+        return f"Table {self.table_id} on {self.date}, slot {self.slot}"
+
+class SlotHold(models.Model):
+    """
+    Short-lived reservation of a table while a guest fills in the booking
+    form, or while a waitlist ``entry`` considers an offer
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='slot_holds')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='holds')
+    date = models.DateField()
+    time = models.TimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    entry = models.ForeignKey(
+        'WaitlistEntry', on_delete=models.CASCADE, null=True, blank=True, related_name='holds'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"Hold on table {self.table_id} for {self.user_id} until {self.expires_at}"
+
+class HeldSlot(models.Model):
+    """One half-hour slot of a hold; the unique constraint lets only one hold take a slot"""
+    hold = models.ForeignKey(SlotHold, on_delete=models.CASCADE, related_name='slots')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='held_slots')
+    date = models.DateField()
+    slot = models.PositiveSmallIntegerField()
+    # Copied from the hold, so expired slots are swept without a join
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'date', 'slot'], name='unique_held_slot'),
+        ]
+
+    def __str__(self):
+        return f"Table {self.table_id} on {self.date}, slot {self.slot} held until {self.expires_at}"
+
+class WaitlistEntry(models.Model):
+    """A guest waiting for a table to free up within a time window"""
+    STATUS_CHOICES = (
+        ('WAITING', 'Waiting'),
+        ('OFFERED', 'Offered'),
+        ('BOOKED', 'Booked'),
+        ('EXPIRED', 'Expired'),
+        ('CANCELLED', 'Cancelled'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries')
+    date = models.DateField()
+    earliest_time = models.TimeField()
+    latest_time = models.TimeField()
+    num_guests = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='WAITING')
+    offered_table = models.ForeignKey(
+        Table, on_delete=models.SET_NULL, null=True, blank=True, related_name='waitlist_offers'
+    )
+    offered_time = models.TimeField(null=True, blank=True)
+    offer_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'Waitlist entries'
+        indexes = [
+            # First come, first served among the entries waiting for a date
+            models.Index(fields=['date', 'status', 'created_at']),
+            models.Index(fields=['status', 'offer_expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} waiting for {self.num_guests} on {self.date}"
+
+class Job(models.Model):
+    """A unit of background work, such as an email, run by the ``run_jobs`` worker"""
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # The worker's poll: queued jobs that are due, oldest first
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
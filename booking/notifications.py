@@ -0,0 +1,78 @@
+"""
+Guest emails.
+
+Messages are written while the booking is at hand and sent by the
+``run_jobs`` worker, so a slow mail server never holds up a request.
+Confirmations are sent by the code that books; cancellation notices
+follow any booking that is cancelled or deleted, however that happens.
+"""
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils import timezone
+
+from .jobs import enqueue, job
+from .models import Booking
+
+@job
+def send_email(subject, body, recipients, from_email=None, html_message=None):
+    send_mail(subject, body, from_email, recipients, html_message=html_message)
+
+def notify(user, subject, body):
+    """Queue an email to ``user``, if they gave an address"""
+    if user.email:
+        enqueue(send_email, subject, body, [user.email])
+
+def _when(booking):
+    return f"{booking.date:%A %d %B} at {booking.time:%H:%M}"
+
+def booking_confirmed(booking):
+    link = settings.SITE_URL + booking.get_absolute_url()
+    notify(booking.customer, 'Your booking is confirmed', (
+        f"Your table for {booking.num_guests} on {_when(booking)} is booked.\n\n"
+        f"See or change your booking here: {link}\n"
+    ))
+
+def series_confirmed(series):
+    link = settings.SITE_URL + series.get_absolute_url()
+    notify(series.customer, 'Your standing booking is confirmed', (
+        f"Your table for {series.num_guests} at {series.time:%H:%M} is booked every "
+        f"{series.interval_weeks} week(s) from {series.start_date:%A %d %B}, "
+        f"{series.occurrences} times in all.\n\n"
+        f"See or change the series here: {link}\n"
+    ))
+
+def booking_cancelled(booking):
+    link = settings.SITE_URL + reverse('search_availability')
+    notify(booking.customer, 'Your booking has been cancelled', (
+        f"Your table for {booking.num_guests} on {_when(booking)} has been cancelled.\n\n"
+        f"To book another time: {link}\n"
+    ))
+
+def series_cancelled(series, count):
+    notify(series.customer, 'Your standing booking has been cancelled', (
+        f"The remaining {count} booking(s) of your table for {series.num_guests} at "
+        f"{series.time:%H:%M} every {series.interval_weeks} week(s) have been cancelled.\n"
+    ))
+
+def _past(booking):
+    # Clearing out old bookings is not news to anyone
+    return booking.date < timezone.now().date()
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, **kwargs):
+    # Only the save that cancels it, not later saves of a cancelled booking
+    if (
+        not created
+        and instance.status == 'CANCELLED'
+        and getattr(instance, '_loaded_values', {}).get('status') != 'CANCELLED'
+        and not _past(instance)
+    ):
+        booking_cancelled(instance)
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    if instance.status != 'CANCELLED' and not _past(instance):
+        booking_cancelled(instance)
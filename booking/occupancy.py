@@ -0,0 +1,103 @@
+"""
+Occupancy heatmap for the staff dashboard.
+
+Bookings are aggregated in the database by (date, start time) and by
+table, so the work done here depends on the number of distinct start
+times rather than the number of bookings.  The result is cached briefly
+because every open dashboard asks for the same numbers.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+
+from .availability import (
+    ACTIVE_STATUSES, LAST_SEATING, OPENING_TIME, booking_mask, mask_slots, slot_index, slot_time
+)
+from .models import Booking, Table
+
+HEATMAP_CACHE_TIMEOUT = 60
+MAX_HEATMAP_DAYS = 90
+
+def _heat(value):
+    # Background opacity for a cell, kept readable at 100%
+    return round(min(value, 1) * 0.85, 2)
+
+def occupancy_heatmap(start_date, days=7):
+    """Covers and occupancy per half-hour, per day and per table, cached briefly"""
+    days = max(1, min(days, MAX_HEATMAP_DAYS))
+    key = f'dashboard:heatmap:{start_date.isoformat()}:{days}'
+    heatmap = cache.get(key)
+    if heatmap is None:
+        heatmap = _build_heatmap(start_date, start_date + timedelta(days=days - 1))
+        cache.set(key, heatmap, HEATMAP_CACHE_TIMEOUT)
+    return heatmap
+
+def _build_heatmap(start_date, end_date):
+    in_range = Booking.objects.filter(
+        date__range=(start_date, end_date), status__in=ACTIVE_STATUSES
+    )
+    # Aggregated from the date-indexed bookings rather than joined onto
+    # every table, so older history does not add to the cost
+    per_table = {
+        row['table_id']: row
+        for row in in_range.values('table_id').annotate(booked=Count('id'), guests=Sum('num_guests'))
+    }
+    tables = list(Table.objects.order_by('number').values('id', 'number', 'capacity'))
+    for table in tables:
+        row = per_table.get(table.pop('id'), {})
+        table['booked'] = row.get('booked', 0)
+        table['guests'] = row.get('guests', 0)
+    total_seats = sum(table['capacity'] for table in tables) or 1
+
+    starts = (
+        in_range.values('date', 'time')
+        .annotate(bookings=Count('id'), guests=Sum('num_guests'), seats=Sum('table__capacity'))
+    )
+
+    covers = defaultdict(int)
+    seats = defaultdict(int)
+    day_totals = defaultdict(lambda: {'bookings': 0, 'guests': 0})
+    for row in starts:
+        day_totals[row['date']]['bookings'] += row['bookings']
+        day_totals[row['date']]['guests'] += row['guests']
+        for slot in mask_slots(booking_mask(row['time'])):
+            covers[(row['date'], slot)] += row['guests']
+            seats[(row['date'], slot)] += row['seats']
+
+    # Every slot a booking can occupy, from opening to the end of the last seating
+    slots = range(slot_index(OPENING_TIME), max(mask_slots(booking_mask(LAST_SEATING))) + 1)
+
+    heatmap_days = []
+    for offset in range((end_date - start_date).days + 1):
+        date = start_date + timedelta(days=offset)
+        cells = [
+            {
+                'covers': covers[(date, slot)],
+                'occupancy': round(100 * seats[(date, slot)] / total_seats),
+                'heat': _heat(seats[(date, slot)] / total_seats),
+            }
+            for slot in slots
+        ]
+        heatmap_days.append({
+            'date': date,
+            'bookings': day_totals[date]['bookings'],
+            'guests': day_totals[date]['guests'],
+            'peak': max(cell['occupancy'] for cell in cells),
+            'cells': cells,
+        })
+
+    open_slots = len(slots) * len(heatmap_days)
+    for table in tables:
+        # Each booking holds a table for a fixed number of slots
+        table['occupancy'] = round(
+            100 * table['booked'] * bin(booking_mask(OPENING_TIME)).count('1') / open_slots
+        )
+
+    return {
+        'times': [slot_time(slot) for slot in slots],
+        'days': heatmap_days,
+        'tables': tables,
+        'total_seats': total_seats,
+    }
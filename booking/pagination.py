@@ -0,0 +1,82 @@
+"""
+Keyset pagination for booking listings.
+
+Pages are cut with a ``(date, time, id)`` cursor instead of an OFFSET, so
+every page costs one indexed range query however deep into a guest's
+history it is, and a booking added while paging does not shift the rest.
+"""
+from collections import namedtuple
+from datetime import date as dt_date, datetime
+
+from django.db.models import Q
+from django.urls import reverse
+
+PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+Page = namedtuple('Page', ['bookings', 'next_cursor'])
+
+def encode_cursor(booking):
+    return f"{booking.date.isoformat()}_{booking.time.strftime('%H%M%S')}_{booking.pk}"
+
+def decode_cursor(cursor):
+    """``(date, time, id)`` from a cursor; raises ValueError if it is malformed"""
+    try:
+        date, time, pk = cursor.split('_')
+        return dt_date.fromisoformat(date), datetime.strptime(time, '%H%M%S').time(), int(pk)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid cursor {cursor!r}")
+
+def page_size(value):
+    """The page size asked for in a query string, within bounds"""
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return PAGE_SIZE
+
+def _page_queryset(bookings, after, per_page, descending):
+    order = ['-date', '-time', '-id'] if descending else ['date', 'time', 'id']
+    bookings = bookings.order_by(*order)
+    if after:
+        date, time, pk = decode_cursor(after)
+        op = 'lt' if descending else 'gt'
+        bookings = bookings.filter(
+            Q(**{f'date__{op}': date})
+            | Q(date=date, **{f'time__{op}': time})
+            | Q(date=date, time=time, **{f'id__{op}': pk})
+        )
+    # One extra row tells whether there is a next page
+    return bookings[:per_page + 1]
+
+def _page(rows, per_page):
+    if len(rows) > per_page:
+        return Page(rows[:per_page], encode_cursor(rows[per_page - 1]))
+    return Page(rows, None)
+
+def paginate(bookings, after=None, per_page=PAGE_SIZE, descending=False):
+    """The page of ``bookings`` following the ``after`` cursor"""
+    return _page(list(_page_queryset(bookings, after, per_page, descending)), per_page)
+
+async def apaginate(bookings, after=None, per_page=PAGE_SIZE, descending=False):
+    """``paginate`` for coroutine views"""
+    rows = [booking async for booking in _page_queryset(bookings, after, per_page, descending)]
+    return _page(rows, per_page)
+
+def page_json(page, with_customer=False):
+    """A page as sent to infinite-scroll clients"""
+    bookings = []
+    for booking in page.bookings:
+        row = {
+            'id': booking.pk,
+            'date': booking.date.isoformat(),
+            'time': booking.time.strftime('%H:%M'),
+            'table': booking.table.number,
+            'num_guests': booking.num_guests,
+            'status': booking.status,
+            'status_display': booking.get_status_display(),
+            'url': reverse('booking-detail', args=[booking.pk]),
+        }
+        if with_customer:
+            row['customer'] = booking.customer.get_full_name() or booking.customer.username
+        bookings.append(row)
+    return {'bookings': bookings, 'next': page.next_cursor}
@@ -0,0 +1,35 @@
+"""
+Per-request SQL accounting.
+
+``QueryCounter`` hooks ``connection.execute_wrapper`` so it works with
+DEBUG off and without keeping the queries themselves, which makes it
+cheap enough for the middleware and precise enough for query-budget
+tests.
+"""
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+class QueryCounter:
+    """Context manager counting queries and SQL time on one connection"""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+    def __enter__(self):
+        self._wrapper = connections[self.using].execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._wrapper.__exit__(*exc_info)
@@ -0,0 +1,148 @@
+"""
+Fixed-window rate limiting for expensive form posts.
+
+Each scope in ``settings.RATE_LIMITS`` (login, registration, password
+reset, availability search) has a counter per client IP and, where the
+request names one, per account, for each window of the rate's period.
+Counters are moved with the cache's atomic ``add()`` and ``incr()``, so
+concurrent requests cannot all read the same count and slip through
+together; the price is that a burst straddling two windows may reach
+twice the rate.  Counters live in the ``RATE_LIMIT_CACHE`` cache, which
+is local memory unless configured otherwise; a shared cache makes the
+limits hold across processes.  A throttled request is answered with a
+429 before the view runs, so it costs no password hashing and no query.
+Logs name the client by a hash, never by address, username or email.
+"""
+import hashlib
+import inspect
+import logging
+import re
+import time as timer
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+# Throttle counters are kept for a day
+METRICS_TIMEOUT = 86400
+
+def parse_rate(rate):
+    """``(limit, seconds)`` from a rate like ``'10/m'`` or ``'5/15m'``"""
+    match = RATE_RE.match(rate)
+    if not match:
+        raise ValueError(f"invalid rate {rate!r}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+def _cache():
+    return caches[settings.RATE_LIMIT_CACHE]
+
+def count_request(key, rate, now=None):
+    """
+    Count a request against ``key`` in the current window of ``rate``.
+    Returns 0 if it is within the limit, else the seconds until the
+    window ends.
+    """
+    limit, period = parse_rate(rate)
+    now = timer.time() if now is None else now
+    window = int(now // period)
+    window_key = f'{key}:{window}'
+    cache = _cache()
+    # A window's counter expires once the window is over
+    cache.add(window_key, 0, period)
+    try:
+        count = cache.incr(window_key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(window_key, 1, period)
+        count = 1
+    if count > limit:
+        return (window + 1) * period - now
+    return 0
+
+def client_ip(request):
+    # Behind a proxy REMOTE_ADDR must be set from the forwarded address
+    return request.META.get('REMOTE_ADDR', '')
+
+def _account(request, account_field):
+    if account_field:
+        value = request.POST.get(account_field, '').strip().lower()
+        return value or None
+    # Set by the login check that runs before the limit, so no query here
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+def record_throttle(scope, kind):
+    key = f'ratelimit:throttled:{scope}:{kind}'
+    cache = _cache()
+    cache.add(key, 0, METRICS_TIMEOUT)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, METRICS_TIMEOUT)
+
+def throttle_counts():
+    """``{(scope, kind): requests throttled}`` for every configured limit"""
+    keys = {
+        f'ratelimit:throttled:{scope}:{kind}': (scope, kind)
+        for scope, rates in settings.RATE_LIMITS.items() for kind in rates
+    }
+    counts = _cache().get_many(keys)
+    return {limit: counts.get(key, 0) for key, limit in keys.items()}
+
+def check(request, scope, account_field=None):
+    """Seconds to wait before retrying, or 0 if the request may go ahead"""
+    rates = settings.RATE_LIMITS.get(scope, {})
+    identities = {'ip': client_ip(request)}
+    if 'account' in rates:
+        identities['account'] = _account(request, account_field)
+    for kind, rate in rates.items():
+        identity = identities.get(kind)
+        if identity is None:
+            continue
+        digest = hashlib.md5(str(identity).encode()).hexdigest()
+        wait = count_request(f'ratelimit:{scope}:{kind}:{digest}', rate)
+        if wait:
+            record_throttle(scope, kind)
+            # Hashed: logs are no place for addresses, usernames or emails
+            logger.warning('Throttled %s request by %s %s', scope, kind, digest[:12])
+            return wait
+    return 0
+
+def too_many_requests(wait):
+    response = HttpResponse('Too many requests. Please try again shortly.', status=429, content_type='text/plain')
+    response['Retry-After'] = str(max(1, round(wait)))
+    return response
+
+def rate_limited(scope, account_field=None, methods=('POST',)):
+    """
+    Throttle ``methods`` requests to a view with the limits of ``scope``.
+    The account is the ``account_field`` form value, or else the signed-in
+    user.  Works on plain and coroutine views.
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if request.method in methods:
+                    wait = await sync_to_async(check)(request, scope, account_field)
+                    if wait:
+                        return too_many_requests(wait)
+                return await view(request, *args, **kwargs)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if request.method in methods:
+                    wait = check(request, scope, account_field)
+                    if wait:
+                        return too_many_requests(wait)
+                return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,153 @@
+"""
+Standing reservations.
+
+A series books the same table at the same time every ``interval_weeks``
+weeks.  All of its dates are checked for conflicts with one slot
+inventory query, and the bookings and their slots are written with one
+bulk insert each, so a twelve-week series costs about as much as a
+single booking.  Moving or cancelling the rest of a series is likewise
+a handful of set-based queries whatever its length.
+"""
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .availability import ACTIVE_STATUSES, booking_mask, mask_slots
+from .events import publish_booking
+from .holds import held_masks
+from .models import Booking, BookingSeries, SlotInventory
+from .notifications import series_cancelled, series_confirmed
+from .routers import use_primary
+from .waitlist import table_freed
+
+MAX_OCCURRENCES = 52
+
+def occurrence_dates(start_date, occurrences, interval_weeks=1):
+    """Dates of a series: ``start_date`` and every ``interval_weeks`` weeks after"""
+    return [start_date + timedelta(weeks=interval_weeks * n) for n in range(occurrences)]
+
+def conflicting_dates(table_id, dates, start, user=None, exclude_series=None):
+    """
+    Dates among ``dates`` on which ``table_id`` is booked, or held by
+    someone other than ``user``, during ``[start, start + 2h)``
+    """
+    if not dates:
+        return []
+    mask = booking_mask(start)
+    slots = SlotInventory.objects.filter(table_id=table_id, date__in=dates, slot__in=mask_slots(mask))
+    if exclude_series is not None:
+        slots = slots.exclude(booking__series=exclude_series)
+    with use_primary():
+        taken = set(slots.values_list('date', flat=True).distinct())
+
+    held = held_masks(min(dates), max(dates), user=user)
+    taken.update(date for date in dates if held.get((date, table_id), 0) & mask)
+    return sorted(taken)
+
+def _conflict_error(dates):
+    listed = ', '.join(date.strftime('%a %d %b') for date in dates)
+    return ValidationError(f"The table is already booked on {listed}")
+
+def _insert_slots(bookings):
+    try:
+        SlotInventory.objects.bulk_create([
+            SlotInventory(booking_id=booking.pk, table_id=booking.table_id, date=booking.date, slot=slot)
+            for booking in bookings
+            for slot in mask_slots(booking_mask(booking.time))
+        ])
+    except IntegrityError:
+        # A booking made since the conflict check took one of the slots
+        raise ValidationError("The table was booked by someone else meanwhile; please try again")
+
+def create_series(customer, table, start_date, time, num_guests, occurrences, interval_weeks=1,
+                  special_requests=None, status='CONFIRMED'):
+    """Book every date of a new series at once, or none of them"""
+    if num_guests > table.capacity:
+        raise ValidationError(f"This table can only accommodate {table.capacity} guests")
+    if start_date < timezone.now().date():
+        raise ValidationError("Bookings cannot be made for past dates")
+    if not 1 <= occurrences <= MAX_OCCURRENCES:
+        raise ValidationError(f"A series can have at most {MAX_OCCURRENCES} bookings")
+
+    dates = occurrence_dates(start_date, occurrences, interval_weeks)
+    conflicts = conflicting_dates(table.pk, dates, time, user=customer)
+    if conflicts:
+        raise _conflict_error(conflicts)
+
+    with transaction.atomic():
+        series = BookingSeries.objects.create(
+            customer=customer, table=table, start_date=start_date, time=time, num_guests=num_guests,
+            interval_weeks=interval_weeks, occurrences=occurrences, special_requests=special_requests,
+        )
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                customer=customer, table=table, date=date, time=time, num_guests=num_guests,
+                special_requests=special_requests, status=status, series=series,
+            )
+            for date in dates
+        ])
+        if any(booking.pk is None for booking in bookings):
+            # Backends that cannot return ids from a bulk insert
+            bookings = list(series.bookings.all())
+        if status in ACTIVE_STATUSES:
+            _insert_slots(bookings)
+        # bulk_create() sends no signals, so tell the dashboards directly
+        for booking in bookings:
+            publish_booking(booking, 'created')
+        series_confirmed(series)
+    return series
+
+def _remaining(series, from_date=None):
+    from_date = from_date or timezone.now().date()
+    return series.bookings.filter(date__gte=from_date, status__in=ACTIVE_STATUSES)
+
+def cancel_series(series, from_date=None):
+    """Cancel the series' active bookings from ``from_date`` (today) on; returns how many"""
+    with transaction.atomic():
+        bookings = list(_remaining(series, from_date).select_for_update())
+        ids = [booking.pk for booking in bookings]
+        SlotInventory.objects.filter(booking_id__in=ids).delete()
+        Booking.objects.filter(pk__in=ids).update(status='CANCELLED', updated_at=timezone.now())
+        for booking in bookings:
+            booking.status = 'CANCELLED'
+            publish_booking(booking, 'cancelled')
+            table_freed(booking.table_id, booking.date)
+        if ids:
+            series_cancelled(series, len(ids))
+    return len(ids)
+
+def move_series(series, time=None, table=None, from_date=None):
+    """
+    Move the series' active bookings from ``from_date`` (today) on to a
+    new time and/or table, all or none of them; returns how many moved
+    """
+    time = time or series.time
+    table = table or series.table
+    if series.num_guests > table.capacity:
+        raise ValidationError(f"This table can only accommodate {table.capacity} guests")
+
+    with transaction.atomic():
+        bookings = list(_remaining(series, from_date).select_for_update())
+        conflicts = conflicting_dates(
+            table.pk, [booking.date for booking in bookings], time, user=series.customer, exclude_series=series
+        )
+        if conflicts:
+            raise _conflict_error(conflicts)
+
+        ids = [booking.pk for booking in bookings]
+        SlotInventory.objects.filter(booking_id__in=ids).delete()
+        # A new time needs a new reminder
+        Booking.objects.filter(pk__in=ids).update(
+            table=table, time=time, reminder_sent_at=None, updated_at=timezone.now()
+        )
+        for booking in bookings:
+            booking.table, booking.time = table, time
+        _insert_slots(bookings)
+        for booking in bookings:
+            publish_booking(booking, 'updated')
+
+        series.table, series.time = table, time
+        series.save(update_fields=['table', 'time'])
+    return len(ids)
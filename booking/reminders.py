@@ -0,0 +1,96 @@
+"""
+Next-day reminders.
+
+``send_reminders`` emails every guest with an active booking on a date,
+tomorrow by default.  Bookings are taken in keyset chunks of
+``REMINDER_BATCH``: each chunk is claimed by stamping its
+``reminder_sent_at`` in one conditional update before anything is sent,
+then read back with its guests and tables, and the messages go out over
+one mail connection at no more than ``REMINDER_RATE``.  A run requeued
+after ``JOB_TIMEOUT`` while the first is still sending therefore skips
+the first run's chunks instead of reminding those guests twice.  If the
+mail server fails midway, the chunk's unsent bookings are released for
+the retry; a rerun with nobody left costs one query.  Moving a booking
+to another date or time clears its stamp, so the guest is reminded of
+the new one.
+"""
+import time as timer
+from datetime import date as dt_date, timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .availability import ACTIVE_STATUSES
+from .jobs import job
+from .models import Booking
+from .ratelimit import parse_rate
+
+def reminder_message(booking, connection=None):
+    link = settings.SITE_URL + booking.get_absolute_url()
+    body = (
+        f"See you tomorrow: your table for {booking.num_guests} (table {booking.table.number}) "
+        f"is booked for {booking.date:%A %d %B} at {booking.time:%H:%M}.\n\n"
+        f"If your plans have changed, please update or cancel here: {link}\n"
+    )
+    return EmailMessage('Your booking tomorrow', body, None, [booking.customer.email], connection=connection)
+
+def due_reminders(date):
+    return Booking.objects.filter(
+        date=date, status__in=ACTIVE_STATUSES, reminder_sent_at__isnull=True
+    ).order_by('pk')
+
+class Pacer:
+    """Sleeps as needed to keep calls to ``wait()`` under ``rate``, e.g. ``'10/s'``"""
+
+    def __init__(self, rate):
+        count, period = parse_rate(rate)
+        self.interval = period / count
+        self.next_at = timer.monotonic()
+
+    def wait(self):
+        now = timer.monotonic()
+        if now < self.next_at:
+            timer.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+@job
+def send_reminders(date=None, batch_size=None):
+    """
+    Remind the guests booked on ``date`` (an ISO date, default tomorrow)
+    who have not been reminded yet; returns how many emails were sent
+    """
+    date = dt_date.fromisoformat(date) if date else timezone.localdate() + timedelta(days=1)
+    batch_size = batch_size or settings.REMINDER_BATCH
+    pacer = Pacer(settings.REMINDER_RATE)
+    sent = 0
+    last_pk = 0
+    with get_connection() as connection:
+        while True:
+            ids = list(due_reminders(date).filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            last_pk = ids[-1]
+            # Claimed before sending; rows another run claimed first are left to it
+            stamp = timezone.now()
+            Booking.objects.filter(pk__in=ids, reminder_sent_at__isnull=True).update(reminder_sent_at=stamp)
+            bookings = list(
+                Booking.objects.filter(pk__in=ids, reminder_sent_at=stamp).select_related('customer', 'table')
+                .order_by('pk')
+            )
+            done = []
+            try:
+                for booking in bookings:
+                    # Guests without an address stay claimed, so reruns skip them
+                    if booking.customer.email:
+                        pacer.wait()
+                        reminder_message(booking, connection).send()
+                        sent += 1
+                    done.append(booking.pk)
+            except BaseException:
+                # Released so a retry sends what this run could not
+                Booking.objects.filter(pk__in=set(ids) - set(done), reminder_sent_at=stamp).update(
+                    reminder_sent_at=None
+                )
+                raise
+    return sent
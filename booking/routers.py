@@ -0,0 +1,114 @@
+"""
+Read-replica routing.
+
+Reads made while serving a request go to a replica from
+``settings.DATABASE_REPLICAS``; writes, reads inside a transaction and
+everything outside requests (management commands, the shell) use the
+primary.  A request that writes pins the rest of itself to the primary,
+and ``ReplicaPinningMiddleware`` keeps the browser pinned for
+``REPLICA_PIN_SECONDS`` afterwards, so guests always see their own
+changes even when the replicas lag behind.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'pin_primary'
+# Sessions are rewritten on most requests and must never be read stale
+PRIMARY_ONLY_APPS = {'sessions'}
+
+# Set for the duration of a request that may read from replicas
+_replica_reads = ContextVar('replica_reads', default=False)
+# Set when the browser wrote recently, or within ``use_primary()``
+_pinned = ContextVar('pinned_to_primary', default=False)
+# Set once the request has written
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+def replicas():
+    return settings.DATABASE_REPLICAS
+
+@contextmanager
+def use_primary():
+    """Read from the primary within the block, e.g. for conflict checks"""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            not replicas()
+            or not _replica_reads.get()
+            or _pinned.get()
+            or _wrote.get()
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            # A transaction must see its own writes
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in PRIMARY_ONLY_APPS:
+            _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+class ReplicaPinningMiddleware:
+    """Let a request read from replicas unless its browser wrote recently"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Under ASGI, stay async so async views are not pushed into a thread
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+            # Each write restarts the window
+            pin = _wrote.get()
+        finally:
+            self.finish(tokens)
+        return self.pin(response) if pin else response
+
+    async def __acall__(self, request):
+        tokens = self.start(request)
+        try:
+            # sync_to_async copies the flags to its threads and a write
+            # made there back to this context
+            response = await self.get_response(request)
+            pin = _wrote.get()
+        finally:
+            self.finish(tokens)
+        return self.pin(response) if pin else response
+
+    def start(self, request):
+        return (_replica_reads.set(True), _pinned.set(PIN_COOKIE in request.COOKIES), _wrote.set(False))
+
+    def finish(self, tokens):
+        reads, pinned, wrote = tokens
+        _wrote.reset(wrote)
+        _pinned.reset(pinned)
+        _replica_reads.reset(reads)
+
+    def pin(self, response):
+        response.set_cookie(
+            PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+        )
+        return response
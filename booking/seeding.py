@@ -0,0 +1,158 @@
+"""
+Synthetic restaurant data for development and benchmarks.
+
+Bookings follow the shape of a real dining room: lunch and dinner peaks,
+busy Fridays and Saturdays, mostly couples and fours, and a core of
+regular guests who book far more often than everyone else.  Rows are
+written with ``bulk_create`` in batches, so seeding a million bookings
+takes minutes rather than hours.
+"""
+import itertools
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+from accounts.models import Profile
+from accounts.onboarding import bulk_create_users
+
+from .availability import ACTIVE_STATUSES, booking_mask, mask_slots, seating_times, slot_index
+from .models import Booking, SlotInventory, Table
+
+SEED_USER_PREFIX = 'seed-'
+SEED_PASSWORD = 'seed-password'
+
+# Party size distribution: mostly couples and fours
+PARTY_SIZES = [1, 2, 3, 4, 5, 6, 8, 10, 12, 16]
+PARTY_WEIGHTS = [4, 38, 10, 24, 6, 8, 5, 3, 1, 1]
+
+# Floor plan: rows of ten tables, neighbours in a row can be joined
+ROW_CAPACITIES = [2, 2, 2, 4, 4, 4, 4, 6, 6, 8]
+
+# Monday to Sunday
+WEEKDAY_WEIGHTS = [5, 6, 7, 9, 15, 17, 11]
+
+STATUSES = ['CONFIRMED', 'PENDING', 'CANCELLED']
+STATUS_WEIGHTS = [88, 6, 6]
+
+def seating_weights():
+    """Demand for each of ``seating_times()``, peaking around 13:00 and 19:30"""
+    return [
+        1 + 6 * max(0, 1 - abs(slot_index(start) - 26) / 3) + 12 * max(0, 1 - abs(slot_index(start) - 39) / 4)
+        for start in seating_times()
+    ]
+
+def seed_tables(count, batch_size=1000):
+    """Create ``count`` tables in joinable rows of ten, numbered after any existing ones"""
+    first = (Table.objects.order_by('-number').values_list('number', flat=True).first() or 0) + 1
+    tables = Table.objects.bulk_create(
+        [
+            Table(number=first + i, capacity=ROW_CAPACITIES[i % len(ROW_CAPACITIES)])
+            for i in range(count)
+        ],
+        batch_size=batch_size
+    )
+    through = Table.joinable_with.through
+    edges = []
+    for i in range(1, count):
+        if i % len(ROW_CAPACITIES):
+            left, right = tables[i - 1].pk, tables[i].pk
+            edges += [through(from_table_id=left, to_table_id=right), through(from_table_id=right, to_table_id=left)]
+    through.objects.bulk_create(edges, batch_size=batch_size)
+    return tables
+
+def seed_users(count, staff=0, batch_size=1000):
+    """
+    Create ``count`` guests and ``staff`` staff members with profiles.
+    They all share ``SEED_PASSWORD``, hashed once.
+    """
+    password = make_password(SEED_PASSWORD)
+    users = bulk_create_users(
+        (
+            (User(username=f'{SEED_USER_PREFIX}staff{i}', password=password), Profile(is_staff=True)) if i < staff
+            else (User(username=f'{SEED_USER_PREFIX}guest{i - staff}', password=password), None)
+            for i in range(count + staff)
+        ),
+        batch_size=batch_size
+    )
+    return users[staff:], users[:staff]
+
+def flush_seed_data():
+    """Delete every table (with its bookings) and every seeded user"""
+    Table.objects.all().delete()
+    User.objects.filter(username__startswith=SEED_USER_PREFIX).delete()
+
+def generate_bookings(tables, user_ids, count, start, days, rng):
+    """
+    Yield up to ``count`` unsaved, non-overlapping bookings spread over
+    ``days`` days from ``start``.
+    """
+    times = seating_times()
+    time_weights = list(itertools.accumulate(seating_weights()))
+    party_weights = list(itertools.accumulate(PARTY_WEIGHTS))
+    status_weights = list(itertools.accumulate(STATUS_WEIGHTS))
+    # Regulars: the n-th guest books about 1/sqrt(n) as often as the first
+    guest_weights = list(itertools.accumulate(1 / (rank + 1) ** 0.5 for rank in range(len(user_ids))))
+
+    dates = [start + timedelta(days=offset) for offset in range(days)]
+    day_weights = [WEEKDAY_WEIGHTS[date.weekday()] for date in dates]
+    total = sum(day_weights)
+
+    # Tables that seat each party size without wasting more than half the seats
+    fits = {
+        size: [table for table in tables if size <= table.capacity <= max(2 * size, 4)]
+        or [table for table in tables if table.capacity >= size]
+        for size in PARTY_SIZES
+    }
+
+    created = 0
+    for date, weight in zip(dates, day_weights):
+        masks = defaultdict(int)
+        # Busy days fill up: a party that finds no free table after a few
+        # tries is turned away, as it would be on the night
+        for _ in range(round(count * weight / total)):
+            start_time = rng.choices(times, cum_weights=time_weights)[0]
+            party = rng.choices(PARTY_SIZES, cum_weights=party_weights)[0]
+            status = rng.choices(STATUSES, cum_weights=status_weights)[0]
+            mask = booking_mask(start_time)
+            candidates = fits[party]
+            for table in rng.sample(candidates, min(5, len(candidates))):
+                if status not in ACTIVE_STATUSES or not masks[table.pk] & mask:
+                    break
+            else:
+                continue
+            if status in ACTIVE_STATUSES:
+                masks[table.pk] |= mask
+            created += 1
+            yield Booking(
+                customer_id=rng.choices(user_ids, cum_weights=guest_weights)[0],
+                table_id=table.pk,
+                date=date,
+                time=start_time,
+                num_guests=party,
+                status=status,
+            )
+            if created == count:
+                return
+
+def seed_bookings(tables, user_ids, count, start, days=90, seed=None, batch_size=5000, progress=None):
+    """Bulk-create up to ``count`` bookings and their slot inventory; returns how many were made"""
+    rng = random.Random(seed)
+    created = 0
+    bookings = generate_bookings(tables, user_ids, count, start, days, rng)
+    while batch := list(itertools.islice(bookings, batch_size)):
+        Booking.objects.bulk_create(batch)
+        SlotInventory.objects.bulk_create(
+            [
+                SlotInventory(booking_id=booking.pk, table_id=booking.table_id, date=booking.date, slot=slot)
+                for booking in batch if booking.status in ACTIVE_STATUSES
+                for slot in mask_slots(booking_mask(booking.time))
+            ],
+            batch_size=batch_size
+        )
+        created += len(batch)
+        if progress:
+            progress(created)
+    return created
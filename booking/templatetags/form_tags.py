@@ -0,0 +1,9 @@
+from django import template
+
+register = template.Library()
+
+@register.filter
+def add_class(field, css_class):
+    """Render a bound form field with an extra CSS class on its widget"""
+    classes = field.field.widget.attrs.get('class', '')
+    return field.as_widget(attrs={'class': f'{classes} {css_class}'.strip()})
@@ -0,0 +1,140 @@
+import os
+import tempfile
+from io import StringIO
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from accounts.models import Profile
+from accounts.onboarding import bulk_create_users
+
+def profile_queries(context):
+    return [query['sql'] for query in context.captured_queries if 'accounts_profile' in query['sql']]
+
+class ProfileSaveTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_login_does_not_touch_the_profile(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(Client().login(username='testuser', password='testpass123'))
+        
+        self.assertEqual(profile_queries(context), [])
+
+    def test_unchanged_profile_is_not_saved(self):
+        user = User.objects.select_related('profile').get(pk=self.user.pk)
+        user.first_name = 'Test'
+        with CaptureQueriesContext(connection) as context:
+            user.save()
+        
+        self.assertEqual(profile_queries(context), [])
+
+    def test_changed_profile_is_saved_with_user(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.profile.phone_number = '0123456789'
+        user.save()
+        
+        self.assertEqual(Profile.objects.get(user=self.user).phone_number, '0123456789')
+        # Saved once; a second save has nothing to write
+        with CaptureQueriesContext(connection) as context:
+            user.save()
+        self.assertEqual(profile_queries(context), [])
+
+    def test_profile_form_still_saves(self):
+        self.client.login(username='testuser', password='testpass123')
+        self.client.post(reverse('profile'), {
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'phone_number': '0123456789',
+            'address': '1 High Street',
+        })
+        
+        self.assertEqual(Profile.objects.get(user=self.user).address, '1 High Street')
+
+class BulkOnboardingTest(TestCase):
+    def test_bulk_create_users_creates_profiles(self):
+        # Two batches, each a user insert and a profile insert in a savepoint
+        with self.assertNumQueries(8):
+            users = bulk_create_users(
+                [(User(username=f'guest{i}'), Profile(is_staff=True) if i == 0 else None) for i in range(3)],
+                batch_size=2
+            )
+        
+        self.assertEqual([user.username for user in users], ['guest0', 'guest1', 'guest2'])
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 3)
+        self.assertTrue(User.objects.get(username='guest0').profile.is_staff)
+        self.assertFalse(User.objects.get(username='guest1').profile.is_staff)
+
+class ImportUsersCommandTest(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='taken')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def load(self, content, **options):
+        path = os.path.join(self.directory.name, 'users.csv')
+        with open(path, 'w') as f:
+            f.write(content)
+        stderr = StringIO()
+        call_command('import_users', path, stdout=StringIO(), stderr=stderr, **options)
+        return stderr.getvalue()
+
+    def test_imports_accounts_and_profiles(self):
+        self.load(
+            'username,email,password,phone_number,is_staff\n'
+            'alice,alice@example.com,s3cret-pass,0123456789,true\n'
+            'bob,,,,\n'
+        )
+        
+        alice = User.objects.get(username='alice')
+        self.assertTrue(alice.check_password('s3cret-pass'))
+        self.assertTrue(alice.profile.is_staff)
+        self.assertEqual(alice.profile.phone_number, '0123456789')
+        bob = User.objects.get(username='bob')
+        self.assertFalse(bob.has_usable_password())
+        self.assertFalse(bob.profile.is_staff)
+
+    def test_rejects_invalid_rows_and_keeps_the_rest(self):
+        stderr = StringIO()
+        with self.assertRaisesMessage(CommandError, 'Rejected 4 row(s)'):
+            path = os.path.join(self.directory.name, 'users.csv')
+            with open(path, 'w') as f:
+                f.write(
+                    'username,email\n'
+                    'carol,carol@example.com\n'
+                    'taken,\n'
+                    'carol,\n'
+                    'dave,not-an-email\n'
+                    'no spaces!,\n'
+                )
+            call_command('import_users', path, stdout=StringIO(), stderr=stderr)
+        
+        self.assertTrue(User.objects.filter(username='carol').exists())
+        self.assertFalse(User.objects.filter(username='dave').exists())
+        self.assertIn("line 3: username 'taken' is taken", stderr.getvalue())
+        self.assertIn("line 4: username 'carol' appears twice", stderr.getvalue())
+
+class ProfileBackendTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='staffuser', password='testpass123')
+        Profile.objects.filter(user=self.user).update(is_staff=True)
+        self.client.login(username='staffuser', password='testpass123')
+
+    def test_role_check_needs_no_profile_query(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('staff_dashboard'))
+        
+        self.assertEqual(response.status_code, 200)
+        # The profile only appears joined to the user
+        self.assertFalse([sql for sql in profile_queries(context) if 'FROM "accounts_profile"' in sql])
+
+    def test_user_without_profile_is_not_staff(self):
+        Profile.objects.filter(user=self.user).delete()
+        response = self.client.get(reverse('staff_dashboard'))
+        
+        self.assertRedirects(response, reverse('home'))
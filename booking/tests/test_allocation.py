@@ -0,0 +1,66 @@
+from django.test import TestCase, SimpleTestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import date, timedelta, time
+from booking.models import Table, Booking
+from booking.availability import Availability, booking_mask
+from booking.allocation import Allocator, allocate
+
+class AllocatorTest(SimpleTestCase):
+    def setUp(self):
+        self.day = date(2025, 1, 4)
+        # Tables 1-3 form a row that can be joined, table 4 stands alone
+        self.capacities = {1: 2, 2: 4, 3: 4, 4: 8}
+        self.adjacency = {1: {2}, 2: {1, 3}, 3: {2}}
+
+    def allocator(self, masks=None):
+        return Allocator(Availability(self.capacities, masks or {}), self.adjacency)
+
+    def test_best_fit_ranks_smallest_tables_first(self):
+        allocations = self.allocator().allocate(self.day, time(19, 0), 3)
+        self.assertEqual([a.table_ids for a in allocations], [(2,), (3,), (4,)])
+
+    def test_joins_adjacent_tables_when_no_single_table_fits(self):
+        allocations = self.allocator().allocate(self.day, time(19, 0), 10)
+        self.assertEqual([a.table_ids for a in allocations], [(1, 2, 3)])
+
+    def test_joined_groups_prefer_least_waste(self):
+        masks = {(self.day, 4): booking_mask(time(19, 0))}
+        allocations = self.allocator(masks).allocate(self.day, time(19, 0), 6)
+        self.assertEqual(allocations[0].table_ids, (1, 2))
+        self.assertEqual(allocations[0].capacity, 6)
+
+    def test_booked_tables_are_not_joined(self):
+        masks = {(self.day, 2): booking_mask(time(19, 0))}
+        self.assertEqual(self.allocator(masks).allocate(self.day, time(20, 0), 10), [])
+
+    def test_impossible_party_is_rejected_without_search(self):
+        self.assertEqual(self.allocator().allocate(self.day, time(19, 0), 30), [])
+
+class AllocateLoadTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.small = Table.objects.create(number=1, capacity=4)
+        self.large = Table.objects.create(number=2, capacity=6)
+        self.small.joinable_with.add(self.large)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+
+    def test_allocate_uses_symmetric_joins(self):
+        allocations = allocate(self.tomorrow, time(19, 0), 10)
+        self.assertEqual([a.table_ids for a in allocations], [(self.small.id, self.large.id)])
+
+    def test_allocate_skips_booked_tables(self):
+        Booking.objects.create(
+            customer=self.user,
+            table=self.small,
+            date=self.tomorrow,
+            time=time(19, 0),
+            num_guests=2,
+            status='CONFIRMED'
+        )
+        self.assertEqual(
+            [a.table_ids for a in allocate(self.tomorrow, time(19, 0), 2)],
+            [(self.large.id,)]
+        )
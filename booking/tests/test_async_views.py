@@ -0,0 +1,89 @@
+import asyncio
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+from asgiref.sync import sync_to_async
+from booking import views
+from booking.models import Table, Booking
+
+class AsyncViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            customer=self.user,
+            table=self.table,
+            date=self.tomorrow,
+            time=time(19, 0),
+            num_guests=2,
+            status='CONFIRMED'
+        )
+
+    async def login(self, user):
+        await sync_to_async(self.async_client.force_login)(user)
+
+    def store_search(self):
+        session = self.async_client.session
+        session['booking_date'] = self.tomorrow.isoformat()
+        session['booking_time'] = '12:00:00'
+        session['booking_num_guests'] = 2
+        session.save()
+
+    def test_views_are_coroutines(self):
+        for view in (views.search_availability, views.create_booking,
+                     views.BookingListView.as_view(), views.BookingDetailView.as_view()):
+            self.assertTrue(asyncio.iscoroutinefunction(view))
+
+    async def test_login_required(self):
+        for url in (reverse('search_availability'), reverse('bookings'),
+                    reverse('booking-detail', args=[self.booking.pk])):
+            response = await self.async_client.get(url)
+            self.assertRedirects(response, f'/accounts/login/?next={url}', fetch_redirect_response=False)
+
+    async def test_search_availability(self):
+        await self.login(self.user)
+        response = await self.async_client.post(reverse('search_availability'), {
+            'date': self.tomorrow,
+            'time': '12:00',
+            'num_guests': 2
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        tables = [table async for table in response.context['available_tables']]
+        self.assertEqual(tables, [self.table])
+
+    async def test_create_booking(self):
+        await self.login(self.user)
+        await sync_to_async(self.store_search)()
+        url = reverse('create_booking', args=[self.table.id])
+        
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.context['hold'])
+        
+        response = await self.async_client.post(url, {
+            'date': self.tomorrow,
+            'time': '12:00',
+            'num_guests': 2,
+        })
+        booking = await Booking.objects.exclude(pk=self.booking.pk).aget(customer=self.user)
+        self.assertRedirects(response, reverse('booking-detail', args=[booking.pk]), fetch_redirect_response=False)
+
+    async def test_booking_list_and_detail(self):
+        await self.login(self.user)
+        
+        response = await self.async_client.get(reverse('bookings'))
+        self.assertEqual(response.context['bookings'], [self.booking])
+        
+        response = await self.async_client.get(reverse('booking-detail', args=[self.booking.pk]))
+        self.assertEqual(response.context['booking'], self.booking)
+
+    async def test_booking_detail_of_another_guest(self):
+        other = await sync_to_async(User.objects.create_user)(username='other', password='testpass123')
+        await self.login(other)
+        
+        response = await self.async_client.get(reverse('booking-detail', args=[self.booking.pk]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking
+from booking.availability import (
+    booking_mask, slot_index, slot_time, occupancy, is_table_free, free_tables, Availability
+)
+
+class SlotBitmapTest(TestCase):
+    def test_slot_index_and_time(self):
+        self.assertEqual(slot_index(time(11, 0)), 22)
+        self.assertEqual(slot_index(time(11, 45)), 23)
+        self.assertEqual(slot_time(39), time(19, 30))
+
+    def test_booking_mask_covers_two_hours(self):
+        self.assertEqual(booking_mask(time(19, 0)), 0b1111 << 38)
+
+    def test_unaligned_booking_rounds_outwards(self):
+        # 19:15-21:15 touches the 19:00 and 21:00 slots
+        self.assertEqual(booking_mask(time(19, 15)), 0b11111 << 38)
+
+    def test_back_to_back_bookings_do_not_overlap(self):
+        self.assertFalse(booking_mask(time(19, 0)) & booking_mask(time(21, 0)))
+        self.assertTrue(booking_mask(time(19, 0)) & booking_mask(time(20, 30)))
+
+class AvailabilityEngineTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.small = Table.objects.create(number=1, capacity=2)
+        self.large = Table.objects.create(number=2, capacity=6)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            customer=self.user,
+            table=self.large,
+            date=self.tomorrow,
+            time=time(19, 0),
+            num_guests=4,
+            status='CONFIRMED'
+        )
+
+    def test_occupancy_single_query(self):
+        with self.assertNumQueries(1):
+            masks = occupancy(self.tomorrow)
+        self.assertEqual(masks, {(self.tomorrow, self.large.id): booking_mask(time(19, 0))})
+
+    def test_cancelled_bookings_are_ignored(self):
+        self.booking.status = 'CANCELLED'
+        self.booking.save()
+        self.assertTrue(is_table_free(self.large.id, self.tomorrow, time(19, 0)))
+
+    def test_is_table_free_excludes_own_booking(self):
+        self.assertFalse(is_table_free(self.large.id, self.tomorrow, time(20, 0)))
+        self.assertTrue(
+            is_table_free(self.large.id, self.tomorrow, time(20, 0), exclude_booking=self.booking.pk)
+        )
+
+    def test_free_tables_filters_capacity_and_overlap(self):
+        self.assertEqual(free_tables(self.tomorrow, time(19, 30), 2), [self.small.id])
+        self.assertEqual(free_tables(self.tomorrow, time(19, 30), 4), [])
+        self.assertEqual(free_tables(self.tomorrow, time(21, 0), 4), [self.large.id])
+
+    def test_availability_prefers_smallest_tables(self):
+        availability = Availability.load(self.tomorrow)
+        self.assertEqual(
+            availability.free_tables(self.tomorrow, time(12, 0)),
+            [self.small.id, self.large.id]
+        )
@@ -0,0 +1,106 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking
+from booking.caching import check_shared_cache
+from booking.holds import place_hold
+from booking.tests.utils import SHARED_CACHE
+
+@override_settings(CACHES=SHARED_CACHE)
+class AvailabilityApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.url = reverse('availability_api')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.small = Table.objects.create(number=1, capacity=2)
+        self.large = Table.objects.create(number=2, capacity=6)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.booking = self.book(self.tomorrow, time(19, 0))
+
+    def book(self, date, at):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                customer=self.user, table=self.large, date=date, time=at, num_guests=4, status='CONFIRMED'
+            )
+
+    def get(self, date=None, etag=None):
+        headers = {'if_none_match': etag} if etag else {}
+        return self.client.get(self.url, {'date': date or self.tomorrow, 'num_guests': 2}, headers=headers)
+
+    def slot(self, response, slot_time):
+        return next(slot for slot in response.json()['times'] if slot['time'] == slot_time)
+
+    def test_lists_free_tables_by_time(self):
+        response = self.get()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual([table['number'] for table in self.slot(response, '12:00')['tables']], [1, 2])
+        self.assertEqual(self.slot(response, '20:00')['tables'], [{'id': self.small.id, 'number': 1, 'capacity': 2}])
+
+    def test_unchanged_date_is_304_without_queries(self):
+        etag = self.get()['ETag']
+        
+        with self.assertNumQueries(0):
+            response = self.get(etag=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_booking_changes_bump_only_their_date(self):
+        etag = self.get()['ETag']
+        other_day = self.tomorrow + timedelta(days=1)
+        other_etag = self.get(other_day)['ETag']
+        
+        self.book(self.tomorrow, time(12, 0))
+        self.assertEqual(self.get(etag=etag).status_code, 200)
+        self.assertEqual(self.get(other_day, etag=other_etag).status_code, 304)
+
+    def test_moving_a_booking_bumps_both_dates(self):
+        other_day = self.tomorrow + timedelta(days=1)
+        etags = {date: self.get(date)['ETag'] for date in (self.tomorrow, other_day)}
+        
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.date = other_day
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        
+        for date, etag in etags.items():
+            self.assertEqual(self.get(date, etag=etag).status_code, 200)
+
+    def test_cancellation_and_holds_change_etag(self):
+        etag = self.get()['ETag']
+        self.booking.status = 'CANCELLED'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.save()
+        response = self.get(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        
+        place_hold(self.user, self.small.id, self.tomorrow, time(12, 0))
+        self.assertEqual(self.get(etag=response['ETag']).status_code, 200)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_no_etag_with_a_per_process_cache(self):
+        # Changes made by other processes would never move this process's versions
+        response = self.get()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['booking.W001'])
+
+    def test_rejects_past_dates(self):
+        response = self.get(timezone.now().date() - timedelta(days=1))
+        
+        self.assertEqual(response.status_code, 400)
+
+    def test_grid_revalidates_too(self):
+        grid_url = reverse('availability_grid')
+        data = {'start': self.tomorrow, 'num_guests': 2}
+        etag = self.client.get(grid_url, data)['ETag']
+        
+        self.assertEqual(self.client.get(grid_url, data, headers={'if_none_match': etag}).status_code, 304)
+        self.book(self.tomorrow + timedelta(days=3), time(12, 0))
+        self.assertEqual(self.client.get(grid_url, data, headers={'if_none_match': etag}).status_code, 200)
@@ -0,0 +1,97 @@
+import threading
+from django.test import TransactionTestCase
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking, HeldSlot, SlotInventory
+from booking.availability import booking_mask
+from booking.holds import place_hold
+
+class ConcurrentBookingTest(TransactionTestCase):
+    """Hammer one table from many threads and check nobody double-books it"""
+
+    THREADS = 12
+    START_TIMES = [time(18, 0), time(18, 30), time(19, 0), time(19, 30), time(20, 0), time(21, 0)]
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Threads need a file-backed test database")
+        
+        self.users = [
+            User.objects.create_user(username=f'guest{i}', password='testpass123')
+            for i in range(self.THREADS)
+        ]
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+
+    def book_concurrently(self):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = []
+        
+        def attempt(user, start):
+            try:
+                barrier.wait()
+                Booking(
+                    customer=user,
+                    table=self.table,
+                    date=self.tomorrow,
+                    time=start,
+                    num_guests=2,
+                    status='CONFIRMED'
+                ).save()
+                outcomes.append('booked')
+            except ValidationError:
+                outcomes.append('rejected')
+            finally:
+                connection.close()
+        
+        threads = [
+            threading.Thread(target=attempt, args=(user, self.START_TIMES[i % len(self.START_TIMES)]))
+            for i, user in enumerate(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_no_overlapping_bookings_under_concurrency(self):
+        outcomes = self.book_concurrently()
+        
+        self.assertEqual(len(outcomes), self.THREADS)
+        self.assertGreaterEqual(outcomes.count('booked'), 1)
+        
+        bookings = list(Booking.objects.filter(table=self.table, date=self.tomorrow))
+        self.assertEqual(len(bookings), outcomes.count('booked'))
+        for i, booking in enumerate(bookings):
+            for other in bookings[i + 1:]:
+                self.assertFalse(
+                    booking_mask(booking.time) & booking_mask(other.time),
+                    f"{booking} overlaps {other}"
+                )
+        self.assertEqual(SlotInventory.objects.count(), 4 * len(bookings))
+
+    def test_one_hold_per_slot_under_concurrency(self):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = []
+        
+        def attempt(user):
+            try:
+                barrier.wait()
+                outcomes.append('held' if place_hold(user, self.table.id, self.tomorrow, time(19, 0)) else 'refused')
+            except Exception as e:
+                outcomes.append(repr(e))
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=attempt, args=(user,)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # No "database is locked" errors, and a single winner
+        self.assertEqual(sorted(outcomes), ['held'] + ['refused'] * (self.THREADS - 1))
+        self.assertEqual(HeldSlot.objects.count(), 4)
@@ -0,0 +1,116 @@
+import asyncio
+import json
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+from asgiref.sync import sync_to_async
+from booking.models import Table, Booking
+from booking.events import BOOKINGS_CHANNEL, LocalBroker, get_broker
+
+class LocalBrokerTest(SimpleTestCase):
+    def test_publish_fans_out_to_every_subscriber(self):
+        broker = LocalBroker()
+        
+        async def scenario():
+            first = broker.subscribe('bookings')
+            second = broker.subscribe('bookings')
+            other = broker.subscribe('menu')
+            delivered = broker.publish('bookings', {'id': 1})
+            received = [await first.get(), await second.get()]
+            return delivered, received, other.queue.empty()
+        
+        delivered, received, other_empty = asyncio.run(scenario())
+        
+        self.assertEqual(delivered, 2)
+        self.assertEqual(received, [{'id': 1}, {'id': 1}])
+        self.assertTrue(other_empty)
+
+    def test_closed_subscription_stops_receiving(self):
+        broker = LocalBroker()
+        
+        async def scenario():
+            subscription = broker.subscribe('bookings')
+            subscription.close()
+            return broker.publish('bookings', {'id': 1})
+        
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+class BookingEventTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.published = []
+        broker = get_broker()
+        original = broker.publish
+        broker.publish = lambda channel, message: self.published.append((channel, message))
+        self.addCleanup(setattr, broker, 'publish', original)
+
+    def test_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                customer=self.user,
+                table=self.table,
+                date=self.tomorrow,
+                time=time(19, 0),
+                num_guests=2,
+                status='CONFIRMED'
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = 'CANCELLED'
+            booking.save()
+        
+        self.assertEqual([message['event'] for _, message in self.published], ['created', 'cancelled'])
+        self.assertEqual(self.published[0][0], BOOKINGS_CHANNEL)
+        self.assertEqual(self.published[0][1]['time'], '19:00')
+
+    def test_nothing_is_published_before_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Booking.objects.create(
+                customer=self.user,
+                table=self.table,
+                date=self.tomorrow,
+                time=time(19, 0),
+                num_guests=2,
+                status='CONFIRMED'
+            )
+        
+        self.assertEqual(self.published, [])
+        self.assertEqual(len(callbacks), 1)
+
+@override_settings(BOOKING_EVENT_HEARTBEAT=1)
+class StaffDashboardEventsViewTest(TestCase):
+    def setUp(self):
+        self.events_url = reverse('staff_dashboard_events')
+        self.staff = User.objects.create_user(username='staff', password='testpass123')
+        self.staff.profile.is_staff = True
+        self.staff.profile.save()
+        self.guest = User.objects.create_user(username='guest', password='testpass123')
+
+    async def test_guests_are_forbidden(self):
+        await sync_to_async(self.async_client.force_login)(self.guest)
+        response = await self.async_client.get(self.events_url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_no_stream_under_wsgi(self):
+        self.client.force_login(self.staff)
+        
+        self.assertEqual(self.client.get(self.events_url).status_code, 204)
+        self.assertNotContains(self.client.get(reverse('staff_dashboard')), 'EventSource')
+
+    async def test_stream_delivers_deltas_and_heartbeats(self):
+        await sync_to_async(self.async_client.force_login)(self.staff)
+        response = await self.async_client.get(self.events_url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        
+        chunks = response.streaming_content.__aiter__()
+        self.assertEqual(await chunks.__anext__(), b'retry: 5000\n\n')
+        
+        get_broker().publish(BOOKINGS_CHANNEL, {'event': 'created', 'id': 7})
+        chunk = await chunks.__anext__()
+        self.assertEqual(json.loads(chunk.decode().split('data: ')[1]), {'event': 'created', 'id': 7})
+        
+        self.assertEqual(await chunks.__anext__(), b': keep-alive\n\n')
+        await chunks.aclose()
@@ -0,0 +1,116 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking, SlotHold
+from booking.availability import free_tables
+from booking.holds import place_hold, release_holds, is_held_by_other
+from booking.tests.utils import SHARED_CACHE
+
+@override_settings(CACHES=SHARED_CACHE)
+class SlotHoldTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_hold_hides_table_from_other_users(self):
+        place_hold(self.alice, self.table.id, self.tomorrow, time(19, 0))
+        
+        self.assertEqual(free_tables(self.tomorrow, time(20, 0), 2, user=self.bob), [])
+        self.assertEqual(free_tables(self.tomorrow, time(19, 0), 2, user=self.alice), [self.table.id])
+        self.assertEqual(free_tables(self.tomorrow, time(21, 0), 2, user=self.bob), [self.table.id])
+
+    def test_conflicting_hold_is_refused(self):
+        self.assertIsNotNone(place_hold(self.alice, self.table.id, self.tomorrow, time(19, 0)))
+        self.assertIsNone(place_hold(self.bob, self.table.id, self.tomorrow, time(19, 30)))
+
+    def test_slot_constraint_refuses_hold_missed_by_stale_cache(self):
+        place_hold(self.alice, self.table.id, self.tomorrow, time(19, 0))
+        # As if another process's cache had not heard of Alice's hold yet
+        cache.set(f'booking:holds:{self.tomorrow.isoformat()}', [])
+        
+        self.assertIsNone(place_hold(self.bob, self.table.id, self.tomorrow, time(19, 30)))
+        self.assertEqual(SlotHold.objects.get().user, self.alice)
+
+    def test_new_hold_replaces_previous_one(self):
+        place_hold(self.alice, self.table.id, self.tomorrow, time(12, 0))
+        place_hold(self.alice, self.table.id, self.tomorrow, time(19, 0))
+        
+        self.assertEqual(SlotHold.objects.filter(user=self.alice).count(), 1)
+        self.assertFalse(is_held_by_other(self.bob, self.table.id, self.tomorrow, time(12, 0)))
+
+    def test_release_frees_the_slot(self):
+        place_hold(self.alice, self.table.id, self.tomorrow, time(19, 0))
+        release_holds(self.alice)
+        
+        self.assertFalse(is_held_by_other(self.bob, self.table.id, self.tomorrow, time(19, 0)))
+
+    @override_settings(BOOKING_HOLD_TTL=0)
+    def test_expired_holds_are_ignored_and_swept(self):
+        place_hold(self.alice, self.table.id, self.tomorrow, time(19, 0))
+        
+        self.assertFalse(is_held_by_other(self.bob, self.table.id, self.tomorrow, time(19, 0)))
+        place_hold(self.bob, self.table.id, self.tomorrow, time(19, 0))
+        self.assertFalse(SlotHold.objects.filter(user=self.alice).exists())
+
+    def test_cached_holds_need_no_query(self):
+        place_hold(self.alice, self.table.id, self.tomorrow, time(19, 0))
+        is_held_by_other(self.bob, self.table.id, self.tomorrow, time(19, 0))
+        
+        with self.assertNumQueries(0):
+            self.assertTrue(is_held_by_other(self.bob, self.table.id, self.tomorrow, time(19, 0)))
+
+class CreateBookingHoldTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.create_booking_url = reverse('create_booking', args=[self.table.id])
+
+    def tearDown(self):
+        cache.clear()
+
+    def login(self, username):
+        self.client.login(username=username, password='testpass123')
+        session = self.client.session
+        session['booking_date'] = self.tomorrow.isoformat()
+        session['booking_time'] = '19:00:00'
+        session['booking_num_guests'] = 2
+        session.save()
+
+    def test_picking_a_table_holds_it(self):
+        self.login('alice')
+        response = self.client.get(self.create_booking_url)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(SlotHold.objects.filter(user=self.alice, table=self.table).exists())
+
+    def test_held_table_cannot_be_picked_by_others(self):
+        place_hold(self.alice, self.table.id, self.tomorrow, time(19, 0))
+        self.login('bob')
+        response = self.client.get(self.create_booking_url)
+        
+        self.assertRedirects(response, reverse('search_availability'), fetch_redirect_response=False)
+
+    def test_booking_releases_the_hold(self):
+        self.login('alice')
+        self.client.get(self.create_booking_url)
+        self.client.post(self.create_booking_url, {
+            'date': self.tomorrow,
+            'time': '19:00',
+            'num_guests': 2,
+        })
+        
+        self.assertTrue(Booking.objects.filter(customer=self.alice).exists())
+        self.assertFalse(SlotHold.objects.exists())
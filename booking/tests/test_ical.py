@@ -0,0 +1,126 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking
+from booking.ical import _fold, feed_token
+from booking.tests.utils import SHARED_CACHE
+import json
+import os
+import tempfile
+from io import StringIO
+
+@override_settings(CACHES=SHARED_CACHE)
+class CalendarFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.staff = User.objects.create_user(username='staff', password='testpass123')
+        self.staff.profile.is_staff = True
+        self.staff.profile.save()
+        self.table = Table.objects.create(number=7, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.booking = self.book(self.user, time(19, 0), special_requests='Birthday, window seat')
+        self.book(self.other, time(12, 0))
+
+    def book(self, customer, at, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                customer=customer, table=self.table, date=self.tomorrow, time=at, num_guests=2,
+                status='CONFIRMED', **kwargs
+            )
+
+    def feed(self, user, staff=False, **headers):
+        name = 'staff_calendar_feed' if staff else 'calendar_feed'
+        return self.client.get(reverse(name, args=[feed_token(user, staff)]), headers=headers)
+
+    def test_guest_feed_lists_own_bookings(self):
+        response = self.feed(self.user)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+        self.assertIn(f'UID:booking-{self.booking.pk}@', body)
+        self.assertIn('DESCRIPTION:2 guest(s) at table 7\\nBirthday\\, window seat', body)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_unchanged_feed_is_304_without_queries(self):
+        etag = self.feed(self.user)['ETag']
+        
+        with self.assertNumQueries(0):
+            response = self.feed(self.user, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_gives_new_etag(self):
+        etag = self.feed(self.user)['ETag']
+        self.book(self.other, time(21, 0))
+        # Only the other guest's bookings changed
+        self.assertEqual(self.feed(self.user, if_none_match=etag).status_code, 304)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.delete()
+        response = self.feed(self.user, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('BEGIN:VEVENT', b''.join(response.streaming_content).decode())
+
+    def test_staff_feed(self):
+        response = self.feed(self.staff, staff=True)
+        
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertIn('SUMMARY:Table 7: testuser', body)
+        
+        etag = response['ETag']
+        self.book(self.other, time(21, 0))
+        self.assertEqual(self.feed(self.staff, staff=True, if_none_match=etag).status_code, 200)
+
+    def test_staff_feed_needs_staff_token_and_role(self):
+        self.assertEqual(self.client.get(reverse('staff_calendar_feed', args=[feed_token(self.staff)])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('calendar_feed', args=['1:forged'])).status_code, 404)
+        self.assertEqual(self.feed(self.user, staff=True).status_code, 403)
+
+    def test_rotating_the_nonce_revokes_old_links(self):
+        old_token = feed_token(self.user)
+        self.client.login(username='testuser', password='testpass123')
+        self.client.post(reverse('profile'), {'rotate_calendar': ''})
+        self.user.refresh_from_db()
+        
+        self.assertEqual(self.client.get(reverse('calendar_feed', args=[old_token])).status_code, 404)
+        self.assertEqual(self.feed(self.user).status_code, 200)
+
+    def test_import_moves_the_guests_marker(self):
+        etag = self.feed(self.user)['ETag']
+        path = os.path.join(tempfile.mkdtemp(), 'bookings.jsonl')
+        with open(path, 'w') as f:
+            f.write(json.dumps({
+                'customer': 'testuser', 'table': 7, 'date': self.tomorrow.isoformat(), 'time': '21:00',
+                'num_guests': 2, 'status': 'CONFIRMED',
+            }) + '\n')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_data', 'bookings', path, stdout=StringIO())
+        self.assertEqual(self.feed(self.user, if_none_match=etag).status_code, 200)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_no_validators_with_a_per_process_cache(self):
+        response = self.feed(self.user)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_long_lines_folded(self):
+        folded = _fold('DESCRIPTION:' + 'é' * 60)
+        
+        lines = folded.split('\r\n')
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        self.assertEqual(''.join(line[1:] if n else line for n, line in enumerate(lines)), 'DESCRIPTION:' + 'é' * 60)
@@ -0,0 +1,94 @@
+from io import StringIO
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking, SlotInventory
+
+class SlotInventoryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.other_table = Table.objects.create(number=2, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            customer=self.user,
+            table=self.table,
+            date=self.tomorrow,
+            time=time(19, 0),
+            num_guests=2,
+            status='CONFIRMED'
+        )
+
+    def slots(self):
+        return list(SlotInventory.objects.order_by('slot').values_list('table_id', 'date', 'slot'))
+
+    def test_create_fills_inventory(self):
+        self.assertEqual(self.slots(), [(self.table.id, self.tomorrow, slot) for slot in range(38, 42)])
+
+    def test_move_rewrites_inventory(self):
+        self.booking.table = self.other_table
+        self.booking.time = time(12, 30)
+        self.booking.save()
+        
+        self.assertEqual(self.slots(), [(self.other_table.id, self.tomorrow, slot) for slot in range(25, 29)])
+
+    def test_cancel_releases_inventory(self):
+        self.booking.status = 'CANCELLED'
+        self.booking.save()
+        
+        self.assertEqual(self.slots(), [])
+
+    def test_delete_releases_inventory(self):
+        self.booking.delete()
+        
+        self.assertEqual(self.slots(), [])
+
+class RebuildInventoryCommandTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        table = Table.objects.create(number=1, capacity=4)
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        for offset in range(3):
+            Booking.objects.create(
+                customer=user,
+                table=table,
+                date=tomorrow + timedelta(days=offset),
+                time=time(19, 0),
+                num_guests=2,
+                status='CONFIRMED'
+            )
+        self.expected = set(SlotInventory.objects.values_list('booking_id', 'table_id', 'date', 'slot'))
+
+    def test_verify_passes_when_in_sync(self):
+        out = StringIO()
+        call_command('rebuild_inventory', '--verify', stdout=out)
+        self.assertIn('matches bookings on 3 date(s)', out.getvalue())
+
+    def test_verify_reports_drift(self):
+        SlotInventory.objects.filter(slot=38).delete()
+        
+        with self.assertRaises(CommandError):
+            call_command('rebuild_inventory', '--verify', stdout=StringIO())
+
+    def test_rebuild_restores_inventory(self):
+        SlotInventory.objects.all().delete()
+        
+        call_command('rebuild_inventory', '--batch-size', '2', stdout=StringIO())
+        
+        self.assertEqual(
+            set(SlotInventory.objects.values_list('booking_id', 'table_id', 'date', 'slot')),
+            self.expected
+        )
+
+    def test_rebuild_drops_stale_slots(self):
+        # Queryset updates bypass Booking.save and leave the inventory stale
+        cancelled = Booking.objects.first()
+        Booking.objects.filter(pk=cancelled.pk).update(status='CANCELLED')
+        
+        call_command('rebuild_inventory', stdout=StringIO())
+        
+        self.assertFalse(SlotInventory.objects.filter(booking=cancelled).exists())
+        self.assertEqual(SlotInventory.objects.count(), 8)
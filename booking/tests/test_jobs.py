@@ -0,0 +1,162 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta, time
+from io import StringIO
+from booking.models import Table, Booking, Job
+from booking.jobs import claim, enqueue, job, requeue_stale, retry_delay, run_due
+from booking.recurrence import cancel_series, create_series
+
+calls = []
+
+@job
+def record(value):
+    calls.append(value)
+
+@job
+def flaky():
+    raise ConnectionError('mail server down')
+
+@override_settings(JOB_MAX_ATTEMPTS=3, JOB_RETRY_DELAY=30, JOB_RETRY_MAX_DELAY=3600, JOB_TIMEOUT=600)
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_job_runs_once(self):
+        queued = enqueue(record, 'a')
+        
+        self.assertEqual(calls, [])
+        self.assertEqual(run_due(), 1)
+        self.assertEqual(run_due(), 0)
+        self.assertEqual(calls, ['a'])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('DONE', 1))
+
+    def test_unregistered_function_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue(print, 'a')
+
+    def test_claimed_job_not_claimed_again(self):
+        enqueue(record, 'a')
+        
+        self.assertEqual(len(claim(10)), 1)
+        self.assertEqual(claim(10), [])
+
+    def test_failure_retried_with_backoff_then_failed(self):
+        queued = enqueue(flaky)
+        before = timezone.now()
+        
+        with self.assertLogs('booking.jobs', 'ERROR'):
+            run_due()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('QUEUED', 1))
+        self.assertGreaterEqual(queued.run_at, before + timedelta(seconds=30))
+        self.assertIn('mail server down', queued.last_error)
+        # Not due until the delay has passed
+        self.assertEqual(run_due(), 0)
+        
+        for _ in range(2):
+            Job.objects.update(run_at=timezone.now())
+            with self.assertLogs('booking.jobs', 'ERROR'):
+                run_due()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('FAILED', 3))
+
+    def test_retry_delay_doubles_up_to_cap(self):
+        self.assertTrue(30 <= retry_delay(1) <= 37.5)
+        self.assertTrue(60 <= retry_delay(2) <= 75)
+        self.assertTrue(3600 <= retry_delay(20) <= 4500)
+
+    def test_stale_running_job_requeued(self):
+        queued = enqueue(record, 'a')
+        claim(1)
+        Job.objects.update(locked_at=timezone.now() - timedelta(seconds=601))
+        
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(run_due(), 1)
+        self.assertEqual(calls, ['a'])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('DONE', 2))
+
+    def test_run_jobs_command_exits_when_idle(self):
+        # The worker threads have their own connections, which cannot see
+        # jobs queued in this test's transaction, so none are queued here
+        out = StringIO()
+        call_command('run_jobs', '--once', '--threads', '1', stdout=out, verbosity=2)
+        
+        self.assertEqual(out.getvalue().strip(), 'Ran 0 job(s)')
+
+class EmailJobTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+
+    def test_password_reset_mail_queued(self):
+        response = self.client.post(reverse('password_reset'), {'email': 'test@example.com'})
+        
+        self.assertRedirects(response, reverse('password_reset_done'), fetch_redirect_response=False)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(run_due(), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@example.com'])
+        self.assertIn('/accounts/password-reset-confirm/', mail.outbox[0].body)
+
+    def test_booking_confirmation_queued(self):
+        self.client.login(username='testuser', password='testpass123')
+        session = self.client.session
+        session['booking_date'] = self.tomorrow.isoformat()
+        session['booking_time'] = '19:00:00'
+        session['booking_num_guests'] = 2
+        session.save()
+        
+        response = self.client.post(
+            reverse('create_booking', args=[self.table.id]),
+            {'date': self.tomorrow, 'time': '19:00', 'num_guests': 2, 'special_requests': ''}
+        )
+        
+        booking = Booking.objects.get()
+        self.assertRedirects(response, reverse('booking-detail', args=[booking.pk]))
+        self.assertEqual(len(mail.outbox), 0)
+        run_due()
+        self.assertEqual(mail.outbox[0].subject, 'Your booking is confirmed')
+        self.assertIn(booking.get_absolute_url(), mail.outbox[0].body)
+
+    def test_cancellation_notice_sent_once(self):
+        booking = Booking.objects.create(
+            customer=self.user, table=self.table, date=self.tomorrow, time=time(19, 0), num_guests=2, status='CONFIRMED'
+        )
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.status = 'CANCELLED'
+        booking.save()
+        booking.special_requests = 'Window seat'
+        booking.save()
+        booking.delete()
+        
+        run_due()
+        self.assertEqual([message.subject for message in mail.outbox], ['Your booking has been cancelled'])
+
+    def test_deleted_booking_notice(self):
+        booking = Booking.objects.create(
+            customer=self.user, table=self.table, date=self.tomorrow, time=time(19, 0), num_guests=2, status='CONFIRMED'
+        )
+        booking.delete()
+        
+        run_due()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('has been cancelled', mail.outbox[0].body)
+
+    def test_series_mails_once_per_series(self):
+        series = create_series(self.user, self.table, self.tomorrow, time(19, 0), 2, occurrences=4)
+        cancel_series(series)
+        
+        run_due()
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            ['Your standing booking is confirmed', 'Your standing booking has been cancelled'],
+        )
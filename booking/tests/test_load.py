@@ -0,0 +1,55 @@
+import random
+from io import StringIO
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.db import connection
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.management.commands.load_test import Command as LoadTest, Stats, percentile
+from booking.models import Table, Booking
+
+class LoadTestHelpersTest(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        
+        self.assertEqual(percentile(values, 0.5), 51)
+        self.assertEqual(percentile(values, 0.99), 100)
+        self.assertEqual(percentile([], 0.95), 0)
+
+    def test_double_bookings_ignore_cancelled_and_other_tables(self):
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        for number in (1, 2):
+            table = Table.objects.create(number=number, capacity=4)
+            for status in ('CONFIRMED', 'CANCELLED'):
+                Booking.objects.create(
+                    customer=user, table=table, date=tomorrow, time=time(19, 0), num_guests=2, status=status
+                )
+        
+        self.assertEqual(LoadTest().double_bookings(), 0)
+        
+        # Written behind the slot inventory's back, as a broken code path would
+        Booking.objects.filter(status='CANCELLED', table__number=1).update(status='CONFIRMED')
+        self.assertEqual(LoadTest().double_bookings(), 1)
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoadTestRushTest(TransactionTestCase):
+    """A short rush on a few tables, so guests fight over the same holds"""
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Threads need a file-backed test database")
+
+    def test_short_rush_has_no_errors(self):
+        command = LoadTest(stdout=StringIO())
+        command.options = {
+            'tables': 4, 'users': 30, 'bookings': 10, 'seed': 7, 'rate': 8, 'duration': 2,
+            'workers': 8, 'update_ratio': 0.2, 'cancel_ratio': 0.1,
+        }
+        command.stats = Stats()
+        command.seed(random.Random(7))
+        command.rush(random.Random(7))
+        
+        self.assertGreater(len(command.stats.latencies['hold']), 0)
+        self.assertEqual(dict(command.stats.samples), {})
+        self.assertEqual(command.double_bookings(), 0)
@@ -0,0 +1,53 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.cache import cache
+from booking.models import MenuCategory, MenuItem
+from booking.menu_cache import menu_version
+
+class MenuCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.menu_url = reverse('menu')
+        self.category = MenuCategory.objects.create(name="Main Courses")
+        self.menu_item = MenuItem.objects.create(
+            name="Test Dish",
+            description="Test description",
+            price=19.99,
+            category=self.category
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_steady_state_needs_no_queries(self):
+        self.client.get(self.menu_url)
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(self.menu_url)
+        self.assertContains(response, "Test Dish")
+
+    def test_item_change_bumps_version(self):
+        version = menu_version()
+        self.client.get(self.menu_url)
+        
+        # The same path admin list_editable takes
+        self.menu_item.price = 24.50
+        self.menu_item.save()
+        
+        self.assertGreater(menu_version(), version)
+        self.assertContains(self.client.get(self.menu_url), "24.50")
+
+    def test_category_delete_bumps_version(self):
+        self.client.get(self.menu_url)
+        self.category.delete()
+        
+        response = self.client.get(self.menu_url)
+        self.assertNotContains(response, "Main Courses")
+
+    def test_lost_version_does_not_serve_stale_menu(self):
+        self.client.get(self.menu_url)
+        cache.delete('menu:version')
+        MenuItem.objects.filter(pk=self.menu_item.pk).update(name="Renamed Dish")
+        
+        self.assertContains(self.client.get(self.menu_url), "Renamed Dish")
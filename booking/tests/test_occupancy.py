@@ -0,0 +1,89 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking
+from booking.occupancy import occupancy_heatmap
+
+class OccupancyHeatmapTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.other_table = Table.objects.create(number=2, capacity=6)
+        self.today = timezone.now().date()
+        for table, guests in ((self.table, 3), (self.other_table, 5)):
+            Booking.objects.create(
+                customer=self.user,
+                table=table,
+                date=self.today,
+                time=time(19, 0),
+                num_guests=guests,
+                status='CONFIRMED'
+            )
+        Booking.objects.create(
+            customer=self.user,
+            table=self.table,
+            date=self.today + timedelta(days=1),
+            time=time(12, 0),
+            num_guests=2,
+            status='CANCELLED'
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def cell(self, heatmap, day, start):
+        return heatmap['days'][day]['cells'][heatmap['times'].index(start)]
+
+    def test_heatmap_aggregates_in_three_queries_then_caches(self):
+        with self.assertNumQueries(3):
+            occupancy_heatmap(self.today, 90)
+        with self.assertNumQueries(0):
+            heatmap = occupancy_heatmap(self.today, 90)
+        self.assertEqual(len(heatmap['days']), 90)
+
+    def test_covers_and_occupancy_per_slot(self):
+        heatmap = occupancy_heatmap(self.today)
+        
+        self.assertEqual(self.cell(heatmap, 0, time(20, 30)), {'covers': 8, 'occupancy': 100, 'heat': 0.85})
+        self.assertEqual(self.cell(heatmap, 0, time(21, 0))['covers'], 0)
+        self.assertEqual(self.cell(heatmap, 1, time(12, 0))['covers'], 0)
+
+    def test_day_and_table_totals(self):
+        heatmap = occupancy_heatmap(self.today)
+        
+        self.assertEqual(heatmap['days'][0]['guests'], 8)
+        self.assertEqual(heatmap['days'][0]['bookings'], 2)
+        self.assertEqual(heatmap['days'][0]['peak'], 100)
+        self.assertEqual([table['guests'] for table in heatmap['tables']], [3, 5])
+
+    def test_table_totals_ignore_bookings_outside_range(self):
+        Booking.objects.create(
+            customer=self.user,
+            table=self.other_table,
+            date=self.today - timedelta(days=30),
+            time=time(19, 0),
+            num_guests=6,
+            status='CONFIRMED'
+        )
+        Table.objects.create(number=3, capacity=2)
+        
+        heatmap = occupancy_heatmap(self.today)
+        
+        self.assertEqual([table['booked'] for table in heatmap['tables']], [1, 1, 0])
+        self.assertEqual([table['guests'] for table in heatmap['tables']], [3, 5, 0])
+
+    def test_dashboard_renders_heatmap(self):
+        staff = User.objects.create_user(username='staff', password='testpass123')
+        staff.profile.is_staff = True
+        staff.profile.save()
+        client = Client()
+        client.login(username='staff', password='testpass123')
+        
+        response = client.get(reverse('staff_dashboard'), {'days': 30})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['heatmap']['days']), 30)
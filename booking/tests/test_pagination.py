@@ -0,0 +1,94 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking
+from booking.pagination import decode_cursor, encode_cursor, paginate
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.staff = User.objects.create_user(username='staffuser', password='testpass123')
+        self.staff.profile.is_staff = True
+        self.staff.profile.save()
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.other_table = Table.objects.create(number=2, capacity=4)
+        
+        # Five evenings with two bookings each at the same time
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.bookings = []
+        for offset in range(5):
+            for table in (self.table, self.other_table):
+                self.bookings.append(Booking.objects.create(
+                    customer=self.user,
+                    table=table,
+                    date=self.tomorrow + timedelta(days=offset),
+                    time=time(19, 0),
+                    num_guests=2,
+                    status="CONFIRMED"
+                ))
+
+    def walk(self, **kwargs):
+        seen = []
+        page = paginate(Booking.objects.all(), per_page=3, **kwargs)
+        seen.extend(page.bookings)
+        while page.next_cursor:
+            page = paginate(Booking.objects.all(), page.next_cursor, per_page=3, **kwargs)
+            seen.extend(page.bookings)
+        return seen
+
+    def test_pages_cover_every_booking_once_in_order(self):
+        self.assertEqual(self.walk(), self.bookings)
+        self.assertEqual(self.walk(descending=True), self.bookings[::-1])
+
+    def test_cursor_round_trip(self):
+        booking = self.bookings[3]
+        
+        self.assertEqual(decode_cursor(encode_cursor(booking)), (booking.date, booking.time, booking.pk))
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+    def test_page_query_count_is_independent_of_depth(self):
+        cursor = encode_cursor(self.bookings[7])
+        with self.assertNumQueries(1):
+            paginate(Booking.objects.all(), cursor, per_page=3)
+
+    def test_booking_list_json(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('bookings'), {'format': 'json', 'per_page': 4})
+        
+        data = response.json()
+        self.assertEqual([row['id'] for row in data['bookings']], [b.pk for b in self.bookings[:-5:-1]])
+        
+        response = self.client.get(reverse('bookings'), {'format': 'json', 'per_page': 4, 'after': data['next']})
+        self.assertEqual([row['id'] for row in response.json()['bookings']], [b.pk for b in self.bookings[-5:-9:-1]])
+
+    def test_booking_list_pages(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('bookings'), {'per_page': 6})
+        
+        self.assertEqual(len(response.context['bookings']), 6)
+        self.assertContains(response, 'Older bookings')
+        response = self.client.get(reverse('bookings'), {'per_page': 6, 'after': response.context['next_cursor']})
+        self.assertEqual(len(response.context['bookings']), 4)
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_invalid_cursor_is_rejected(self):
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.get(reverse('bookings'), {'after': 'garbage'})
+        
+        self.assertEqual(response.status_code, 400)
+
+    def test_staff_upcoming_json(self):
+        self.client.login(username='staffuser', password='testpass123')
+        response = self.client.get(reverse('staff_dashboard'), {'format': 'json', 'list': 'upcoming', 'per_page': 2})
+        
+        data = response.json()
+        self.assertEqual([row['id'] for row in data['bookings']], [b.pk for b in self.bookings[:2]])
+        self.assertEqual(data['bookings'][0]['customer'], 'testuser')
+        self.assertIsNotNone(data['next'])
+        
+        response = self.client.get(reverse('staff_dashboard'), {'format': 'json', 'list': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,150 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from datetime import timedelta, time
+from booking.models import Table, MenuCategory, MenuItem, Booking
+from booking.menu_cache import menu_categories
+from booking.querycount import QueryCounter
+from booking.tests.utils import SHARED_CACHE
+
+@override_settings(CACHES=SHARED_CACHE)
+class QueryBudgetTest(TestCase):
+    """Each view must run a fixed number of queries however many rows it shows"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', 
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.staff = User.objects.create_user(username='staff', password='testpass123')
+        self.staff.profile.is_staff = True
+        self.staff.profile.save()
+        
+        self.today = timezone.now().date()
+        self.tables = 0
+        self.booking = self.add_bookings(1)[0]
+        self.add_menu(1)
+
+    def tearDown(self):
+        cache.clear()
+
+    def add_bookings(self, count):
+        bookings = []
+        for _ in range(count):
+            self.tables += 1
+            table = Table.objects.create(number=self.tables, capacity=4)
+            for offset in range(3):
+                bookings.append(Booking.objects.create(
+                    customer=self.user,
+                    table=table,
+                    date=self.today + timedelta(days=offset),
+                    time=time(19, 0),
+                    num_guests=2,
+                    status="CONFIRMED"
+                ))
+        return bookings
+
+    def add_menu(self, count):
+        for i in range(count):
+            category = MenuCategory.objects.create(name=f"Category {i}")
+            for j in range(3):
+                MenuItem.objects.create(name=f"Dish {i}.{j}", description="", price=10, category=category)
+
+    def grow(self):
+        self.add_bookings(10)
+        self.add_menu(5)
+
+    def count_queries(self, url, method='get', data=None):
+        with QueryCounter() as counter:
+            response = getattr(self.client, method)(url, data)
+        self.assertLess(response.status_code, 400)
+        return counter.count
+
+    def assertConstantQueries(self, budget, url, method='get', data=None, warm=None):
+        # Warm up caches and the session so the first count is steady-state;
+        # after growing, only what ``warm`` fills is warmed again
+        self.count_queries(url, method, data)
+        before = self.count_queries(url, method, data)
+        self.grow()
+        if warm:
+            warm()
+        after = self.count_queries(url, method, data)
+        self.assertEqual(before, after, f"{url} query count grows with data")
+        self.assertLessEqual(after, budget, f"{url} exceeds its query budget")
+
+    def login(self, user):
+        self.client.login(username=user.username, password='testpass123')
+
+    def test_home(self):
+        self.assertConstantQueries(0, reverse('home'))
+
+    def test_menu(self):
+        # Growing the menu moves its version, so the data is cached again
+        self.assertConstantQueries(0, reverse('menu'), warm=menu_categories)
+
+    def test_search_availability(self):
+        self.login(self.user)
+        self.assertConstantQueries(3, reverse('search_availability'))
+        self.assertConstantQueries(10, reverse('search_availability'), 'post', {
+            'date': self.today + timedelta(days=1),
+            'time': '12:00',
+            'num_guests': 2
+        })
+
+    def test_availability_grid(self):
+        self.assertConstantQueries(2, reverse('availability_grid'), data={
+            'start': self.today,
+            'num_guests': 2
+        })
+
+    def test_create_booking(self):
+        self.login(self.user)
+        session = self.client.session
+        session['booking_date'] = (self.today + timedelta(days=1)).isoformat()
+        session['booking_time'] = '12:00:00'
+        session['booking_num_guests'] = 2
+        session.save()
+        # Placing the hold sweeps expired holds and claims its slot rows
+        self.assertConstantQueries(14, reverse('create_booking', args=[self.booking.table_id]))
+
+    def test_booking_list(self):
+        self.login(self.user)
+        self.assertConstantQueries(4, reverse('bookings'))
+
+    def test_booking_detail_update_delete(self):
+        self.login(self.user)
+        for name in ('booking-detail', 'booking-update', 'booking-delete'):
+            self.assertConstantQueries(4, reverse(name, args=[self.booking.pk]))
+
+    def test_staff_dashboard(self):
+        self.login(self.staff)
+        self.assertConstantQueries(5, reverse('staff_dashboard'))
+
+    def test_accounts(self):
+        self.assertConstantQueries(0, reverse('register'))
+        self.assertConstantQueries(0, reverse('login'))
+        self.login(self.user)
+        self.assertConstantQueries(4, reverse('profile'))
+
+    @override_settings(DEBUG=True)
+    def test_debug_headers(self):
+        response = Client().get(reverse('menu'))
+        
+        self.assertEqual(response['X-Query-Count'], '2')
+        self.assertTrue(response['X-Query-Time'].endswith('ms'))
+
+    async def test_debug_headers_under_asgi(self):
+        with self.settings(DEBUG=True):
+            await sync_to_async(self.client.force_login)(self.user)
+            await sync_to_async(self.async_client.force_login)(self.user)
+            response = await self.async_client.get(reverse('bookings'))
+            expected = await sync_to_async(self.client.get)(reverse('bookings'))
+        
+        # The async view's queries run in a worker thread and still count
+        self.assertEqual(response['X-Query-Count'], expected['X-Query-Count'])
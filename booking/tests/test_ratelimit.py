@@ -0,0 +1,102 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta
+from booking.ratelimit import parse_rate, count_request, throttle_counts
+import threading
+
+LIMITS = {
+    'login': {'ip': '5/m', 'account': '2/m'},
+    'register': {'ip': '1/h'},
+    'password_reset': {'ip': '5/h', 'account': '1/h'},
+    'search': {'ip': '10/m', 'account': '1/m'},
+}
+
+@override_settings(RATE_LIMITS=LIMITS)
+class RateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+
+    def login(self, username, client=None):
+        return (client or self.client).post(reverse('login'), {'username': username, 'password': 'wrong-password'})
+
+    def test_window_resets(self):
+        self.assertEqual(parse_rate('5/15m'), (5, 900))
+        self.assertEqual(count_request('client', '2/m', now=0), 0)
+        self.assertEqual(count_request('client', '2/m', now=10), 0)
+        self.assertEqual(count_request('client', '2/m', now=15), 45)
+        self.assertEqual(count_request('client', '2/m', now=30), 30)
+        # The next minute starts afresh
+        self.assertEqual(count_request('client', '2/m', now=60), 0)
+        with self.assertRaises(ValueError):
+            parse_rate('often')
+
+    def test_login_throttled_per_account_before_hashing(self):
+        self.login('testuser')
+        self.login('TestUser')
+        with self.assertNumQueries(0):
+            response = self.login('testuser')
+        
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # Another account from the same address still gets through
+        self.assertEqual(self.login('someone').status_code, 200)
+        self.assertEqual(throttle_counts()[('login', 'account')], 1)
+
+    def test_concurrent_requests_cannot_overshoot(self):
+        barrier = threading.Barrier(20)
+        waits = []
+        
+        def request():
+            barrier.wait()
+            waits.append(count_request('client', '5/m', now=0))
+        
+        threads = [threading.Thread(target=request) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(waits.count(0), 5)
+
+    def test_log_hides_the_account(self):
+        self.login('testuser')
+        self.login('testuser')
+        with self.assertLogs('booking.ratelimit', 'WARNING') as logs:
+            self.login('testuser')
+        
+        self.assertNotIn('testuser', logs.output[0])
+
+    def test_login_throttled_per_ip(self):
+        for i in range(5):
+            self.login(f'user{i}')
+        
+        self.assertEqual(self.login('user5').status_code, 429)
+        self.assertEqual(self.login('user5', Client(REMOTE_ADDR='10.0.0.2')).status_code, 200)
+
+    def test_login_page_is_not_throttled(self):
+        for _ in range(10):
+            response = self.client.get(reverse('login'))
+        
+        self.assertEqual(response.status_code, 200)
+
+    def test_register_and_password_reset_throttled(self):
+        self.client.post(reverse('register'), {'username': 'newuser'})
+        self.assertEqual(self.client.post(reverse('register'), {'username': 'newuser'}).status_code, 429)
+        
+        self.client.post(reverse('password_reset'), {'email': 'test@example.com'})
+        response = self.client.post(reverse('password_reset'), {'email': 'test@example.com'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_search_throttled_per_user(self):
+        self.client.login(username='testuser', password='testpass123')
+        data = {'date': timezone.now().date() + timedelta(days=1), 'time': '12:00', 'num_guests': 2}
+        self.client.post(reverse('search_availability'), data)
+        
+        self.assertEqual(self.client.post(reverse('search_availability'), data).status_code, 429)
+        self.assertEqual(throttle_counts()[('search', 'account')], 1)
@@ -0,0 +1,93 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking, BookingSeries, SlotInventory
+from booking.recurrence import cancel_series, conflicting_dates, create_series, move_series, occurrence_dates
+
+class RecurringBookingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=6)
+        self.other_table = Table.objects.create(number=2, capacity=6)
+        self.start = timezone.now().date() + timedelta(days=1)
+
+    def book(self, date, table=None, at=time(12, 30)):
+        return Booking.objects.create(
+            customer=self.user, table=table or self.table, date=date, time=at, num_guests=2, status='CONFIRMED'
+        )
+
+    def test_occurrence_dates(self):
+        dates = occurrence_dates(self.start, 3, interval_weeks=2)
+        
+        self.assertEqual(dates, [self.start, self.start + timedelta(weeks=2), self.start + timedelta(weeks=4)])
+
+    def test_create_series_in_constant_queries(self):
+        # Conflicts, holds (on a cold cache), the series, its bookings and
+        # their slots in a savepoint, whatever the number of weeks
+        with self.assertNumQueries(7):
+            series = create_series(self.user, self.table, self.start, time(12, 30), 6, 12)
+        
+        self.assertEqual(series.bookings.count(), 12)
+        self.assertEqual(SlotInventory.objects.filter(booking__series=series).count(), 12 * 4)
+        self.assertEqual(series.bookings.filter(status='CONFIRMED').count(), 12)
+
+    def test_conflicts_reject_the_whole_series(self):
+        taken = self.start + timedelta(weeks=3)
+        self.book(taken, at=time(13, 0))
+        
+        self.assertEqual(conflicting_dates(self.table.pk, occurrence_dates(self.start, 12), time(12, 30)), [taken])
+        with self.assertRaisesMessage(ValidationError, 'already booked'):
+            create_series(self.user, self.table, self.start, time(12, 30), 6, 12)
+        self.assertFalse(BookingSeries.objects.exists())
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_cancel_series_from_date(self):
+        series = create_series(self.user, self.table, self.start, time(12, 30), 4, 4)
+        cancelled = cancel_series(series, from_date=self.start + timedelta(weeks=2))
+        
+        self.assertEqual(cancelled, 2)
+        self.assertEqual(list(series.bookings.order_by('date').values_list('status', flat=True)),
+                         ['CONFIRMED', 'CONFIRMED', 'CANCELLED', 'CANCELLED'])
+        self.assertEqual(SlotInventory.objects.filter(booking__series=series).count(), 2 * 4)
+
+    def test_move_series_checks_every_date(self):
+        series = create_series(self.user, self.table, self.start, time(12, 30), 4, 4)
+        series.bookings.update(reminder_sent_at=timezone.now())
+        # Overlapping its own old slots is not a conflict
+        self.assertEqual(move_series(series, time=time(13, 0)), 4)
+        self.assertEqual(set(series.bookings.values_list('time', flat=True)), {time(13, 0)})
+        # Guests are reminded of the new time
+        self.assertFalse(series.bookings.filter(reminder_sent_at__isnull=False).exists())
+        
+        self.book(self.start + timedelta(weeks=1), table=self.other_table, at=time(14, 0))
+        with self.assertRaisesMessage(ValidationError, 'already booked'):
+            move_series(series, time=time(13, 0), table=self.other_table)
+        self.assertEqual(set(series.bookings.values_list('table', flat=True)), {self.table.pk})
+
+    def test_series_views(self):
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+        response = client.post(reverse('create_booking_series', args=[self.table.id]), {
+            'date': self.start,
+            'time': '12:30',
+            'num_guests': 6,
+            'interval_weeks': 1,
+            'occurrences': 12,
+        })
+        
+        series = BookingSeries.objects.get()
+        self.assertRedirects(response, reverse('booking-series-detail', args=[series.pk]))
+        self.assertEqual(len(client.get(reverse('booking-series-detail', args=[series.pk])).context['bookings']), 12)
+        self.assertEqual(client.get(reverse('create_booking_series', args=[self.table.id])).status_code, 200)
+        response = client.post(reverse('booking-series-detail', args=[series.pk]), {'action': 'cancel'})
+        self.assertRedirects(response, reverse('booking-series-detail', args=[series.pk]))
+        self.assertFalse(series.bookings.exclude(status='CANCELLED').exists())
+        
+        other = User.objects.create_user(username='otheruser', password='testpass123')
+        client.force_login(other)
+        self.assertEqual(client.get(reverse('booking-series-detail', args=[series.pk])).status_code, 404)
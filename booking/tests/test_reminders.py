@@ -0,0 +1,118 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta, time
+from io import StringIO
+from booking.models import Table, Booking
+from booking.reminders import Pacer, send_reminders
+import time as timer
+
+class FlakyBackend(EmailBackend):
+    """Delivers two messages, then fails like an unreachable mail server"""
+    def send_messages(self, messages):
+        if len(mail.outbox) >= 2:
+            raise ConnectionError('mail server down')
+        return super().send_messages(messages)
+
+class OverlappingRunBackend(EmailBackend):
+    """Starts a second run while the first sends, as a requeued job would"""
+    second_run = None
+    
+    def send_messages(self, messages):
+        if OverlappingRunBackend.second_run is None:
+            OverlappingRunBackend.second_run = 0
+            OverlappingRunBackend.second_run = send_reminders()
+        return super().send_messages(messages)
+
+@override_settings(REMINDER_RATE='1000/s', REMINDER_BATCH=2)
+class ReminderTest(TestCase):
+    def setUp(self):
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        self.tables = [Table.objects.create(number=n, capacity=4) for n in range(1, 5)]
+        self.guests = [
+            User.objects.create_user(username=f'guest{n}', email=f'guest{n}@example.com', password='testpass123')
+            for n in range(3)
+        ]
+        self.bookings = [
+            Booking.objects.create(
+                customer=guest, table=table, date=self.tomorrow, time=time(19, 0), num_guests=2, status='CONFIRMED'
+            )
+            for guest, table in zip(self.guests, self.tables)
+        ]
+
+    def test_reminds_each_guest_once(self):
+        # Two chunks, each claimed by one update and read back with its
+        # guests and tables joined in, and an empty one
+        with self.assertNumQueries(7):
+            self.assertEqual(send_reminders(), 3)
+        
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'guest{n}@example.com' for n in range(3)])
+        self.assertIn('at 19:00', mail.outbox[0].body)
+        self.assertFalse(Booking.objects.filter(reminder_sent_at__isnull=True).exists())
+        
+        # A rerun finds nobody left to remind
+        with self.assertNumQueries(1):
+            self.assertEqual(send_reminders(), 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_skips_cancelled_and_other_dates(self):
+        self.bookings[0].status = 'CANCELLED'
+        self.bookings[0].save()
+        Booking.objects.filter(pk=self.bookings[1].pk).update(date=self.tomorrow + timedelta(days=1))
+        
+        self.assertEqual(send_reminders(), 1)
+        self.assertEqual(mail.outbox[0].to, ['guest2@example.com'])
+
+    def test_guest_without_email_marked_without_sending(self):
+        User.objects.filter(pk=self.guests[0].pk).update(email='')
+        
+        self.assertEqual(send_reminders(), 2)
+        self.assertFalse(Booking.objects.filter(reminder_sent_at__isnull=True).exists())
+
+    def test_failure_keeps_reminders_already_sent(self):
+        with self.settings(REMINDER_BATCH=10, EMAIL_BACKEND=f'{__name__}.FlakyBackend'):
+            with self.assertRaises(ConnectionError):
+                send_reminders()
+        
+        self.assertEqual(Booking.objects.filter(reminder_sent_at__isnull=False).count(), 2)
+        # The retry sends only the reminder that failed
+        self.assertEqual(send_reminders(), 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_overlapping_runs_remind_each_guest_once(self):
+        OverlappingRunBackend.second_run = None
+        with self.settings(EMAIL_BACKEND=f'{__name__}.OverlappingRunBackend'):
+            first_run = send_reminders()
+        
+        # The second run left the first's chunk alone
+        self.assertEqual(first_run + OverlappingRunBackend.second_run, 3)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_moving_a_booking_clears_its_reminder(self):
+        send_reminders()
+        booking = Booking.objects.get(pk=self.bookings[0].pk)
+        booking.special_requests = 'High chair'
+        booking.save()
+        self.assertIsNotNone(Booking.objects.get(pk=booking.pk).reminder_sent_at)
+        
+        booking.time = time(20, 0)
+        booking.save(update_fields=['time'])
+        self.assertIsNone(Booking.objects.get(pk=booking.pk).reminder_sent_at)
+        self.assertEqual(send_reminders(), 1)
+
+    def test_pacer_spaces_sends(self):
+        pacer = Pacer('50/s')
+        start = timer.monotonic()
+        for _ in range(6):
+            pacer.wait()
+        
+        self.assertGreaterEqual(timer.monotonic() - start, 0.1)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('send_reminders', '--date', self.tomorrow.isoformat(), stdout=out)
+        
+        self.assertIn('Sent 3 reminder(s)', out.getvalue())
@@ -0,0 +1,76 @@
+from django.test import TransactionTestCase, RequestFactory, override_settings
+from django.http import HttpResponse
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from booking.models import Table
+from booking.routers import PIN_COOKIE, ReplicaPinningMiddleware, ReplicaRouter, use_primary
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_PIN_SECONDS=10)
+class ReplicaRouterTest(TransactionTestCase):
+    """Not a TestCase: its wrapping transaction would send every read to the primary"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def serve(self, view, cookies=None):
+        """Run ``view`` through the middleware; returns the response and the alias it read from"""
+        routed = []
+        def handler(request):
+            routed.append(view())
+            return HttpResponse()
+        request = self.factory.get('/')
+        request.COOKIES.update(cookies or {})
+        return ReplicaPinningMiddleware(handler)(request), routed[0]
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Table), 'default')
+
+    def test_request_reads_use_replica(self):
+        response, alias = self.serve(lambda: self.router.db_for_read(Table))
+        
+        self.assertEqual(alias, 'replica1')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_write_pins_request_and_browser(self):
+        def view():
+            Table.objects.create(number=1, capacity=4)
+            return self.router.db_for_read(Table)
+        response, alias = self.serve(view)
+        
+        self.assertEqual(alias, 'default')
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+        
+        # The next request from that browser still reads the primary
+        _, alias = self.serve(lambda: self.router.db_for_read(Table), {PIN_COOKIE: '1'})
+        self.assertEqual(alias, 'default')
+
+    def test_session_writes_do_not_pin(self):
+        self.assertEqual(self.router.db_for_write(Session), 'default')
+        _, alias = self.serve(lambda: (self.router.db_for_write(Session), self.router.db_for_read(User))[1])
+        
+        self.assertEqual(alias, 'replica1')
+        self.assertEqual(self.serve(lambda: self.router.db_for_read(Session))[1], 'default')
+
+    def test_conflict_checks_and_transactions_use_primary(self):
+        def view():
+            with use_primary():
+                checked = self.router.db_for_read(Table)
+            with transaction.atomic():
+                in_transaction = self.router.db_for_read(Table)
+            return checked, in_transaction, self.router.db_for_read(Table)
+        _, aliases = self.serve(view)
+        
+        self.assertEqual(aliases, ('default', 'default', 'replica1'))
+
+    async def test_async_write_pins_browser(self):
+        async def handler(request):
+            await sync_to_async(Table.objects.create)(number=1, capacity=4)
+            return HttpResponse()
+        middleware = ReplicaPinningMiddleware(handler)
+        
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(self.factory.get('/'))
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
@@ -0,0 +1,82 @@
+import random
+from io import StringIO
+from django.test import TestCase, SimpleTestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse
+from django.utils import timezone
+from booking.availability import booking_mask
+from booking.management.commands.benchmark_suite import Command as BenchmarkSuite
+from booking.models import Table, Booking
+from booking.seeding import SEED_PASSWORD, generate_bookings, seed_tables, seed_users
+
+class SeedingTest(TestCase):
+    def test_tables_are_joinable_in_rows(self):
+        tables = seed_tables(12)
+        
+        self.assertEqual([t.number for t in tables], list(range(1, 13)))
+        self.assertEqual(list(tables[0].joinable_with.all()), [tables[1]])
+        # Table 11 starts a new row
+        self.assertEqual(list(tables[10].joinable_with.all()), [tables[11]])
+
+    def test_users_have_profiles(self):
+        guests, staff = seed_users(3, staff=1)
+        
+        self.assertEqual(len(guests), 3)
+        self.assertTrue(staff[0].profile.is_staff)
+        self.assertFalse(User.objects.get(pk=guests[0].pk).profile.is_staff)
+        self.assertTrue(self.client.login(username=guests[0].username, password=SEED_PASSWORD))
+
+    def test_generated_bookings_never_overlap(self):
+        tables = [Table(pk=i, number=i, capacity=c) for i, c in enumerate([2, 4, 4, 8], 1)]
+        start = timezone.now().date()
+        bookings = list(generate_bookings(tables, [1, 2, 3], 500, start, 7, random.Random(1)))
+        
+        self.assertLessEqual(len(bookings), 500)
+        masks = {}
+        for booking in bookings:
+            self.assertLessEqual(booking.num_guests, next(t.capacity for t in tables if t.pk == booking.table_id))
+            if booking.status == 'CANCELLED':
+                continue
+            key = (booking.date, booking.table_id)
+            self.assertFalse(masks.get(key, 0) & booking_mask(booking.time))
+            masks[key] = masks.get(key, 0) | booking_mask(booking.time)
+
+    def test_seed_data_command(self):
+        out = StringIO()
+        call_command('seed_data', tables=10, users=20, bookings=300, days=7, stdout=out)
+        
+        self.assertEqual(Table.objects.count(), 10)
+        self.assertGreater(Booking.objects.count(), 0)
+        self.assertIn('Seeded', out.getvalue())
+        # The slot inventory written alongside agrees with the bookings
+        call_command('rebuild_inventory', verify=True, stdout=StringIO())
+        
+        with self.assertRaises(CommandError):
+            call_command('seed_data', tables=1, users=1, bookings=1, stdout=StringIO())
+        call_command('seed_data', tables=1, users=1, bookings=1, flush=True, stdout=StringIO())
+        self.assertEqual(Table.objects.count(), 1)
+
+class BenchmarkBaselineTest(SimpleTestCase):
+    baseline = {'1000': {'booking_list': {'ms': 10.0, 'queries': 4}}}
+
+    def regressions(self, ms, queries):
+        results = {'1000': {'booking_list': {'ms': ms, 'queries': queries}, 'new': {'ms': 1, 'queries': 1}}}
+        return BenchmarkSuite().regressions(results, self.baseline, tolerance=0.25)
+
+    def test_within_tolerance(self):
+        self.assertEqual(self.regressions(13.4, 4), [])
+
+    def test_slower_or_more_queries(self):
+        self.assertEqual(len(self.regressions(14.0, 4)), 1)
+        self.assertEqual(len(self.regressions(10.0, 5)), 1)
+
+    def test_unexpected_status_fails_the_run(self):
+        suite = BenchmarkSuite()
+        suite.repeat = 2
+        
+        self.assertEqual(suite.measure('booking_list', lambda: HttpResponse(), 200)['queries'], 0)
+        # A redirect to the login page is no success
+        with self.assertRaises(CommandError):
+            suite.measure('booking_list', lambda: HttpResponse(status=302), 200)
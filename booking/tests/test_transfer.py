@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking, SlotInventory
+
+class TransferCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.other_table = Table.objects.create(number=2, capacity=2)
+        self.table.joinable_with.add(self.other_table)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            customer=self.user,
+            table=self.table,
+            date=self.tomorrow,
+            time=time(19, 0),
+            num_guests=2,
+            special_requests='Window seat',
+            status='CONFIRMED'
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def export(self, model, name, **options):
+        call_command('export_data', model, output=self.path(name), stderr=StringIO(), **options)
+        with open(self.path(name)) as f:
+            return f.read()
+
+    def load(self, model, name, content=None, **options):
+        if content is not None:
+            with open(self.path(name), 'w') as f:
+                f.write(content)
+        stderr = StringIO()
+        try:
+            call_command('import_data', model, self.path(name), stdout=StringIO(), stderr=stderr, **options)
+        finally:
+            self.errors = stderr.getvalue()
+
+    def test_export_bookings_csv(self):
+        lines = self.export('bookings', 'bookings.csv').splitlines()
+        
+        self.assertEqual(lines[0], 'id,customer,table,date,time,num_guests,status,special_requests,created_at')
+        self.assertTrue(lines[1].startswith(
+            f'{self.booking.id},testuser,1,{self.tomorrow.isoformat()},19:00:00,2,CONFIRMED,Window seat,'
+        ))
+
+    def test_export_filters(self):
+        self.booking.status = 'CANCELLED'
+        self.booking.save()
+        
+        self.assertEqual(self.export('bookings', 'bookings.jsonl', status=['CONFIRMED']), '')
+        self.assertEqual(self.export('bookings', 'bookings.jsonl', end=timezone.now().date()), '')
+
+    def test_round_trip_jsonl(self):
+        tables = self.export('tables', 'tables.jsonl')
+        bookings = self.export('bookings', 'bookings.jsonl')
+        self.assertEqual(json.loads(tables.splitlines()[0])['joinable_with'], [2])
+        self.assertEqual(len(bookings.splitlines()), 1)
+        Table.objects.all().delete()
+        
+        self.load('tables', 'tables.jsonl')
+        self.load('bookings', 'bookings.jsonl')
+        
+        table = Table.objects.get(number=1)
+        self.assertEqual(list(table.joinable_with.values_list('number', flat=True)), [2])
+        booking = Booking.objects.get()
+        self.assertEqual((booking.customer, booking.table, booking.time), (self.user, table, time(19, 0)))
+        self.assertEqual(SlotInventory.objects.filter(booking=booking).count(), 4)
+
+    def test_import_updates_tables(self):
+        self.load('tables', 'tables.csv', 'number,capacity,joinable_with\n1,6,\n3,8,1 2\n')
+        
+        self.assertEqual(Table.objects.get(number=1).capacity, 6)
+        self.assertEqual(
+            set(Table.objects.get(number=3).joinable_with.values_list('number', flat=True)), {1, 2}
+        )
+
+    def test_import_rejects_what_clean_rejects(self):
+        header = 'customer,table,date,time,num_guests,status\n'
+        tomorrow = self.tomorrow.isoformat()
+        rows = [
+            f'testuser,2,{tomorrow},12:00,3,CONFIRMED',  # Too many guests
+            f'testuser,1,{tomorrow},20:00,2,CONFIRMED',  # Overlaps the existing booking
+            f'testuser,2,{tomorrow},12:00,2,CONFIRMED',
+            f'testuser,2,{tomorrow},13:00,2,CONFIRMED',  # Overlaps the row above
+            f'testuser,2,{tomorrow},13:00,2,CANCELLED',
+            f'nobody,2,{tomorrow},17:00,2,CONFIRMED',
+            f'testuser,2,{timezone.now().date() - timedelta(days=1)},12:00,2,CONFIRMED',
+            f'testuser,9,{tomorrow},12:00,2,CONFIRMED',
+        ]
+        
+        with self.assertRaisesMessage(CommandError, 'Rejected 6 row(s)'):
+            self.load('bookings', 'bookings.csv', header + '\n'.join(rows) + '\n', batch_size=3)
+        
+        self.assertIn('line 2: This table can only accommodate 2 guests', self.errors)
+        self.assertIn('line 3: This table is already booked', self.errors)
+        self.assertIn('line 5: This table is already booked', self.errors)
+        self.assertIn("line 7: guest 'nobody' does not exist", self.errors)
+        self.assertIn('line 8: Bookings cannot be made for past dates', self.errors)
+        self.assertIn('line 9: table 9 does not exist', self.errors)
+        self.assertEqual(Booking.objects.count(), 3)
+
+    def test_import_options(self):
+        content = f'customer,table,date,time,num_guests\nnewguest,2,{self.tomorrow.isoformat()},12:00,2\n'
+        
+        self.load('bookings', 'bookings.csv', content, create_users=True, dry_run=True)
+        self.assertFalse(User.objects.filter(username='newguest').exists())
+        self.assertEqual(Booking.objects.count(), 1)
+        
+        self.load('bookings', 'bookings.csv', create_users=True)
+        guest = User.objects.get(username='newguest')
+        self.assertFalse(guest.has_usable_password())
+        self.assertEqual(guest.bookings.get().status, 'PENDING')
+
+    def test_invalid_jsonl(self):
+        with self.assertRaisesMessage(CommandError, 'line 2: not valid JSON'):
+            self.load('tables', 'tables.jsonl', '{"number": 5, "capacity": 2}\n{"number":\n')
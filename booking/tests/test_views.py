@@ -1,9 +1,11 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.utils import timezone
 from datetime import datetime, timedelta, time
 from booking.models import Table, Booking
+from booking.tests.utils import SHARED_CACHE
 import json
 
 class HomeViewTest(TestCase):
@@ -177,6 +179,17 @@ class BookingDetailViewTest(TestCase):
         # Should return 404 as this booking doesn't belong to the logged in user
         self.assertEqual(response.status_code, 404)
 
+    def test_booking_update_redirects_to_detail(self):
+        response = self.client.post(reverse('booking-update', args=[self.booking.id]), {
+            'date': self.tomorrow,
+            'time': '20:00',
+            'num_guests': 3
+        })
+
+        self.assertRedirects(response, self.detail_url)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.time, time(20, 0))
+
 class AuthenticationTest(TestCase):
     def setUp(self):
         self.client = Client()
@@ -221,4 +234,67 @@ class AuthenticationTest(TestCase):
         # But creating a booking should require login
         create_booking_url = reverse('create_booking', args=[self.table.id])
         response = self.client.get(create_booking_url)
-        self.assertRedirects(response, f'/accounts/login/?next={create_booking_url}')
\ No newline at end of file
+        self.assertRedirects(response, f'/accounts/login/?next={create_booking_url}')
+
+@override_settings(CACHES=SHARED_CACHE)
+class AvailabilityGridViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.grid_url = reverse('availability_grid')
+        self.user = User.objects.create_user(
+            username='testuser', 
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.small = Table.objects.create(number=1, capacity=2)
+        self.large = Table.objects.create(number=2, capacity=6)
+        
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        for offset in range(3):
+            Booking.objects.create(
+                customer=self.user,
+                table=self.large,
+                date=self.tomorrow + timedelta(days=offset),
+                time=time(19, 0),
+                num_guests=4,
+                status="CONFIRMED"
+            )
+
+    def get_slot(self, data, day, slot_time):
+        slots = data['days'][day]['slots']
+        return next(slot for slot in slots if slot['time'] == slot_time)
+
+    def test_grid_counts_free_tables(self):
+        response = self.client.get(self.grid_url, {
+            'start': self.tomorrow,
+            'num_guests': 2,
+            'include_tables': 'true'
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['days']), 7)
+        self.assertEqual(len(data['days'][0]['slots']), 23)
+        self.assertEqual(self.get_slot(data, 0, '12:00')['free'], 2)
+        self.assertEqual(self.get_slot(data, 0, '20:00'), {'time': '20:00', 'free': 1, 'tables': [self.small.id]})
+        self.assertEqual(self.get_slot(data, 5, '20:00')['free'], 2)
+
+    def test_grid_query_count_is_independent_of_range(self):
+        cache.clear()
+        # Tables, booked slots and (on a cold cache) slot holds
+        with self.assertNumQueries(3):
+            self.client.get(self.grid_url, {
+                'start': self.tomorrow,
+                'end': self.tomorrow + timedelta(days=20),
+                'num_guests': 4
+            })
+
+    def test_grid_rejects_invalid_range(self):
+        response = self.client.get(self.grid_url, {
+            'start': self.tomorrow,
+            'end': self.tomorrow - timedelta(days=1),
+            'num_guests': 2
+        })
+        
+        self.assertEqual(response.status_code, 400)
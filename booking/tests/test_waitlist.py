@@ -0,0 +1,154 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta, time
+from booking.models import Table, Booking, SlotHold, WaitlistEntry
+from booking.holds import is_held_by_other, place_hold
+from booking import jobs, waitlist
+
+def send_queued_mail():
+    # Offers are emailed by the job worker
+    jobs.run_due()
+
+@override_settings(WAITLIST_OFFER_TTL=900)
+class WaitlistTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.guest = User.objects.create_user(username='guest', email='guest@example.com', password='testpass123')
+        self.table = Table.objects.create(number=1, capacity=4)
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            customer=self.user, table=self.table, date=self.tomorrow, time=time(19, 0), num_guests=4, status='CONFIRMED'
+        )
+
+    def join(self, user, earliest=time(18, 30), latest=time(19, 30), num_guests=2):
+        return WaitlistEntry.objects.create(
+            user=user, date=self.tomorrow, earliest_time=earliest, latest_time=latest, num_guests=num_guests
+        )
+
+    def test_cancellation_offers_table_to_first_in_line(self):
+        too_big = self.join(self.guest, num_guests=6)
+        first = self.join(self.guest)
+        second = self.join(self.user)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.delete()
+        send_queued_mail()
+        
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'OFFERED')
+        self.assertEqual((first.offered_table, first.offered_time), (self.table, time(18, 30)))
+        self.assertTrue(is_held_by_other(self.user, self.table.id, self.tomorrow, time(19, 0)))
+        self.assertEqual(WaitlistEntry.objects.get(pk=second.pk).status, 'WAITING')
+        self.assertEqual(WaitlistEntry.objects.get(pk=too_big.pk).status, 'WAITING')
+        # The other email is the cancellation notice to the booking's guest
+        offers = [message for message in mail.outbox if message.subject == 'A table is free for you']
+        self.assertEqual(len(offers), 1)
+        self.assertEqual(offers[0].to, ['guest@example.com'])
+        self.assertIn(reverse('waitlist_claim', args=[first.pk]), offers[0].body)
+
+    def test_no_offer_when_window_does_not_fit(self):
+        entry = self.join(self.guest, earliest=time(12, 0), latest=time(12, 0))
+        Booking.objects.create(
+            customer=self.user, table=self.table, date=self.tomorrow, time=time(11, 0), num_guests=2, status='CONFIRMED'
+        )
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.delete()
+        
+        self.assertEqual(WaitlistEntry.objects.get(pk=entry.pk).status, 'WAITING')
+
+    def test_expired_offer_passes_to_next_guest(self):
+        first = self.join(self.guest)
+        second = self.join(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.delete()
+        
+        # Let the offer and its hold run out
+        past = timezone.now() - timedelta(seconds=1)
+        SlotHold.objects.update(expires_at=past)
+        WaitlistEntry.objects.filter(pk=first.pk).update(offer_expires_at=past)
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            expired = waitlist.expire_offers()
+        send_queued_mail()
+        
+        self.assertEqual(expired, 1)
+        self.assertEqual(WaitlistEntry.objects.get(pk=first.pk).status, 'EXPIRED')
+        # The expired hold no longer blocks the table
+        self.assertEqual(WaitlistEntry.objects.get(pk=second.pk).status, 'OFFERED')
+
+    def test_claim_and_book(self):
+        entry = self.join(self.guest)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.delete()
+        self.client.login(username='guest', password='testpass123')
+        
+        response = self.client.get(reverse('waitlist_claim', args=[entry.pk]))
+        self.assertRedirects(response, reverse('create_booking', args=[self.table.id]))
+        self.client.post(reverse('create_booking', args=[self.table.id]), {
+            'date': self.tomorrow, 'time': '18:30', 'num_guests': 2,
+        })
+        
+        self.assertTrue(Booking.objects.filter(customer=self.guest, date=self.tomorrow).exists())
+        self.assertEqual(WaitlistEntry.objects.get(pk=entry.pk).status, 'BOOKED')
+        self.assertFalse(SlotHold.objects.filter(user=self.guest).exists())
+
+    def test_offer_keeps_guests_other_holds_and_leaving_releases_only_its_own(self):
+        other_table = Table.objects.create(number=2, capacity=4)
+        place_hold(self.guest, other_table.id, self.tomorrow, time(20, 0))
+        entry = self.join(self.guest)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.delete()
+        self.assertEqual(SlotHold.objects.filter(user=self.guest).count(), 2)
+        
+        self.client.login(username='guest', password='testpass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('waitlist_leave', args=[entry.pk]))
+        
+        self.assertEqual(list(SlotHold.objects.filter(user=self.guest).values_list('table', flat=True)), [other_table.id])
+
+    def test_saving_a_cancelled_booking_again_offers_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.status = 'CANCELLED'
+            self.booking.save()
+        entry = self.join(self.guest)
+        
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.special_requests = 'Window seat'
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        
+        self.assertEqual(WaitlistEntry.objects.get(pk=entry.pk).status, 'WAITING')
+
+    def test_failed_match_does_not_fail_the_cancellation(self):
+        def broken(table_id, date):
+            raise RuntimeError('Matching failed')
+        
+        original, waitlist.match_freed_table = waitlist.match_freed_table, broken
+        try:
+            with self.assertLogs('booking.waitlist', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+                self.booking.delete()
+        finally:
+            waitlist.match_freed_table = original
+        
+        self.assertFalse(Booking.objects.filter(pk=self.booking.pk).exists())
+
+    def test_join_from_failed_search(self):
+        self.client.login(username='guest', password='testpass123')
+        response = self.client.post(reverse('search_availability'), {
+            'date': self.tomorrow, 'time': '19:00', 'num_guests': 4,
+        })
+        self.assertRedirects(response, reverse('home'))
+        
+        response = self.client.get(reverse('waitlist'))
+        self.assertEqual(response.context['form'].initial['earliest_time'], time(18, 0))
+        self.client.post(reverse('waitlist'), {
+            'date': self.tomorrow, 'earliest_time': '18:00', 'latest_time': '20:00', 'num_guests': 4,
+        })
+        self.assertTrue(WaitlistEntry.objects.filter(user=self.guest, status='WAITING').exists())
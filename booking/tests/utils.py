@@ -0,0 +1,16 @@
+import atexit
+import shutil
+import tempfile
+
+# Holds, availability versions and change markers are only cached when the
+# cache is shared between processes.  A file cache counts as shared; each
+# run gets its own directory so runs side by side cannot see each other's keys
+SHARED_CACHE_DIR = tempfile.mkdtemp(prefix='booking-test-cache-')
+atexit.register(shutil.rmtree, SHARED_CACHE_DIR, ignore_errors=True)
+
+SHARED_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': SHARED_CACHE_DIR,
+    }
+}
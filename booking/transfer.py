@@ -0,0 +1,88 @@
+"""
+Streaming CSV and JSONL readers and writers for bulk import and export.
+
+Rows are plain dicts that are read and written one at a time, so memory
+use does not depend on the size of the file.  Bookings refer to their
+guest by username and to their table by number, so files can move
+between databases and come from other reservation systems.
+"""
+import csv
+import itertools
+import json
+import sys
+import time as timer
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+FORMATS = ('csv', 'jsonl')
+
+TABLE_FIELDS = ['number', 'capacity', 'joinable_with']
+BOOKING_FIELDS = [
+    'id', 'customer', 'table', 'date', 'time', 'num_guests', 'status', 'special_requests', 'created_at'
+]
+
+def guess_format(path):
+    """``jsonl`` for .jsonl/.ndjson paths, otherwise ``csv``"""
+    return 'jsonl' if str(path).endswith(('.jsonl', '.ndjson')) else 'csv'
+
+def open_file(path, mode):
+    """Open ``path`` for text I/O; ``-`` means stdin or stdout"""
+    if path == '-':
+        return open((sys.stdin if 'r' in mode else sys.stdout).fileno(), mode, newline='', closefd=False)
+    return open(path, mode, newline='', encoding='utf-8')
+
+def read_rows(stream, fmt):
+    """Yield ``(line_number, row)`` pairs from a CSV or JSONL stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f"line {line_number}: not valid JSON")
+
+def write_rows(stream, fmt, fields, rows):
+    """Write ``rows`` to ``stream``, yielding after each one so callers can report progress"""
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                field: ' '.join(map(str, value)) if isinstance(value, list) else value
+                for field, value in row.items()
+            })
+            yield row
+    else:
+        for row in rows:
+            stream.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            yield row
+
+def chunked(iterable, size):
+    """Lists of up to ``size`` items from ``iterable``"""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+class Progress:
+    """Reports rows handled and throughput every ``every`` rows"""
+
+    def __init__(self, stream, every=10000):
+        self.stream = stream
+        self.every = every
+        self.count = 0
+        self.started = timer.perf_counter()
+
+    @property
+    def rate(self):
+        return self.count / max(timer.perf_counter() - self.started, 1e-9)
+
+    def add(self, count=1):
+        before = self.count
+        self.count += count
+        if self.every and before // self.every != self.count // self.every:
+            self.stream.write(f"{self.count} rows ({self.rate:.0f} rows/s)")
@@ -5,10 +5,20 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('menu/', views.menu, name='menu'),
     path('availability/', views.search_availability, name='search_availability'),
+    path('availability/grid/', views.availability_grid, name='availability_grid'),
+    path('api/availability/', views.availability_api, name='availability_api'),
     path('booking/create/<int:table_id>/', views.create_booking, name='create_booking'),
+    path('booking/series/create/<int:table_id>/', views.create_booking_series, name='create_booking_series'),
+    path('booking/series/<int:pk>/', views.booking_series_detail, name='booking-series-detail'),
+    path('waitlist/', views.waitlist_view, name='waitlist'),
+    path('waitlist/<int:pk>/claim/', views.waitlist_claim, name='waitlist_claim'),
+    path('waitlist/<int:pk>/leave/', views.waitlist_leave, name='waitlist_leave'),
     path('bookings/', views.BookingListView.as_view(), name='bookings'),
     path('booking/<int:pk>/', views.BookingDetailView.as_view(), name='booking-detail'),
     path('booking/<int:pk>/update/', views.BookingUpdateView.as_view(), name='booking-update'),
     path('booking/<int:pk>/delete/', views.BookingDeleteView.as_view(), name='booking-delete'),
     path('staff/', views.staff_dashboard, name='staff_dashboard'),
+    path('staff/events/', views.staff_dashboard_events, name='staff_dashboard_events'),
+    path('calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
+    path('staff/calendar/<str:token>.ics', views.staff_calendar_feed, name='staff_calendar_feed'),
 ]
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Availability version counters for conditional GETs.
+
+Every date has a version number in the cache that moves whenever a
+booking on it is created, changed, cancelled or deleted, and one more
+counter moves whenever tables change.  The availability API builds its
+ETag from these counters and the date's slot holds, which are cached
+too, so a client whose dates are unchanged gets a 304 without a single
+``Booking`` row being read.  As with the menu version, a counter the
+cache lost restarts from a millisecond timestamp, which is later than
+any value it had before.
+
+Bookings change in other processes too (``run_jobs``, ``process_waitlist``,
+``import_data``), so the counters are only trusted in a shared cache;
+with a per-process one no ETag is sent and every request is answered in
+full.
+"""
+import hashlib
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import cache_is_shared
+from .holds import held_masks
+from .models import Table
+
+TABLES_KEY = 'availability:version:tables'
+# Losing a counter only costs clients one full response, so old dates may expire
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+def _date_key(date):
+    return f'availability:version:{date.isoformat()}'
+
+def _versions(keys):
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, int(time.time() * 1000), VERSION_TIMEOUT)
+        found.update(cache.get_many(missing))
+    return [found[key] for key in keys]
+
+def date_versions(dates):
+    """The current version of each of ``dates``"""
+    return _versions([_date_key(date) for date in dates])
+
+def bump_dates(dates):
+    """Move the versions of ``dates``; call once the change is committed"""
+    for key in {_date_key(date) for date in dates}:
+        try:
+            cache.incr(key)
+        except ValueError:
+            _versions([key])
+
+def availability_etag(start_date, end_date, *params):
+    """
+    ETag for availability between two dates inclusive, computed for
+    ``params`` such as the party size; no booking is read.  None, for no
+    ETag, unless the cache is shared.
+    """
+    if not cache_is_shared():
+        return None
+    dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    state = (
+        params,
+        _versions([TABLES_KEY]),
+        date_versions(dates),
+        # Holds come and go, and expire, without touching any booking
+        sorted(held_masks(start_date, end_date).items()),
+    )
+    return '"%s"' % hashlib.md5(repr(state).encode()).hexdigest()
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def tables_changed(sender, **kwargs):
+    def bump():
+        try:
+            cache.incr(TABLES_KEY)
+        except ValueError:
+            _versions([TABLES_KEY])
+    transaction.on_commit(bump)
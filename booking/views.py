@@ -1,16 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.views.generic import ListView, DetailView, DeleteView
+from django.views.generic import View, DeleteView
 from django.views.generic.edit import CreateView, UpdateView
 from django.urls import reverse_lazy, reverse
 from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse, JsonResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.views.decorators.http import condition, require_safe
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+import asyncio
+import json
 
-from .models import Booking, Table, MenuItem, MenuCategory
-from .forms import BookingForm, AvailabilitySearchForm
+from accounts.backends import is_staff_member
+from accounts.models import Profile
+
+from .models import Booking, BookingSeries, Table, WaitlistEntry
+from .forms import (
+    BookingForm, BookingSeriesForm, AvailabilitySearchForm, AvailabilityApiForm, AvailabilityGridForm,
+    SeriesMoveForm, WaitlistForm
+)
+from .availability import Availability, seating_times
+from .allocation import allocate
+from .holds import place_hold, is_held_by_other, release_holds
+from .menu_cache import MENU_CACHE_TIMEOUT, menu_categories, menu_version
+from .occupancy import MAX_HEATMAP_DAYS, occupancy_heatmap
+from .pagination import apaginate, page_json, page_size, paginate
+from .ratelimit import rate_limited, throttle_counts
+from .recurrence import cancel_series, create_series, move_series
+from . import ical, notifications, waitlist
+from .events import BOOKINGS_CHANNEL, get_broker
+from .versions import availability_etag
+from .asyncutils import AsyncLoginRequiredMixin, aget_object_or_404, arender, async_login_required
 
 def home(request):
     """Home page view"""
@@ -30,16 +59,18 @@ def home(request):
 
 def menu(request):
     """Menu page view"""
-    categories = MenuCategory.objects.all()
-    
+    # The data is only loaded when the rendered fragment is not cached
     context = {
-        'categories': categories,
+        'categories': SimpleLazyObject(menu_categories),
+        'menu_version': menu_version(),
+        'menu_cache_timeout': MENU_CACHE_TIMEOUT,
     }
     
     return render(request, 'booking/menu.html', context)
 
-@login_required
-def search_availability(request):
+@async_login_required
+@rate_limited('search')
+async def search_availability(request):
     """Search for available tables"""
     if request.method == 'POST':
         form = AvailabilitySearchForm(request.POST)
@@ -48,79 +79,175 @@ def search_availability(request):
             time = form.cleaned_data['time']
             num_guests = form.cleaned_data['num_guests']
             
-            # Find tables with sufficient capacity
-            suitable_tables = Table.objects.filter(capacity__gte=num_guests)
-            
-            # Check which tables are not booked at the requested time
-            booking_datetime = datetime.combine(date, time)
-            booking_end_time = (booking_datetime + timedelta(hours=2)).time()
-            
-            # Get all bookings for the date
-            existing_bookings = Booking.objects.filter(
-                date=date,
-                table__in=suitable_tables,
-                status__in=['PENDING', 'CONFIRMED']
-            )
-            
-            # Filter out tables with overlapping bookings
-            booked_tables = []
-            for booking in existing_bookings:
-                booking_end = (datetime.combine(datetime.today(), booking.time) + 
-                              timedelta(hours=2)).time()
-                
-                if (time <= booking.time < booking_end_time or 
-                    time < booking_end <= booking_end_time or
-                    (booking.time <= time and booking_end >= booking_end_time)):
-                    booked_tables.append(booking.table.id)
+            # Free tables ranked by best fit, or joinable groups for large parties
+            allocations = await sync_to_async(allocate)(date, time, num_guests, user=request.user)
             
-            available_tables = suitable_tables.exclude(id__in=booked_tables)
-            
-            if available_tables.exists():
+            if allocations:
                 # Store search criteria in session for booking creation
                 request.session['booking_date'] = date.isoformat()
                 request.session['booking_time'] = time.isoformat()
                 request.session['booking_num_guests'] = num_guests
                 
+                single_ids = [a.table_ids[0] for a in allocations if len(a.table_ids) == 1]
+                groups = [a.table_ids for a in allocations if len(a.table_ids) > 1]
+                available_tables = Table.objects.filter(id__in=single_ids).order_by('capacity', 'number')
+                
+                joined = await Table.objects.ain_bulk({table_id for group in groups for table_id in group})
+                combined_tables = [[joined[table_id] for table_id in group] for group in groups]
+                
                 context = {
                     'date': date,
                     'time': time,
                     'num_guests': num_guests,
                     'available_tables': available_tables,
+                    'combined_tables': combined_tables,
                 }
                 
-                return render(request, 'booking/availability_results.html', context)
+                return await arender(request, 'booking/availability_results.html', context)
             else:
-                messages.warning(request, "No tables available for the selected criteria.")
+                # Kept so the waitlist form starts from this search
+                request.session['waitlist_date'] = date.isoformat()
+                request.session['waitlist_time'] = time.isoformat()
+                request.session['waitlist_num_guests'] = num_guests
+                messages.warning(
+                    request,
+                    "No tables available for the selected criteria. "
+                    "Join the waitlist and we will offer you a table if one frees up."
+                )
                 return redirect('home')
     else:
         form = AvailabilitySearchForm()
     
-    return render(request, 'booking/search_availability.html', {'form': form})
+    return await arender(request, 'booking/search_availability.html', {'form': form})
 
-@login_required
-def create_booking(request, table_id):
+# The ETag is taken before the data is read, so a change in between only
+# costs the client one more full response, never a stale 304
+def _grid_etag(request):
+    form = AvailabilityGridForm(request.GET)
+    if not form.is_valid():
+        return None
+    data = form.cleaned_data
+    return availability_etag(data['start'], data['end'], data['num_guests'], data['include_tables'])
+
+@require_safe
+@condition(etag_func=_grid_etag)
+def availability_grid(request):
+    """JSON grid of free tables for every half-hour over a date range"""
+    form = AvailabilityGridForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    
+    start = form.cleaned_data['start']
+    end = form.cleaned_data['end']
+    num_guests = form.cleaned_data['num_guests']
+    include_tables = form.cleaned_data['include_tables']
+    
+    # One bulk fetch for the whole range, every cell is computed in memory
+    availability = Availability.load(start, end, num_guests=num_guests)
+    times = seating_times()
+    
+    days = []
+    for offset in range((end - start).days + 1):
+        date = start + timedelta(days=offset)
+        slots = []
+        for time in times:
+            free = availability.free_tables(date, time, num_guests)
+            slot = {'time': time.strftime('%H:%M'), 'free': len(free)}
+            if include_tables:
+                slot['tables'] = free
+            slots.append(slot)
+        days.append({'date': date.isoformat(), 'slots': slots})
+    
+    return JsonResponse({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'num_guests': num_guests,
+        'days': days,
+    })
+
+def _api_etag(request):
+    form = AvailabilityApiForm(request.GET)
+    if not form.is_valid():
+        return None
+    return availability_etag(form.cleaned_data['date'], form.cleaned_data['date'], form.cleaned_data['num_guests'])
+
+@require_safe
+@condition(etag_func=_api_etag)
+def availability_api(request):
+    """
+    Read-only JSON of the tables free at each seating time of a date.
+    Clients poll with ``If-None-Match`` and get a 304 while the date's
+    bookings, holds and the tables are unchanged.
+    """
+    form = AvailabilityApiForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    
+    date = form.cleaned_data['date']
+    num_guests = form.cleaned_data['num_guests']
+    availability = Availability.load(date, num_guests=num_guests)
+    tables = {
+        table['id']: table
+        for table in Table.objects.filter(capacity__gte=num_guests).values('id', 'number', 'capacity')
+    }
+    
+    response = JsonResponse({
+        'date': date.isoformat(),
+        'num_guests': num_guests,
+        'times': [
+            {
+                'time': time.strftime('%H:%M'),
+                'tables': [tables[table_id] for table_id in availability.free_tables(date, time, num_guests)
+                           if table_id in tables],
+            }
+            for time in seating_times()
+        ],
+    })
+    # Revalidate on every poll; the answer is usually a 304
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+def _confirm_booking(user, booking):
+    # Runs in a worker thread: the save is transactional and
+    # transactions are not available to async code
+    if is_held_by_other(user, booking.table_id, booking.date, booking.time):
+        raise ValidationError("This table is being held by another guest")
+    
+    # clean() gives a friendly early answer; the slot constraint
+    # enforced by save() settles any race with another booking
+    booking.full_clean()
+    with transaction.atomic():
+        booking.save()
+        notifications.booking_confirmed(booking)
+    # Offers for the same day are closed along with their entries
+    release_holds(user, date=booking.date)
+    waitlist.booked(user, booking.date)
+
+@async_login_required
+async def create_booking(request, table_id):
     """Create a booking for a specific table"""
-    table = get_object_or_404(Table, id=table_id)
+    table = await aget_object_or_404(Table, id=table_id)
     
     # Retrieve search criteria from session
     try:
-        date = datetime.fromisoformat(request.session.get('booking_date'))
-        time = datetime.fromisoformat(request.session.get('booking_time')).time()
+        date = datetime.fromisoformat(request.session.get('booking_date')).date()
+        time = datetime.strptime(request.session.get('booking_time'), '%H:%M:%S').time()
         num_guests = request.session.get('booking_num_guests')
     except (ValueError, TypeError):
         messages.error(request, "Session data is missing. Please search for availability again.")
         return redirect('search_availability')
     
+    hold = None
     if request.method == 'POST':
         form = BookingForm(request.POST)
-        if form.is_valid():
+        if await sync_to_async(form.is_valid)():
             booking = form.save(commit=False)
             booking.customer = request.user
             booking.table = table
             booking.status = 'CONFIRMED'  # Auto-confirm for now
             
             try:
-                booking.save()
+                await sync_to_async(_confirm_booking)(request.user, booking)
                 messages.success(request, "Booking confirmed successfully!")
                 
                 # Clear session data
@@ -129,9 +256,15 @@ def create_booking(request, table_id):
                 request.session.pop('booking_num_guests', None)
                 
                 return redirect('booking-detail', pk=booking.pk)
-            except Exception as e:
-                messages.error(request, f"Error creating booking: {str(e)}")
+            except ValidationError as e:
+                messages.error(request, f"Error creating booking: {' '.join(e.messages)}")
     else:
+        # Hold the table while the guest fills in the form
+        hold = await sync_to_async(place_hold)(request.user, table.id, date, time)
+        if hold is None:
+            messages.warning(request, "Another guest is completing a booking for this table. Please choose another.")
+            return redirect('search_availability')
+        
         # Pre-fill form with session data
         initial_data = {
             'date': date,
@@ -146,30 +279,166 @@ def create_booking(request, table_id):
         'date': date,
         'time': time,
         'num_guests': num_guests,
+        'hold': hold,
+    }
+    
+    return await arender(request, 'booking/booking_form.html', context)
+
+@login_required
+def create_booking_series(request, table_id):
+    """Book a table at the same time every few weeks"""
+    table = get_object_or_404(Table, id=table_id)
+    
+    if request.method == 'POST':
+        form = BookingSeriesForm(request.POST)
+        if form.is_valid():
+            try:
+                series = create_series(
+                    request.user,
+                    table,
+                    form.cleaned_data['date'],
+                    form.cleaned_data['time'],
+                    form.cleaned_data['num_guests'],
+                    form.cleaned_data['occurrences'],
+                    interval_weeks=form.cleaned_data['interval_weeks'],
+                    special_requests=form.cleaned_data['special_requests'] or None,
+                )
+            except ValidationError as e:
+                form.add_error(None, e)
+            else:
+                messages.success(request, f"{series.occurrences} bookings confirmed!")
+                return redirect(series)
+    else:
+        # Start from the last search, if there was one
+        form = BookingSeriesForm(initial={
+            'date': request.session.get('booking_date'),
+            'time': request.session.get('booking_time'),
+            'num_guests': request.session.get('booking_num_guests'),
+        })
+    
+    return render(request, 'booking/booking_series_form.html', {'form': form, 'table': table})
+
+@login_required
+def booking_series_detail(request, pk):
+    """A series' bookings, with actions for the rest of the series"""
+    series = BookingSeries.objects.select_related('customer', 'table')
+    if not is_staff_member(request.user):
+        series = series.filter(customer=request.user)
+    series = get_object_or_404(series, pk=pk)
+    
+    move_form = SeriesMoveForm(initial={'time': series.time})
+    if request.method == 'POST':
+        if request.POST.get('action') == 'cancel':
+            cancelled = cancel_series(series)
+            messages.success(request, f"{cancelled} upcoming booking(s) cancelled.")
+            return redirect(series)
+        move_form = SeriesMoveForm(request.POST)
+        if move_form.is_valid():
+            try:
+                moved = move_series(series, move_form.cleaned_data['time'], move_form.cleaned_data['table'])
+            except ValidationError as e:
+                move_form.add_error(None, e)
+            else:
+                messages.success(request, f"{moved} upcoming booking(s) moved.")
+                return redirect(series)
+    
+    context = {
+        'series': series,
+        'bookings': series.bookings.select_related('table').order_by('date'),
+        'move_form': move_form,
     }
+    return render(request, 'booking/booking_series_detail.html', context)
+
+@login_required
+def waitlist_view(request):
+    """Join the waitlist, and see the entries already on it"""
+    if request.method == 'POST':
+        form = WaitlistForm(request.POST)
+        if form.is_valid():
+            entry = form.save(commit=False)
+            entry.user = request.user
+            entry.save()
+            messages.success(request, "You are on the waitlist. We will email you if a table frees up.")
+            return redirect('waitlist')
+    else:
+        # Start from the last search that found nothing, an hour either side
+        initial = {'num_guests': request.session.get('waitlist_num_guests')}
+        try:
+            date = datetime.fromisoformat(request.session['waitlist_date']).date()
+            time = datetime.strptime(request.session['waitlist_time'], '%H:%M:%S')
+        except (KeyError, ValueError, TypeError):
+            pass
+        else:
+            initial.update({
+                'date': date,
+                'earliest_time': max(time - timedelta(hours=1), time.replace(hour=11, minute=0)).time(),
+                'latest_time': min(time + timedelta(hours=1), time.replace(hour=22, minute=0)).time(),
+            })
+        form = WaitlistForm(initial=initial)
+    
+    entries = request.user.waitlist_entries.filter(
+        date__gte=timezone.now().date(), status__in=('WAITING', 'OFFERED')
+    ).select_related('offered_table').order_by('date', 'earliest_time')
+    return render(request, 'booking/waitlist.html', {'form': form, 'entries': entries})
+
+@login_required
+def waitlist_claim(request, pk):
+    """Take up a waitlist offer through the usual booking form"""
+    entry = get_object_or_404(WaitlistEntry, pk=pk, user=request.user)
+    if entry.status != 'OFFERED' or entry.offer_expires_at <= timezone.now():
+        messages.warning(request, "This offer has expired. You can search for another table.")
+        return redirect('waitlist')
     
-    return render(request, 'booking/booking_form.html', context)
+    request.session['booking_date'] = entry.date.isoformat()
+    request.session['booking_time'] = entry.offered_time.isoformat()
+    request.session['booking_num_guests'] = entry.num_guests
+    return redirect('create_booking', table_id=entry.offered_table_id)
+
+@login_required
+def waitlist_leave(request, pk):
+    """Leave the waitlist"""
+    if request.method == 'POST':
+        entry = get_object_or_404(WaitlistEntry, pk=pk, user=request.user, status__in=('WAITING', 'OFFERED'))
+        entry.status = 'CANCELLED'
+        entry.save(update_fields=['status'])
+        if entry.offered_table_id:
+            # Pass the held table on to the next guest in line
+            release_holds(request.user, entry=entry)
+            waitlist.table_freed(entry.offered_table_id, entry.date)
+        messages.success(request, "You have left the waitlist.")
+    return redirect('waitlist')
 
-class BookingListView(LoginRequiredMixin, ListView):
+class BookingListView(AsyncLoginRequiredMixin, View):
     """View to list all bookings for the current user"""
-    model = Booking
     template_name = 'booking/booking_list.html'
-    context_object_name = 'bookings'
     
-    def get_queryset(self):
-        # Filter bookings for the current user
-        return Booking.objects.filter(customer=self.request.user)
+    async def get(self, request):
+        # Filter bookings for the current user, newest first, a page at a time
+        bookings = Booking.objects.filter(customer=request.user).select_related('table')
+        try:
+            page = await apaginate(
+                bookings, request.GET.get('after'), page_size(request.GET.get('per_page')), descending=True
+            )
+        except ValueError as e:
+            return JsonResponse({'errors': {'after': [str(e)]}}, status=400)
+        
+        # The JSON variant feeds infinite scrolling
+        if request.GET.get('format') == 'json':
+            return JsonResponse(page_json(page))
+        context = {'bookings': page.bookings, 'next_cursor': page.next_cursor}
+        return await arender(request, self.template_name, context)
 
-class BookingDetailView(LoginRequiredMixin, DetailView):
+class BookingDetailView(AsyncLoginRequiredMixin, View):
     """View to display a booking's details"""
-    model = Booking
     template_name = 'booking/booking_detail.html'
     
-    def get_queryset(self):
+    async def get(self, request, pk):
         # Ensure users can only view their own bookings
-        if self.request.user.profile.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(customer=self.request.user)
+        bookings = Booking.objects.select_related('customer', 'table')
+        if not await sync_to_async(is_staff_member)(request.user):
+            bookings = bookings.filter(customer=request.user)
+        booking = await aget_object_or_404(bookings, pk=pk)
+        return await arender(request, self.template_name, {'booking': booking})
 
 class BookingUpdateView(LoginRequiredMixin, UpdateView):
     """View to update a booking"""
@@ -179,12 +448,18 @@ class BookingUpdateView(LoginRequiredMixin, UpdateView):
     
     def get_queryset(self):
         # Ensure users can only update their own bookings
-        if self.request.user.profile.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(customer=self.request.user)
+        bookings = Booking.objects.select_related('table')
+        if is_staff_member(self.request.user):
+            return bookings
+        return bookings.filter(customer=self.request.user)
     
     def form_valid(self, form):
-        response = super().form_valid(form)
+        try:
+            response = super().form_valid(form)
+        except ValidationError as e:
+            # Another booking claimed the slot after the form was validated
+            form.add_error(None, e)
+            return self.form_invalid(form)
         messages.success(self.request, "Booking updated successfully!")
         return response
 
@@ -196,9 +471,10 @@ class BookingDeleteView(LoginRequiredMixin, DeleteView):
     
     def get_queryset(self):
         # Ensure users can only delete their own bookings
-        if self.request.user.profile.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(customer=self.request.user)
+        bookings = Booking.objects.select_related('table')
+        if is_staff_member(self.request.user):
+            return bookings
+        return bookings.filter(customer=self.request.user)
     
     def delete(self, request, *args, **kwargs):
         messages.success(self.request, "Booking cancelled successfully!")
@@ -209,7 +485,7 @@ class BookingDeleteView(LoginRequiredMixin, DeleteView):
 def staff_dashboard(request):
     """Dashboard for staff members"""
     # Check if user is staff
-    if not request.user.profile.is_staff:
+    if not is_staff_member(request.user):
         messages.error(request, "You do not have permission to access this page.")
         return redirect('home')
     
@@ -218,7 +494,7 @@ def staff_dashboard(request):
     todays_bookings = Booking.objects.filter(
         date=today, 
         status__in=['CONFIRMED', 'PENDING']
-    ).order_by('time')
+    ).select_related('customer', 'table')
     
     # Get upcoming bookings (next 7 days)
     end_date = today + timedelta(days=7)
@@ -226,11 +502,119 @@ def staff_dashboard(request):
         date__gt=today,
         date__lte=end_date,
         status__in=['CONFIRMED', 'PENDING']
-    ).order_by('date', 'time')
+    ).select_related('customer', 'table')
+    
+    # Both lists show a page at a time; the JSON variant loads the next one
+    if request.GET.get('format') == 'json':
+        listings = {'today': todays_bookings, 'upcoming': upcoming_bookings}
+        if request.GET.get('list') not in listings:
+            return JsonResponse({'errors': {'list': ['Choose today or upcoming.']}}, status=400)
+        try:
+            page = paginate(
+                listings[request.GET['list']], request.GET.get('after'), page_size(request.GET.get('per_page'))
+            )
+        except ValueError as e:
+            return JsonResponse({'errors': {'after': [str(e)]}}, status=400)
+        return JsonResponse(page_json(page, with_customer=True))
+    
+    # Occupancy heatmap, aggregated in the database and cached briefly
+    try:
+        heatmap_days = int(request.GET.get('days', 7))
+    except ValueError:
+        heatmap_days = 7
+    heatmap = occupancy_heatmap(today, heatmap_days)
     
     context = {
-        'todays_bookings': todays_bookings,
-        'upcoming_bookings': upcoming_bookings,
+        'todays_bookings': paginate(todays_bookings),
+        'upcoming_bookings': paginate(upcoming_bookings),
+        'heatmap': heatmap,
+        'heatmap_day_choices': (7, 14, 30, MAX_HEATMAP_DAYS),
+        'throttled': {f'{scope} by {kind}': count for (scope, kind), count in throttle_counts().items() if count},
+        'calendar_url': ical.feed_url(request, request.user, staff=True),
+        'live_updates': isinstance(request, ASGIRequest),
     }
     
-    return render(request, 'booking/staff_dashboard.html', context)
\ No newline at end of file
+    return render(request, 'booking/staff_dashboard.html', context)
+
+async def staff_dashboard_events(request):
+    """Server-sent events stream of booking changes for live dashboards"""
+    if not await sync_to_async(is_staff_member)(request.user):
+        return HttpResponseForbidden()
+    # An endless stream would tie up a WSGI worker for good; 204 tells
+    # EventSource not to reconnect
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    
+    subscription = get_broker().subscribe(BOOKINGS_CHANNEL)
+    
+    async def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    delta = await asyncio.wait_for(subscription.get(), settings.BOOKING_EVENT_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'event: booking\ndata: {json.dumps(delta)}\n\n'
+        finally:
+            subscription.close()
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+# Calendar feeds, fetched by calendar apps with the token in their URL
+# instead of a session
+def _calendar_response(bookings, name, staff=False):
+    response = StreamingHttpResponse(
+        ical.stream_feed(bookings, name, staff), content_type='text/calendar; charset=utf-8'
+    )
+    response['Content-Disposition'] = 'inline; filename="bookings.ics"'
+    # Clients revalidate every time; the marker makes that a cheap 304
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _guest_feed_etag(request, token):
+    user_id = ical.token_user_id(token)
+    return ical.feed_etag(user_id) if user_id is not None else None
+
+def _guest_feed_modified(request, token):
+    user_id = ical.token_user_id(token)
+    return ical.feed_last_modified(user_id) if user_id is not None else None
+
+@require_safe
+@condition(etag_func=_guest_feed_etag, last_modified_func=_guest_feed_modified)
+def calendar_feed(request, token):
+    """A guest's bookings as an iCalendar feed"""
+    claims = ical.token_claims(token)
+    # A rotated link stops working; like the staff check below, this is
+    # only needed when there is something to send
+    if claims is None or not Profile.objects.filter(user_id=claims[0], calendar_nonce=claims[1]).exists():
+        raise Http404
+    user_id = claims[0]
+    return _calendar_response(ical.feed_bookings(user_id), 'My restaurant bookings')
+
+def _staff_feed_etag(request, token):
+    return ical.feed_etag() if ical.token_user_id(token, staff=True) is not None else None
+
+def _staff_feed_modified(request, token):
+    return ical.feed_last_modified() if ical.token_user_id(token, staff=True) is not None else None
+
+@require_safe
+@condition(etag_func=_staff_feed_etag, last_modified_func=_staff_feed_modified)
+def staff_calendar_feed(request, token):
+    """Every active booking as an iCalendar feed, for staff"""
+    claims = ical.token_claims(token, staff=True)
+    if claims is None:
+        raise Http404
+    # Checked only when there is something to send: a 304 reveals nothing,
+    # and a token outlives its holder's staff role and a rotated link
+    user = User.objects.select_related('profile').filter(pk=claims[0]).first()
+    if user is None or user.profile.calendar_nonce != claims[1]:
+        raise Http404
+    if not is_staff_member(user):
+        return HttpResponseForbidden()
+    return _calendar_response(ical.feed_bookings(), 'Restaurant bookings', staff=True)
@@ -0,0 +1,124 @@
+"""
+Waitlist for sold-out times.
+
+Guests who find nothing join the waitlist for a date, a window of start
+times and a party size.  When a booking is cancelled or deleted, the
+freed table is offered to the longest-waiting entry it suits: the
+candidates come from the ``(date, status, created_at)`` index in
+priority order, so matching never scans the whole list.  The offer is a
+slot hold lasting ``WAITLIST_OFFER_TTL`` seconds; the guest's email is
+queued for the job worker so the request that freed the table does not
+wait on the mail server.  ``process_waitlist`` expires unanswered offers
+and passes their tables on.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils import timezone
+
+from .availability import booking_mask, occupancy, seating_times
+from .holds import held_masks, place_hold
+from .models import Booking, Table, WaitlistEntry
+from .notifications import notify
+
+logger = logging.getLogger(__name__)
+
+# Candidates examined per freed table; those first in line whose window or
+# party does not fit are skipped, the rest wait for the next table
+MATCH_BATCH = 50
+
+def free_start_times(table_id, date):
+    """Start times at which ``table_id`` is neither booked nor held on ``date``"""
+    taken = occupancy(date, table_ids=[table_id]).get((date, table_id), 0)
+    taken |= held_masks(date).get((date, table_id), 0)
+    return [start for start in seating_times() if not taken & booking_mask(start)]
+
+def match_freed_table(table_id, date):
+    """Offer ``table_id`` on ``date`` to the first waiting entry it suits; returns the entry or None"""
+    if date < timezone.now().date():
+        return None
+    capacity = Table.objects.filter(pk=table_id).values_list('capacity', flat=True).first()
+    free = free_start_times(table_id, date) if capacity else []
+    if not free:
+        return None
+
+    candidates = WaitlistEntry.objects.filter(
+        date=date,
+        status='WAITING',
+        num_guests__lte=capacity,
+        earliest_time__lte=free[-1],
+        latest_time__gte=free[0],
+    ).select_related('user').order_by('created_at', 'id')
+    for entry in candidates[:MATCH_BATCH]:
+        start = next((time for time in free if entry.earliest_time <= time <= entry.latest_time), None)
+        if start is not None:
+            offer(entry, table_id, start)
+            return entry
+    return None
+
+def offer(entry, table_id, start):
+    """Hold the table for the entry's guest and queue an email telling them"""
+    hold = place_hold(entry.user, table_id, entry.date, start, ttl=settings.WAITLIST_OFFER_TTL, entry=entry)
+    if hold is None:
+        return
+    entry.status = 'OFFERED'
+    entry.offered_table_id = table_id
+    entry.offered_time = start
+    entry.offer_expires_at = hold.expires_at
+    entry.save(update_fields=['status', 'offered_table', 'offered_time', 'offer_expires_at'])
+    notify(entry.user, *offer_message(entry))
+
+def offer_message(entry):
+    """Subject and body of an offer"""
+    link = settings.SITE_URL + reverse('waitlist_claim', args=[entry.pk])
+    body = (
+        f"Good news: a table for {entry.num_guests} is free on {entry.date:%A %d %B} "
+        f"at {entry.offered_time:%H:%M}.\n\n"
+        f"We are holding it for you until {timezone.localtime(entry.offer_expires_at):%H:%M}. "
+        f"Book it here: {link}\n"
+    )
+    return 'A table is free for you', body
+
+def booked(user, date):
+    """Close the guest's waitlist entries for a date they have now booked"""
+    WaitlistEntry.objects.filter(user=user, date=date, status__in=('WAITING', 'OFFERED')).update(status='BOOKED')
+
+def expire_offers(now=None):
+    """Expire unanswered offers and stale entries, offering freed tables again; returns the offers expired"""
+    now = now or timezone.now()
+    WaitlistEntry.objects.filter(date__lt=now.date(), status='WAITING').update(status='EXPIRED')
+    expired = list(WaitlistEntry.objects.filter(status='OFFERED', offer_expires_at__lte=now))
+    WaitlistEntry.objects.filter(pk__in=[entry.pk for entry in expired]).update(status='EXPIRED')
+    for table_id, date in {(entry.offered_table_id, entry.date) for entry in expired if entry.offered_table_id}:
+        match_freed_table(table_id, date)
+    return len(expired)
+
+def table_freed(table_id, date):
+    """Offer a table to the waitlist once the change that freed it is committed"""
+    def match():
+        # The change that freed the table is committed by now, so a failed
+        # match must not turn it into an error page
+        try:
+            match_freed_table(table_id, date)
+        except Exception:
+            logger.exception('Could not offer table %s on %s to the waitlist', table_id, date)
+    transaction.on_commit(match)
+
+@receiver(post_save, sender=Booking)
+def booking_cancelled(sender, instance, created, **kwargs):
+    # Only the save that cancels it, not later saves of a cancelled booking
+    if (
+        not created
+        and instance.status == 'CANCELLED'
+        and getattr(instance, '_loaded_values', {}).get('status') != 'CANCELLED'
+    ):
+        table_freed(instance.table_id, instance.date)
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    if instance.status != 'CANCELLED':
+        table_freed(instance.table_id, instance.date)
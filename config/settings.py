@@ -33,7 +33,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'booking.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'booking.routers.ReplicaPinningMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,6 +79,35 @@ DATABASES = {
     }
 }
 
+# Threaded booking tests need real file locking, not a shared in-memory database
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['TEST'] = {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')}
+
+# Read replicas, as database names on the primary's server (or SQLite files).
+# Requests read from them unless they or their browser wrote recently.
+DATABASE_REPLICAS = []
+for number, name in enumerate(config('DB_REPLICA_NAMES', default='', cast=Csv()), start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': name,
+        # Tests read the primary's test database through the replicas
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['booking.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -123,6 +154,18 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Authentication settings
+# Loads the profile with the user, so staff checks need no extra query
+AUTHENTICATION_BACKENDS = ['accounts.backends.ProfileBackend']
+
+# Requests per client IP and per account in each window, as "count/period"
+RATE_LIMITS = {
+    'login': {'ip': '30/m', 'account': '10/5m'},
+    'register': {'ip': '10/h'},
+    'password_reset': {'ip': '10/h', 'account': '3/h'},
+    'search': {'ip': '120/m', 'account': '30/m'},
+}
+RATE_LIMIT_CACHE = config('RATE_LIMIT_CACHE', default='default')
+
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'home'
 LOGIN_URL = 'login'
@@ -132,4 +175,23 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
\ No newline at end of file
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Booking settings
+BOOKING_HOLD_TTL = config('BOOKING_HOLD_TTL', default=300, cast=int)  # seconds
+BOOKING_EVENT_BROKER = config('BOOKING_EVENT_BROKER', default='booking.events.LocalBroker')
+BOOKING_EVENT_HEARTBEAT = config('BOOKING_EVENT_HEARTBEAT', default=15, cast=int)  # seconds
+WAITLIST_OFFER_TTL = config('WAITLIST_OFFER_TTL', default=900, cast=int)  # seconds
+
+# Background jobs (see booking/jobs.py)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+JOB_RETRY_DELAY = config('JOB_RETRY_DELAY', default=30, cast=int)  # seconds, doubled on each retry
+JOB_RETRY_MAX_DELAY = config('JOB_RETRY_MAX_DELAY', default=3600, cast=int)  # seconds
+JOB_TIMEOUT = config('JOB_TIMEOUT', default=600, cast=int)  # seconds before a running job is presumed lost
+
+# Next-day reminders (see booking/reminders.py)
+REMINDER_RATE = config('REMINDER_RATE', default='10/s')  # emails, as "count/period"
+REMINDER_BATCH = config('REMINDER_BATCH', default=500, cast=int)  # bookings per query
+
+# Absolute links in emails
+SITE_URL = config('SITE_URL', default='http://localhost:8000')